@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+캡처 대상 앱 레지스트리 (apps.json)
+
+캡처 스크립트의 GAMES와 대시보드(aos_review.html)의 games 배열이 모두 이 파일을 원본으로 사용한다.
+앱마다 언어/국가, 캡처 크기, 선택자, 우선순위를 지정할 수 있고 지정하지 않은 값은 defaults를 따른다.
+언어는 지금은 한국어(ko)만 지원한다 (국가는 자유).
+
+사용 예:
+    python app_registry.py list
+    python app_registry.py shards 4
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "apps.json")
+
+# 레지스트리에 defaults가 없을 때 사용하는 기본값
+BUILTIN_DEFAULTS = {
+    "store": "google_play",
+    "language": "ko",
+    "country": "KR",
+    "crop_width": 1000,
+    "crop_height": 1800,
+    "start_selectors": None,  # None이면 캡처 스크립트의 기본 선택자 목록 사용
+    "end_selectors": None,
+    "priority": 100,          # 작을수록 먼저 캡처
+    "enabled": True,
+    "dashboard": True,        # 대시보드 games 배열에 표시
+}
+REQUIRED_FIELDS = ("app_id", "name")
+# 캡처 스크립트의 준비 대기('평점' 제목)와 기본 시작/끝 선택자가 한국어 페이지 기준이므로 한국어만 허용
+SUPPORTED_LANGUAGES = ("ko",)
+DASHBOARD_FIELDS = ("business",)
+
+def load_registry(path=REGISTRY_FILE):
+    """레지스트리 파일을 읽어 기본값이 채워진 앱 목록을 우선순위 순으로 반환"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    defaults = dict(BUILTIN_DEFAULTS, **data.get("defaults", {}))
+    apps = []
+    seen_ids, seen_names = set(), set()
+    for position, entry in enumerate(data.get("apps", [])):
+        missing = [field for field in REQUIRED_FIELDS if not entry.get(field)]
+        if missing:
+            raise ValueError(f"레지스트리 {position + 1}번째 앱에 필수 항목이 없습니다: {', '.join(missing)}")
+        app = dict(defaults, **entry)
+        if app["language"] not in SUPPORTED_LANGUAGES:
+            raise ValueError(f"지원하지 않는 언어입니다: {app['name']} ({app['language']}), "
+                             f"지원 언어: {', '.join(SUPPORTED_LANGUAGES)}")
+        if app["app_id"] in seen_ids or app["name"] in seen_names:
+            raise ValueError(f"레지스트리에 중복된 앱이 있습니다: {app['app_id']} ({app['name']})")
+        if app["dashboard"]:
+            missing = [field for field in DASHBOARD_FIELDS if not app.get(field)]
+            if missing:
+                raise ValueError(f"대시보드에 표시할 앱 {app['name']}에 항목이 없습니다: {', '.join(missing)}")
+        seen_ids.add(app["app_id"])
+        seen_names.add(app["name"])
+        app.setdefault("display_name", app["name"])
+        app.setdefault("icon", f"{app['display_name']}.webp")
+        app["position"] = position
+        apps.append(app)
+    
+    # 우선순위가 같으면 레지스트리에 적힌 순서 유지
+    return sorted(apps, key=lambda app: (app["priority"], app["position"]))
+
+def resolve_app(games, name):
+    """게임 이름(대소문자 무시) 또는 앱 ID를 {앱 ID: 게임 이름}에서 찾아 (앱 ID, 게임 이름) 반환"""
+    if name in games:
+        return name, games[name]
+    for app_id, game_name in games.items():
+        if game_name.lower() == name.lower():
+            return app_id, game_name
+    raise ValueError(f"알 수 없는 게임입니다: {name}")
+
+def select_apps(games, names):
+    """게임 이름/앱 ID 목록으로 {앱 ID: 게임 이름} 부분집합 선택 (비어 있으면 전체, 모르는 이름이면 ValueError)"""
+    if not names:
+        return dict(games)
+    return dict(resolve_app(games, name) for name in names)
+
+def shard_of(app_id, shard_count):
+    """앱 ID 해시로 정한 샤드 번호 (실행 환경이 달라도 항상 같은 값)"""
+    digest = hashlib.sha1(app_id.encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) % shard_count
+
+def select_shard(apps, shard_index, shard_count):
+    """shard_index번 샤드에 속한 앱만 반환"""
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"샤드 번호가 범위를 벗어났습니다: {shard_index}/{shard_count}")
+    return [app for app in apps if shard_of(app["app_id"], shard_count) == shard_index]
+
+def parse_shard(value):
+    """'인덱스/개수' 형식의 샤드 지정 문자열 파싱 (예: '0/4')"""
+    match = re.fullmatch(r"(\d+)/(\d+)", value or "")
+    if not match or int(match.group(2)) < 1:
+        raise ValueError(f"샤드는 '인덱스/개수' 형식이어야 합니다: {value}")
+    return int(match.group(1)), int(match.group(2))
+
+def _js_string(value):
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def dashboard_games_js(apps, indent="            "):
+    """대시보드 스크립트의 const games = [...] 배열 코드 생성 (레지스트리 순서)"""
+    rows = [
+        f"{indent}{{ name: {_js_string(app['name'])}, displayName: {_js_string(app['display_name'])}, "
+        f"icon: {_js_string(app['icon'])}, business: {_js_string(app['business'])} }}"
+        for app in sorted(apps, key=lambda app: app["position"]) if app["dashboard"]
+    ]
+    return "const games = [\n" + ",\n".join(rows) + "\n" + indent[:-4] + "];"
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="캡처 대상 앱 레지스트리")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="레지스트리 파일")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="앱 목록 출력")
+    shards_parser = sub.add_parser("shards", help="샤드별 앱 배정 출력")
+    shards_parser.add_argument("count", type=int, help="샤드 수")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    try:
+        apps = load_registry(args.registry)
+    except (OSError, ValueError) as e:
+        print(f"레지스트리를 읽을 수 없습니다: {e}")
+        return False
+    
+    if args.command == "list":
+        for app in apps:
+            state = "" if app["enabled"] else " (비활성)"
+            print(f"{app['priority']:>4} {app['name']:<16} {app['app_id']} "
+                  f"[{app['store']}, {app['language']}-{app['country']}, "
+                  f"{app['crop_width']}x{app['crop_height']}]{state}")
+        return True
+    
+    for index in range(args.count):
+        names = [app["name"] for app in select_shard(apps, index, args.count)]
+        print(f"{index}/{args.count}: {len(names)}개 - {', '.join(names)}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -11,29 +11,306 @@ import logging
 import io
 import subprocess
 import sys
+import argparse
+import json
+import hashlib
+import queue
+import threading
+import contextlib
+import http.client
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from PIL import Image
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
+from PIL import Image, ImageChops
 import time
 from bs4 import BeautifulSoup
 import re
+from capture_proxy import CaptureProxy, AssetCache, load_blocklist
+from app_registry import REGISTRY_FILE, load_registry, select_shard, parse_shard, dashboard_games_js
+from work_queue import WorkQueue, QueueHostError, LeaseHeartbeat, worker_name, registry_jobs, POLL_INTERVAL
+from rate_limiter import RateLimiter, LIMITER_FILE, DEFAULT_RATE_PER_MINUTE, DEFAULT_BURST
+from review_store import ReviewStore, REVIEW_STORE_FILE, review_id_for, ingest_dates
+from rating_series import update_rating_series
+from store_fetch import (StoreClient, SNAPSHOT_FILE, FETCH_THREADS, detect_block_response, parse_store_page,
+                         review_signature, has_review_data, load_snapshots, save_snapshots)
 
-# 게임 정보 정의
-GAMES = {
-    "com.neowiz.games.newmatgo": "NewMatgo",
-    "com.neowiz.games.newmatgoKakao": "NewMatgoKakao",
-    "com.neowiz.games.gostop2018": "Original",
-    "com.neowiz.games.poker": "Poker",
-    "com.neowiz.games.pokerKakao": "PokerKakao",
-    "com.neowiz.games.sudda": "Sudda",
-    "com.neowiz.games.suddaKakao": "SuddaKakao",
-    "com.neowiz.games.pmang.holdem.poker": "ShowdownHoldem",
-    "com.neowiz.playstudio.slot.casino": "NewVegas"
+# 게임 정보 정의 (각 실행 진입점이 use_registry()로 apps.json 레지스트리에서 로드, 그 전에는 비어 있음)
+APPS = {}   # 앱 ID -> 레지스트리 항목 (언어, 캡처 크기, 선택자 등 앱별 설정)
+GAMES = {}  # 앱 ID -> 게임 이름 (캡처 대상, 우선순위 순)
+SUPPORTED_STORES = {"google_play"}
+
+def use_registry(path=REGISTRY_FILE, shard=None):
+    """레지스트리에서 앱 목록을 불러와 APPS/GAMES 갱신 (shard=(인덱스, 개수)이면 해당 샤드만 캡처)"""
+    apps = load_registry(path)
+    APPS.clear()
+    APPS.update({app["app_id"]: app for app in apps})
+    
+    targets = [app for app in apps if app["enabled"] and app["store"] in SUPPORTED_STORES]
+    if shard:
+        targets = select_shard(targets, *shard)
+    GAMES.clear()
+    GAMES.update({app["app_id"]: app["name"] for app in targets})
+    return apps
+
+# 스토어 주소 (벤치마크에서는 로컬 스냅샷 서버 주소로 교체)
+STORE_BASE_URL = "https://play.google.com"
+
+# 스토어 언어/국가 (URL 파라미터와 브라우저 언어 설정에 함께 사용)
+STORE_LANGUAGE = "ko"
+STORE_COUNTRY = "KR"
+
+# 페이지 준비 상태 대기 설정 (초 단위 상한값)
+READY_TIMEOUTS = {
+    "heading": 15,   # '평점 및 리뷰' 제목 등장
+    "network": 10,   # 네트워크 유휴 상태
+    "fonts": 5,      # 웹 폰트 로딩 완료
+    "layout": 5,     # 레이아웃 변화 멈춤
+}
+NETWORK_IDLE_MS = 500  # 이 시간 동안 새 리소스 응답이 없으면 네트워크 유휴로 판단
+LAYOUT_STABLE_POLLS = 3  # 레이아웃 값이 연속으로 같아야 하는 폴링 횟수
+READY_POLL_INTERVAL = 0.2
+
+# 시작 요소 선택자 ('평점 및 리뷰' 텍스트를 포함하는 요소, 우선순위 순)
+START_ELEMENT_SELECTORS = [
+    "//h2[text()='평점 및 리뷰']",
+    "//h2[contains(text(), '평점')]",
+    "//h2[contains(text(), '리뷰')]",
+    "//div[contains(text(), '평점 및 리뷰')]",
+    "//span[contains(text(), '평점 및 리뷰')]"
+]
+
+# 끝 요소 선택자 ('리뷰 모두 보기' 텍스트를 포함하는 요소, 우선순위 순)
+END_ELEMENT_SELECTORS = [
+    "//div[@role='button']//span[text()='리뷰 모두 보기']",
+    "//span[text()='리뷰 모두 보기']",
+    "//div[contains(text(), '리뷰 모두 보기')]",
+    "//button[contains(text(), '리뷰 모두 보기')]",
+    "//a[contains(text(), '리뷰 모두 보기')]",
+    "//div[contains(text(), '새로운 기능')]",
+    "//h3[contains(text(), '새로운 기능')]",
+    "//div[contains(text(), '부적절한 앱으로 신고')]",
+    "//a[contains(text(), '부적절한 앱으로 신고')]"
+]
+
+# 캡처 이미지 출력 형식 (형식별 Pillow 저장 옵션)
+IMAGE_FORMATS = {
+    "png": {"ext": "png", "pil_format": "PNG", "params": {}},
+    "webp": {"ext": "webp", "pil_format": "WEBP", "params": {"quality": 85, "method": 4}},
+    "webp_lossless": {"ext": "webp", "pil_format": "WEBP", "params": {"lossless": True, "quality": 80, "method": 4}},
+    "avif": {"ext": "avif", "pil_format": "AVIF", "params": {"quality": 60}},
+}
+DEFAULT_IMAGE_FORMAT = "png"
+
+# 이전 날짜 이미지와 비교하는 변경 감지 설정
+CHANGE_HASH_SIZE = 8             # dHash 크기 (8이면 64비트)
+CHANGE_MAX_HASH_DISTANCE = 4     # 이 이하의 해밍 거리이면 픽셀 비교로 최종 판단
+CHANGE_PIXEL_THRESHOLD = 16      # 밝기 차이가 이 값을 넘는 픽셀을 변경으로 셈
+CHANGE_MAX_PIXEL_RATIO = 0.002   # 변경 픽셀 비율이 이 이하이면 "변경 없음"
+# 변경 없음일 때 처리: write(그대로 저장), marker(이전 이미지를 가리키는 표시 파일만 저장), skip(저장 안 함)
+UNCHANGED_MODES = ("write", "marker", "skip")
+UNCHANGED_MARKER_SUFFIX = ".unchanged.json"
+PREVIOUS_IMAGE_EXTENSIONS = ("webp", "png", "avif", "jpg")
+
+# 앱별로 성공한 선택자를 기억하는 캐시 파일
+SELECTOR_CACHE_FILE = os.path.join(".cache", "selector_cache.json")
+
+# 선택자 목록을 한 번의 스크립트 호출로 평가하여 첫 번째 일치 요소와 위치를 반환
+LOCATE_ANCHORS_SCRIPT = """
+const startSelectors = arguments[0];
+const endSelectors = arguments[1];
+const scrollToStart = arguments[2];
+
+function resolve(selectors) {
+    for (let i = 0; i < selectors.length; i++) {
+        let node = null;
+        try {
+            node = document.evaluate(selectors[i], document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } catch (e) {}
+        if (node) return [i, node];
+    }
+    return [-1, null];
+}
+
+function rect(node) {
+    const r = node.getBoundingClientRect();
+    return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};
+}
+
+const [startIndex, startNode] = resolve(startSelectors);
+const [endIndex, endNode] = resolve(endSelectors);
+if (startNode && scrollToStart) {
+    startNode.scrollIntoView({block: 'start'});
+}
+// 페이지 레이아웃 지문: 문서 언어와 섹션 제목 구성
+const fingerprint = [document.documentElement.lang].concat(
+    Array.from(document.querySelectorAll('h2')).map(h => h.textContent.trim())
+).join('|');
+return {
+    fingerprint: fingerprint,
+    page_width: document.documentElement.scrollWidth,
+    page_height: Math.max(document.body.scrollHeight, document.documentElement.scrollHeight),
+    start_index: startIndex,
+    end_index: endIndex,
+    start: startNode ? rect(startNode) : null,
+    end: endNode ? rect(endNode) : null
+};
+"""
+
+# 리뷰 섹션에서 구조화된 데이터를 뽑을 때 사용하는 CSS 선택자 (Google Play 리뷰 섹션 기준)
+REVIEW_SELECTORS = {
+    "rating": "div.jILTFe",                 # 전체 평점 (예: 4.5)
+    "rating_count": "div.EHUI5b",           # 리뷰 수 (예: 리뷰 12.3만개)
+    "histogram_row": "div.JzwBgb",          # 별점 분포 막대 한 줄
+    "histogram_label": "div.Qjdn7d",        # 막대의 별점 (예: 5)
+    "histogram_bar": "div.RJfYGf",          # 막대 (style.width가 비율)
+    "review": "div.RHo1pe",                 # 리뷰 하나
+    "review_author": "div.X5PpBb",
+    "review_date": "span.bp9Aid",
+    "review_stars": "div.iXRFPc[aria-label], [role='img'][aria-label]",
+    "review_text": "div.h3YV2d",
+    "review_helpful": "div.AJTPZc",
+    "review_id": "[data-review-id]",        # 리뷰 ID를 속성으로 가진 요소 (리뷰 헤더)
+    "reviews_dialog": "div[role='dialog']", # '리뷰 모두 보기' 대화상자
+}
+
+# '리뷰 모두 보기' 대화상자 전체 탐색 설정
+REVIEW_CRAWL_STATE_FILE = os.path.join(".cache", "review_crawl_state.json")
+REVIEW_CRAWL_MAX_REVIEWS = 500   # 한 번에 읽을 최대 리뷰 수 (처음 실행할 때 수천 개를 모두 읽지 않도록)
+REVIEW_CRAWL_BATCH_WAIT = 5      # 스크롤 후 새 리뷰가 나타날 때까지 기다리는 시간 (초)
+REVIEW_CRAWL_EMPTY_BATCHES = 2   # 새 리뷰 없이 연속으로 이만큼 기다리면 목록 끝으로 판단
+REVIEW_CRAWL_KNOWN_IDS = 50      # 앱별로 기억하는 최신 리뷰 ID 수 (높은 수위 표시)
+REVIEW_DIALOG_LABELS = ("리뷰 모두 보기", "See all reviews")
+REVIEW_SORT_LABELS = ("관련성순", "관련성", "Most relevant")
+REVIEW_SORT_NEWEST_LABELS = ("최신순", "최신", "Newest")
+
+# 대화상자의 리뷰 정렬을 최신순으로 변경 (정렬 버튼 클릭 후 'menu'라고 반환하면 메뉴 항목을 한 번 더 호출)
+REVIEW_SORT_SCRIPT = """
+const sel = arguments[0];
+const labels = arguments[1];
+const step = arguments[2];
+const dialog = document.querySelector(sel.reviews_dialog);
+if (!dialog) return false;
+const roles = step === 'button'
+    ? '[role="button"], button, [aria-haspopup]'
+    : '[role="menuitemradio"], [role="menuitem"], [role="option"], li';
+// 정렬 메뉴는 대화상자 밖(문서 끝)에 그려짐
+const node = Array.from((step === 'button' ? dialog : document).querySelectorAll(roles))
+    .find(el => labels.some(label => el.textContent.trim().startsWith(label)));
+if (!node) return false;
+node.click();
+return true;
+"""
+
+# 대화상자에 그려진 리뷰 중 afterId(지난 배치의 마지막 리뷰) 다음 것들을 추출하고 목록 끝으로 스크롤
+# (가상 목록이 노드를 재사용/정리하므로 노드는 건드리지 않고, afterId 노드가 없으면 그려진 리뷰를 모두 반환해
+#  호출하는 쪽에서 리뷰 ID로 중복을 거름)
+REVIEW_CRAWL_BATCH_SCRIPT = """
+const sel = arguments[0];
+const afterId = arguments[1];
+const dialog = document.querySelector(sel.reviews_dialog);
+if (!dialog) return null;
+
+function text(el, selector) {
+    const node = el.querySelector(selector);
+    return node ? node.textContent.trim() : null;
+}
+function reviewId(node) {
+    const idNode = node.matches(sel.review_id) ? node : node.querySelector(sel.review_id);
+    return idNode ? idNode.getAttribute('data-review-id') : null;
+}
+const nodes = Array.from(dialog.querySelectorAll(sel.review));
+const afterIndex = afterId ? nodes.findIndex(node => reviewId(node) === afterId) : -1;
+const reviews = nodes.slice(afterIndex + 1).map(node => {
+    const stars = node.querySelector(sel.review_stars);
+    return {
+        id: reviewId(node),
+        author: text(node, sel.review_author),
+        date: text(node, sel.review_date),
+        stars: stars ? stars.getAttribute('aria-label') : null,
+        text: text(node, sel.review_text),
+        helpful: text(node, sel.review_helpful)
+    };
+});
+
+const last = nodes[nodes.length - 1];
+if (last) {
+    let scroller = last.parentElement;
+    while (scroller && scroller !== dialog && scroller.scrollHeight <= scroller.clientHeight) {
+        scroller = scroller.parentElement;
+    }
+    (scroller || dialog).scrollTop = (scroller || dialog).scrollHeight;
+    last.scrollIntoView({block: 'end'});
 }
+return reviews;
+"""
+
+# 대화상자 목록의 마지막 리뷰 ID (스크롤 후 새 리뷰가 그려졌는지 확인용)
+REVIEW_CRAWL_LAST_ID_SCRIPT = """
+const sel = arguments[0];
+const dialog = document.querySelector(sel.reviews_dialog);
+const nodes = dialog ? dialog.querySelectorAll(sel.review) : [];
+const last = nodes[nodes.length - 1];
+if (!last) return null;
+const idNode = last.matches(sel.review_id) ? last : last.querySelector(sel.review_id);
+return idNode ? idNode.getAttribute('data-review-id') : null;
+"""
+
+# 시작 요소가 속한 섹션에서 평점/별점 분포/리뷰를 문자열 그대로 추출 (캡처 영역 안에 보이는 리뷰만)
+EXTRACT_REVIEWS_SCRIPT = """
+const startSelector = arguments[0];
+const sel = arguments[1];
+const regionTop = arguments[2];
+const regionBottom = arguments[3];
+
+let root = document;
+try {
+    const node = document.evaluate(startSelector, document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (node && node.closest('section')) root = node.closest('section');
+} catch (e) {}
+
+function text(el, selector) {
+    const node = el.querySelector(selector);
+    return node ? node.textContent.trim() : null;
+}
+function label(el, selector) {
+    const node = el.querySelector(selector);
+    return node ? node.getAttribute('aria-label') : null;
+}
+
+const histogram = Array.from(root.querySelectorAll(sel.histogram_row)).map(row => {
+    const bar = row.querySelector(sel.histogram_bar);
+    return {
+        label: text(row, sel.histogram_label) || row.getAttribute('aria-label'),
+        width: bar ? bar.style.width : null
+    };
+});
+const reviews = Array.from(root.querySelectorAll(sel.review)).filter(node => {
+    const top = node.getBoundingClientRect().top + window.scrollY;
+    return top >= regionTop && top < regionBottom;
+}).map(node => ({
+    id: (node.matches(sel.review_id) ? node : node.querySelector(sel.review_id) || node).getAttribute('data-review-id'),
+    author: text(node, sel.review_author),
+    date: text(node, sel.review_date),
+    stars: label(node, sel.review_stars),
+    text: text(node, sel.review_text),
+    helpful: text(node, sel.review_helpful)
+}));
+return {
+    rating: text(root, sel.rating),
+    rating_count: text(root, sel.rating_count),
+    histogram: histogram,
+    reviews: reviews
+};
+"""
 
 def setup_logging():
     """로깅 설정"""
@@ -52,8 +329,183 @@ def setup_logging():
     )
     return logging.getLogger(__name__)
 
-def setup_driver():
-    """Firefox WebDriver 설정"""
+# 단계별 소요 시간 기록 설정 (main()과 워커 프로세스에서 configure_spans로 지정)
+SPAN_SETTINGS = {"run_id": None, "file": None}
+_span_lock = threading.Lock()
+
+def span_file_for(date_str):
+    """실행 로그 옆에 두는 단계별 소요 시간 기록 파일 (JSON Lines)"""
+    return os.path.join("logs", f"auto_capture_{date_str}.spans.jsonl")
+
+def configure_spans(run_id, span_file):
+    """이 프로세스에서 기록할 span의 실행 ID와 파일 지정"""
+    SPAN_SETTINGS["run_id"] = run_id
+    SPAN_SETTINGS["file"] = span_file
+
+def record_span(stage, seconds, ok=True, **fields):
+    """단계 하나의 소요 시간을 한 줄짜리 JSON 기록으로 추가"""
+    if not SPAN_SETTINGS["file"]:
+        return
+    record = {
+        "ts": datetime.datetime.now().isoformat(timespec='milliseconds'),
+        "run_id": SPAN_SETTINGS["run_id"],
+        "pid": os.getpid(),
+        "stage": stage,
+        "seconds": round(seconds, 4),
+        "ok": ok,
+    }
+    record.update({key: value for key, value in fields.items() if value is not None})
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _span_lock:
+        with open(SPAN_SETTINGS["file"], 'a', encoding='utf-8') as f:
+            f.write(line)
+
+@contextlib.contextmanager
+def timing_span(stage, **fields):
+    """with 블록의 소요 시간을 span으로 기록 (블록에서 fields 딕셔너리에 바이트 수 등 추가 가능)"""
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield fields
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        record_span(stage, time.perf_counter() - start, ok=ok, **fields)
+
+class StageTimer:
+    """연속된 단계의 소요 시간을 mark()를 부를 때마다 span으로 기록"""
+    
+    def __init__(self, **fields):
+        self.fields = fields
+        self._last = time.perf_counter()
+    
+    def mark(self, stage, ok=True, **fields):
+        now = time.perf_counter()
+        record_span(stage, now - self._last, ok=ok, **{**self.fields, **fields})
+        self._last = now
+
+def summarize_spans(span_file, run_id):
+    """span 파일에서 해당 실행의 단계별 건수/합계/최대 시간 집계"""
+    summary = {}
+    try:
+        with open(span_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("run_id") != run_id:
+                    continue
+                stage = summary.setdefault(record["stage"], {"count": 0, "total": 0.0, "max": 0.0, "bytes": 0})
+                stage["count"] += 1
+                stage["total"] += record["seconds"]
+                stage["max"] = max(stage["max"], record["seconds"])
+                stage["bytes"] += record.get("bytes", 0)
+    except OSError:
+        pass
+    return summary
+
+def log_span_summary(logger):
+    """이번 실행의 단계별 소요 시간을 한 줄 표로 로그"""
+    summary = summarize_spans(SPAN_SETTINGS["file"], SPAN_SETTINGS["run_id"])
+    if not summary:
+        return
+    cells = [
+        f"{stage} {s['count']}건 {s['total']:.1f}s(최대 {s['max']:.1f}s{', ' + format(s['bytes'], ',') + 'B' if s['bytes'] else ''})"
+        for stage, s in sorted(summary.items(), key=lambda item: -item[1]["total"])
+    ]
+    logger.info("단계별 소요 시간: " + " | ".join(cells))
+
+# 날짜별 실행 매니페스트 (앱별 상태, 출력 파일, 해시, 소요 시간)
+_manifest_lock = threading.Lock()
+
+def manifest_file_for(date_str, log_dir="logs"):
+    """날짜별 실행 매니페스트 파일 (JSON Lines, 앱마다 마지막 기록이 현재 상태)"""
+    return os.path.join(log_dir, f"auto_capture_{date_str}.manifest.jsonl")
+
+def file_sha256(path):
+    """파일 내용의 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def record_manifest(options, app_id, game_name, date_str, status, files=(), seconds=None, error=None, **extra):
+    """실행 매니페스트에 앱 하나의 결과 추가 (options["manifest_dir"]가 없으면 기록하지 않음)
+    
+    extra에는 변경 감지 결과(지각 해시, 이전 이미지와의 차이 등)가 함께 기록된다.
+    """
+    log_dir = (options or {}).get("manifest_dir")
+    if not log_dir:
+        return
+    entry = {
+        "ts": datetime.datetime.now().isoformat(timespec='seconds'),
+        "run_id": SPAN_SETTINGS["run_id"],
+        "app_id": app_id,
+        "game_name": game_name,
+        "status": status,
+        "files": [{"name": os.path.basename(path), "bytes": os.path.getsize(path), "sha256": file_sha256(path)}
+                  for path in files],
+        "seconds": round(seconds, 2) if seconds is not None else None,
+        "error": error,
+    }
+    entry.update(extra)
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _manifest_lock:
+        with open(manifest_file_for(date_str, log_dir), 'a', encoding='utf-8') as f:
+            f.write(line)
+
+def load_manifest(date_str, log_dir="logs"):
+    """실행 매니페스트에서 앱 ID별 마지막 기록 반환"""
+    entries = {}
+    try:
+        with open(manifest_file_for(date_str, log_dir), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 중단된 실행이 남긴 불완전한 줄
+                entries[entry["app_id"]] = entry
+    except OSError:
+        pass
+    return entries
+
+def manifest_completed(entry, save_dir):
+    """완료(또는 변경 없음) 기록이 있고 기록된 출력 파일이 크기/해시 그대로 남아 있는지"""
+    if not entry or entry["status"] not in ("done", "unchanged"):
+        return False
+    if entry["status"] == "done" and not entry["files"]:
+        return False
+    for item in entry["files"]:
+        path = os.path.join(save_dir, item["name"])
+        if not os.path.exists(path) or os.path.getsize(path) != item["bytes"] or file_sha256(path) != item["sha256"]:
+            return False
+    return True
+
+def select_run_targets(games, manifest, save_dir, force=False, retry_failed=False):
+    """매니페스트를 보고 이번 실행에서 캡처할 게임 선택
+    
+    기본값은 완료되지 않은 게임 전부, retry_failed이면 실패/차단 기록이 있는 게임만,
+    force이면 기록과 관계없이 전부.
+    """
+    if force:
+        return dict(games)
+    if retry_failed:
+        return {app_id: game_name for app_id, game_name in games.items()
+                if app_id in manifest and manifest[app_id]["status"] in ("failed", "blocked")}
+    return {app_id: game_name for app_id, game_name in games.items()
+            if not manifest_completed(manifest.get(app_id), save_dir)}
+
+def setup_driver(options=None):
+    """Firefox WebDriver 설정
+    
+    options["proxy"]가 "호스트:포트"이면 모든 요청을 캡처 프록시(capture_proxy.py)로
+    보내고, 프록시의 자체 서명 인증서를 허용한다. 브라우저 캐시는 계속 끄고
+    정적 리소스 재사용은 프록시의 공유 디스크 캐시가 담당한다.
+    """
+    options = options or {}
     firefox_options = Options()
     firefox_options.add_argument("--width=1920")
     firefox_options.add_argument("--height=1200")  # 높이를 늘려서 더 많은 내용 표시
@@ -65,46 +517,858 @@ def setup_driver():
     # 한국어 설정 추가
     firefox_options.set_preference("intl.accept_languages", "ko-KR,ko;q=0.9,en;q=0.8")
     firefox_options.set_preference("general.useragent.locale", "ko-KR")
+    firefox_options.set_preference("intl.locale.requested", "ko-KR")  # 첫 페이지 로딩부터 navigator.language 적용
     
     # 추가 설정으로 더 정확한 렌더링 보장
     firefox_options.set_preference("layout.css.devPixelsPerPx", "1.0")  # 픽셀 밀도 설정
     firefox_options.set_preference("browser.cache.disk.enable", False)  # 캐시 비활성화
     firefox_options.set_preference("browser.cache.memory.enable", False)  # 메모리 캐시 비활성화
     
+    # 리소스 차단/캐시 프록시 사용
+    if options.get("proxy"):
+        proxy_host, proxy_port = options["proxy"].rsplit(":", 1)
+        firefox_options.set_preference("network.proxy.type", 1)
+        firefox_options.set_preference("network.proxy.http", proxy_host)
+        firefox_options.set_preference("network.proxy.http_port", int(proxy_port))
+        firefox_options.set_preference("network.proxy.ssl", proxy_host)
+        firefox_options.set_preference("network.proxy.ssl_port", int(proxy_port))
+        firefox_options.set_preference("network.proxy.no_proxies_on", "")
+        firefox_options.accept_insecure_certs = True  # 프록시의 TLS 중계 인증서 허용
+    
+    if options.get("block_media"):
+        # 캡처 영역에 보이지 않는 동영상 자동 재생/미리 로딩 차단
+        firefox_options.set_preference("media.autoplay.default", 5)
+        firefox_options.set_preference("media.preload.default", 0)
+        firefox_options.set_preference("media.preload.auto", 0)
+    
     return webdriver.Firefox(options=firefox_options)
 
-def capture_game_review_firefox(driver, app_id, game_name, save_dir, logger):
-    """게임 리뷰 섹션 캡처 (Firefox 사용)"""
-    url = f"https://play.google.com/store/apps/details?id={app_id}"
+def _wait_until(driver, condition, timeout, description, logger):
+    """조건이 참이 될 때까지 대기 (상한 시간 초과 시 경고만 남기고 계속 진행)"""
+    start = time.time()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=READY_POLL_INTERVAL).until(condition)
+        logger.info(f"{description} 대기 완료 ({time.time() - start:.2f}초)")
+        return True
+    except TimeoutException:
+        logger.warning(f"{description} 대기 시간 초과 ({timeout}초), 계속 진행합니다")
+        return False
+
+def wait_for_review_heading(driver, logger, timeout=None):
+    """'평점 및 리뷰' 제목이 DOM에 나타날 때까지 대기"""
+    return _wait_until(
+        driver,
+        lambda d: d.execute_script(
+            "return document.readyState !== 'loading' && "
+            "Array.from(document.querySelectorAll('h2')).some(h => h.textContent.includes('평점'));"
+        ),
+        timeout or READY_TIMEOUTS["heading"],
+        "'평점 및 리뷰' 제목",
+        logger,
+    )
+
+def wait_for_network_idle(driver, logger, timeout=None, idle_ms=NETWORK_IDLE_MS):
+    """마지막 리소스 응답 이후 idle_ms 동안 새 요청이 없을 때까지 대기"""
+    return _wait_until(
+        driver,
+        lambda d: d.execute_script("""
+            if (document.readyState !== 'complete') return false;
+            const entries = performance.getEntriesByType('resource');
+            let last = 0;
+            for (const e of entries) {
+                if (e.responseEnd === 0) return false;  // 아직 응답 중인 요청
+                if (e.responseEnd > last) last = e.responseEnd;
+            }
+            return performance.now() - last >= arguments[0];
+        """, idle_ms),
+        timeout or READY_TIMEOUTS["network"],
+        "네트워크 유휴",
+        logger,
+    )
+
+def wait_for_fonts(driver, logger, timeout=None):
+    """웹 폰트 로딩이 끝날 때까지 대기"""
+    return _wait_until(
+        driver,
+        lambda d: d.execute_script("return !document.fonts || document.fonts.status === 'loaded';"),
+        timeout or READY_TIMEOUTS["fonts"],
+        "폰트 로딩",
+        logger,
+    )
+
+def wait_for_layout_stable(driver, logger, timeout=None, polls=LAYOUT_STABLE_POLLS):
+    """페이지 높이, 스크롤 위치, 뷰포트 크기가 연속으로 같을 때까지 대기"""
+    state = {"last": None, "count": 0}
+    
+    def layout_stable(d):
+        current = d.execute_script(
+            "return [document.body.scrollHeight, window.scrollY, window.innerWidth, window.innerHeight].join(',');"
+        )
+        if current == state["last"]:
+            state["count"] += 1
+        else:
+            state["last"] = current
+            state["count"] = 0
+        return state["count"] >= polls
+    
+    return _wait_until(
+        driver,
+        layout_stable,
+        timeout or READY_TIMEOUTS["layout"],
+        "레이아웃 안정화",
+        logger,
+    )
+
+def wait_for_page_ready(driver, logger):
+    """제목, 네트워크, 폰트, 레이아웃 신호를 차례로 확인하여 페이지 준비 상태 대기"""
+    wait_for_review_heading(driver, logger)
+    wait_for_network_idle(driver, logger)
+    wait_for_fonts(driver, logger)
+    wait_for_layout_stable(driver, logger)
+
+def load_selector_cache(cache_file=SELECTOR_CACHE_FILE):
+    """선택자 캐시 파일 읽기 (없거나 손상된 경우 빈 캐시)"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def update_selector_cache(app_id, fingerprint, start_index, end_index, locate_ms, cache_file=SELECTOR_CACHE_FILE):
+    """앱의 성공한 선택자와 소요 시간을 캐시에 기록"""
+    # 병렬 워커가 서로 다른 앱을 기록하므로 저장 직전에 다시 읽어 병합
+    cache = load_selector_cache(cache_file)
+    entry = cache.setdefault(app_id, {"fingerprints": {}})
+    entry["last_fingerprint"] = fingerprint
+    entry["fingerprints"][fingerprint] = {
+        "start_index": start_index,
+        "end_index": end_index,
+        "locate_ms": round(locate_ms, 1),
+        "updated": datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, cache_file)
+
+def cached_selector_order(selectors, preferred_index):
+    """캐시에 기록된 선택자를 맨 앞으로 옮긴 인덱스 순서 반환"""
+    order = list(range(len(selectors)))
+    if preferred_index is not None and 0 <= preferred_index < len(selectors):
+        order.remove(preferred_index)
+        order.insert(0, preferred_index)
+    return order
+
+def locate_anchors(driver, start_selectors, end_selectors, scroll_to_start=False):
+    """시작/끝 요소를 한 번의 왕복으로 찾아 선택자 인덱스와 페이지 기준 위치/크기를 반환"""
+    result = driver.execute_script(LOCATE_ANCHORS_SCRIPT, start_selectors, end_selectors, scroll_to_start)
+    
+    anchors = {
+        "start_index": result["start_index"],
+        "end_index": result["end_index"],
+        "fingerprint": hashlib.sha1(result["fingerprint"].encode('utf-8')).hexdigest()[:12],
+        "page_width": int(result["page_width"]),
+        "page_height": int(result["page_height"]),
+    }
+    for key in ("start", "end"):
+        rect = result[key]
+        if rect is None:
+            anchors[f"{key}_location"] = None
+            anchors[f"{key}_size"] = None
+        else:
+            anchors[f"{key}_location"] = {'x': int(round(rect['x'])), 'y': int(round(rect['y']))}
+            anchors[f"{key}_size"] = {'width': int(round(rect['width'])), 'height': int(round(rect['height']))}
+    return anchors
+
+# 타일 캡처 중 스크롤을 따라다니는 고정/스티키 요소(상단 바 등)를 숨기거나 복원
+HIDE_FIXED_ELEMENTS_SCRIPT = """
+const hide = arguments[0];
+if (hide) {
+    let count = 0;
+    for (const el of document.querySelectorAll('body *')) {
+        const position = getComputedStyle(el).position;
+        if (position === 'fixed' || position === 'sticky') {
+            el.setAttribute('data-capture-hidden', el.style.visibility);
+            el.style.visibility = 'hidden';
+            count++;
+        }
+    }
+    return count;
+}
+const hidden = document.querySelectorAll('[data-capture-hidden]');
+for (const el of hidden) {
+    el.style.visibility = el.getAttribute('data-capture-hidden');
+    el.removeAttribute('data-capture-hidden');
+}
+return hidden.length;
+"""
+
+def capture_region_tiles(driver, left, top, width, height, logger):
+    """페이지 좌표의 사각형 영역을 뷰포트 타일로 캡처하여 디코딩 전 PNG 바이트 목록 반환
+    
+    창 크기를 페이지 전체 높이로 늘리지 않으므로 렌더링/전송/디코딩 비용이
+    페이지 높이가 아니라 캡처 영역 크기에 비례한다. 디코딩과 이어 붙이기는
+    stitch_region_tiles()에서 하므로 브라우저 스레드 밖에서 처리할 수 있다.
+    """
+    tiles = []  # (PNG 바이트, 타일 내 시작 y, 잘라낼 높이, 결과 이미지 내 y)
+    hidden_count = driver.execute_script(HIDE_FIXED_ELEMENTS_SCRIPT, True)
+    logger.info(f"고정 요소 {hidden_count}개 숨김 (타일 캡처)")
+    
+    try:
+        viewport_height = driver.execute_script("return window.innerHeight")
+        filled = 0
+        while filled < height:
+            # 스크롤 후 실제 스크롤 위치 확인 (페이지 끝에서는 요청한 위치보다 작을 수 있음)
+            scroll_y = driver.execute_script(
+                "window.scrollTo(0, arguments[0]); return window.scrollY;", top + filled
+            )
+            wait_for_layout_stable(driver, logger)
+            if not tiles:
+                wait_for_network_idle(driver, logger)  # 영역 내 지연 로딩 이미지 대기
+            
+            tile_top = top + filled - scroll_y
+            tile_height = min(height - filled, viewport_height - tile_top)
+            if tile_height <= 0:
+                logger.warning(f"타일 캡처 범위를 벗어났습니다: top={top + filled}, scrollY={scroll_y}")
+                break
+            tiles.append((driver.get_screenshot_as_png(), tile_top, tile_height, filled))
+            filled += tile_height
+        
+        logger.info(f"영역 캡처 완료: 타일 {len(tiles)}개 (뷰포트 높이 {viewport_height}px)")
+    finally:
+        driver.execute_script(HIDE_FIXED_ELEMENTS_SCRIPT, False)
+    
+    return tiles
+
+def stitch_region_tiles(tiles, left, width, height):
+    """타일 PNG를 디코딩하여 캡처 영역 크기의 이미지로 이어 붙이기"""
+    region = Image.new('RGB', (width, height), (255, 255, 255))
+    for png_bytes, tile_top, tile_height, dest_y in tiles:
+        with Image.open(io.BytesIO(png_bytes)) as tile:
+            region.paste(tile.crop((left, tile_top, left + width, tile_top + tile_height)), (0, dest_y))
+    return region
+
+def build_capture_options(args):
+    """명령행 인자로부터 워커 프로세스에 전달할 캡처 옵션 생성"""
+    return {
+        "image_format": args.format,
+        "image_quality": args.quality,
+        "keep_png": args.keep_png,
+        "encoder_threads": args.encoder_threads,
+        "queue_depth": args.queue_depth,
+        "tabs": args.tabs,
+        "proxy": None,  # main()에서 프록시를 시작한 뒤 "호스트:포트"로 설정
+        "block_media": args.block_resources,
+        "rate_limit": None,  # main()에서 요청 제한기 파일 경로와 함께 설정
+        "block_retries": args.block_retries,
+        "unchanged_mode": args.unchanged,
+        "extract_reviews": not args.no_reviews,
+        "deep_reviews": args.deep_reviews,
+        "deep_max_reviews": args.deep_max_reviews,
+    }
+
+def _avif_supported():
+    """Pillow에서 AVIF 저장이 가능한지 확인 (Pillow 11.2+ 또는 pillow-avif-plugin)"""
+    try:
+        import pillow_avif  # noqa: F401  (플러그인 등록용)
+    except ImportError:
+        pass
+    Image.init()
+    return "AVIF" in Image.SAVE
+
+def perceptual_hash(img, hash_size=CHANGE_HASH_SIZE):
+    """차이 해시(dHash): 축소한 흑백 이미지에서 가로로 이웃한 픽셀의 밝기 비교 결과 (16진수 문자열)"""
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.tobytes())  # 흑백(L) 이미지는 픽셀마다 1바이트
+    bits = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            bits = (bits << 1) | (1 if left > right else 0)
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
+def hash_distance(hash_a, hash_b):
+    """두 지각 해시의 해밍 거리"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+def pixel_diff_ratio(img_a, img_b, threshold=CHANGE_PIXEL_THRESHOLD):
+    """밝기 차이가 threshold를 넘는 픽셀 비율 (크기가 다르면 1.0)"""
+    if img_a.size != img_b.size:
+        return 1.0
+    diff = ImageChops.difference(img_a.convert('L'), img_b.convert('L'))
+    changed = sum(diff.point(lambda v: 255 if v > threshold else 0).histogram()[255:])
+    return changed / (img_a.width * img_a.height)
+
+def find_previous_capture(base_dir, app_id, game_name, date_str, manifest_dir=None):
+    """date_str 이전 가장 최근 날짜의 같은 게임 이미지를 (base_dir 기준 상대 경로, 지각 해시 또는 None)로 반환
+    
+    변경 없음 표시 파일이면 그것이 가리키는 실제 이미지로 따라간다.
+    """
+    try:
+        dates = sorted((name for name in os.listdir(base_dir) if re.fullmatch(r"\d{8}", name) and name < date_str),
+                       reverse=True)
+    except OSError:
+        return None, None
+    
+    for date in dates:
+        entry = load_manifest(date, manifest_dir).get(app_id) if manifest_dir else None
+        if entry and entry.get("same_as"):
+            return entry["same_as"], entry.get("phash")
+        if entry and entry["status"] == "done" and entry["files"]:
+            path = f"{date}/{entry['files'][-1]['name']}"
+            if os.path.exists(os.path.join(base_dir, path)):
+                return path, entry.get("phash")
+        
+        marker = os.path.join(base_dir, date, f"{game_name}_{date}{UNCHANGED_MARKER_SUFFIX}")
+        if os.path.exists(marker):
+            with open(marker, 'r', encoding='utf-8') as f:
+                return json.load(f)["same_as"], None
+        for ext in PREVIOUS_IMAGE_EXTENSIONS:
+            path = f"{date}/{game_name}_{date}.{ext}"
+            if os.path.exists(os.path.join(base_dir, path)):
+                return path, None
+    return None, None
+
+def write_unchanged_marker(save_dir, game_name, date_str, same_as, **fields):
+    """이전 날짜 이미지(base_dir 기준 상대 경로)를 가리키는 변경 없음 표시 파일을 쓰고 경로 반환"""
+    marker_path = os.path.join(save_dir, f"{game_name}_{date_str}{UNCHANGED_MARKER_SUFFIX}")
+    with open(marker_path, 'w', encoding='utf-8') as f:
+        json.dump({"same_as": same_as, **fields}, f, ensure_ascii=False)
+    return marker_path
+
+def detect_change(img, job, options, logger):
+    """새 크롭 이미지를 이전 날짜 이미지와 비교한 결과 (비교할 이미지가 없으면 changed=True)"""
+    result = {"phash": perceptual_hash(img), "changed": True, "previous": None,
+              "hash_distance": None, "pixel_diff": None}
+    base_dir = os.path.dirname(os.path.abspath(job["save_dir"]))
+    previous, previous_hash = find_previous_capture(base_dir, job.get("app_id"), job["game_name"], job["date_str"],
+                                                    (options or {}).get("manifest_dir"))
+    if previous is None:
+        return result
+    
+    result["previous"] = previous
+    try:
+        with Image.open(os.path.join(base_dir, previous)) as previous_img:
+            previous_img.load()
+            if previous_hash is None:
+                previous_hash = perceptual_hash(previous_img)
+            result["hash_distance"] = hash_distance(result["phash"], previous_hash)
+            if result["hash_distance"] <= CHANGE_MAX_HASH_DISTANCE:
+                result["pixel_diff"] = round(pixel_diff_ratio(img, previous_img), 5)
+                result["changed"] = result["pixel_diff"] > CHANGE_MAX_PIXEL_RATIO
+    except OSError as e:
+        logger.warning(f"이전 이미지를 비교할 수 없습니다 ({previous}): {e}")
+        return result
+    
+    logger.info(f"변경 감지 ({job['game_name']}): 이전 {previous}, 해시 거리 {result['hash_distance']}, "
+                f"픽셀 차이 {result['pixel_diff'] if result['pixel_diff'] is not None else '-'} -> "
+                f"{'변경됨' if result['changed'] else '변경 없음'}")
+    return result
+
+def save_capture_image(img, save_dir, game_name, date_str, options, logger):
+    """디코딩된 크롭 이미지를 설정된 형식으로 바로 인코딩하여 저장하고 파일 경로 목록 반환"""
+    options = options or {}
+    image_format = options.get("image_format", DEFAULT_IMAGE_FORMAT)
+    if image_format == "avif" and not _avif_supported():
+        logger.warning("현재 Pillow에서 AVIF를 지원하지 않습니다. WebP로 저장합니다.")
+        image_format = "webp"
+    
+    format_info = IMAGE_FORMATS[image_format]
+    params = dict(format_info["params"])
+    if options.get("image_quality") is not None:
+        params["quality"] = options["image_quality"]
+    
+    saved_files = []
+    
+    # 선택 사항: 무손실 PNG 원본 보관
+    if options.get("keep_png") and format_info["ext"] != "png":
+        png_path = os.path.join(save_dir, f"{game_name}_{date_str}.png")
+        img.save(png_path, "PNG")
+        saved_files.append(png_path)
+    
+    filepath = os.path.join(save_dir, f"{game_name}_{date_str}.{format_info['ext']}")
+    img.save(filepath, format_info["pil_format"], **params)
+    saved_files.append(filepath)
+    
+    for path in saved_files:
+        logger.info(f"이미지 저장: {os.path.basename(path)} ({os.path.getsize(path):,} bytes)")
+    return saved_files
+
+def encode_capture_job(job, options, logger):
+    """캡처 작업(타일 PNG 바이트)을 디코딩/크롭/인코딩하여 저장하고 파일 경로 목록 반환
+    
+    options["unchanged_mode"]가 marker/skip이고 이전 날짜 이미지와 차이가 없으면 이미지를 저장하지 않고
+    이전 이미지를 가리키는 표시 파일만 저장하거나(marker) 아무것도 저장하지 않는다(skip).
+    """
+    options = options or {}
+    with timing_span("decode", app_id=job.get("app_id"), date=job["date_str"]):
+        img = stitch_region_tiles(job["tiles"], job["left"], job["width"], job["height"])
+    with timing_span("change_detect", app_id=job.get("app_id"), date=job["date_str"]):
+        change = detect_change(img, job, options, logger)
+    seconds = time.perf_counter() - job["started"] if "started" in job else None
+    change_fields = {key: change[key] for key in ("phash", "hash_distance", "pixel_diff", "previous")}
+    
+    unchanged_mode = options.get("unchanged_mode", "write")
+    if not change["changed"] and unchanged_mode != "write":
+        saved_files = []
+        if unchanged_mode == "marker":
+            saved_files.append(write_unchanged_marker(job["save_dir"], job["game_name"], job["date_str"],
+                                                      change["previous"], **change_fields))
+        logger.info(f"변경 없음: {job['game_name']} -> {change['previous']}"
+                    + (" (표시 파일 저장)" if saved_files else " (저장 생략)"))
+        record_manifest(options, job.get("app_id"), job["game_name"], job["date_str"], "unchanged", saved_files,
+                        seconds=seconds, same_as=change["previous"], **change_fields)
+        return saved_files
+    
+    with timing_span("encode_save", app_id=job.get("app_id"), date=job["date_str"]) as span:
+        saved_files = save_capture_image(img, job["save_dir"], job["game_name"], job["date_str"], options, logger)
+        span["bytes"] = sum(os.path.getsize(path) for path in saved_files)
+    logger.info(f"캡처 완료: {os.path.basename(saved_files[-1])} (크기: {img.width} x {img.height})")
+    record_manifest(options, job.get("app_id"), job["game_name"], job["date_str"], "done", saved_files,
+                    seconds=seconds, changed=change["changed"], **change_fields)
+    return saved_files
+
+class CapturePipeline:
+    """브라우저 캡처와 이미지 디코딩/인코딩/저장을 겹쳐 실행하는 파이프라인
+    
+    브라우저 스레드는 submit()으로 타일 PNG 바이트를 크기 제한이 있는 큐에 넣고
+    바로 다음 앱으로 넘어가며, 인코더 스레드들이 큐에서 작업을 꺼내 처리한다.
+    큐가 가득 차면 submit()이 대기하여 메모리 사용량이 제한된다.
+    """
+    
+    def __init__(self, options, logger, encoder_threads=2, queue_depth=4):
+        self.options = options
+        self.logger = logger
+        self.queue = queue.Queue(maxsize=queue_depth)
+        self.results = {}
+        self.stage_times = {"capture": [], "queue_wait": [], "encode": []}
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._encoder_loop, name=f"capture-encoder-{i}", daemon=True)
+            for i in range(max(1, encoder_threads))
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, job):
+        """캡처 작업을 인코딩 큐에 넣음 (큐가 가득 차면 대기)"""
+        start = time.perf_counter()
+        self.queue.put(job)
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.stage_times["queue_wait"].append(waited)
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+    
+    def record_capture_time(self, seconds):
+        """브라우저 단계 소요 시간 기록"""
+        with self._lock:
+            self.stage_times["capture"].append(seconds)
+    
+    def _encoder_loop(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                break
+            
+            start = time.perf_counter()
+            try:
+                encode_capture_job(job, self.options, self.logger)
+                ok = True
+            except Exception as e:
+                self.logger.error(f"이미지 인코딩/저장 실패 ({job['game_name']}): {e}")
+                record_manifest(self.options, job.get("app_id"), job["game_name"], job["date_str"], "failed",
+                                error=f"인코딩/저장 실패: {e}")
+                ok = False
+            
+            with self._lock:
+                self.results[job["game_name"]] = ok
+                self.stage_times["encode"].append(time.perf_counter() - start)
+            self.queue.task_done()
+    
+    def close(self):
+        """남은 작업을 모두 처리하고 인코더 스레드를 종료한 뒤 게임별 인코딩 결과 반환"""
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        return dict(self.results)
+    
+    def stats(self):
+        """단계별 처리 건수/합계/평균/최대 시간과 최대 큐 깊이"""
+        with self._lock:
+            stats = {"max_queue_depth": self.max_queue_depth, "queue_size": self.queue.maxsize}
+            for stage, times in self.stage_times.items():
+                stats[stage] = {
+                    "count": len(times),
+                    "total": sum(times),
+                    "avg": sum(times) / len(times) if times else 0.0,
+                    "max": max(times) if times else 0.0,
+                }
+            return stats
+    
+    def log_stats(self, logger):
+        """파이프라인 큐 깊이와 단계별 소요 시간 로그"""
+        stats = self.stats()
+        logger.info(f"파이프라인 큐: 최대 깊이 {stats['max_queue_depth']}/{stats['queue_size']}, "
+                    f"인코더 스레드 {len(self._threads)}개")
+        for stage in ("capture", "queue_wait", "encode"):
+            stage_stats = stats[stage]
+            logger.info(f"  {stage}: {stage_stats['count']}건, 합계 {stage_stats['total']:.2f}초, "
+                        f"평균 {stage_stats['avg']:.2f}초, 최대 {stage_stats['max']:.2f}초")
+
+# 요청 제한/차단 페이지 감지: 스토어 대신 표시되는 차단, 동의, 캡차 페이지 판별 (정상 페이지면 null)
+BLOCK_PAGE_SCRIPT = """
+const url = location.href;
+const text = (document.body ? document.body.innerText : '').slice(0, 5000).toLowerCase();
+if (/\\/sorry\\//.test(url)) return 'captcha';
+if (/consent\\.google\\./.test(url)) return 'consent';
+if (document.querySelector('iframe[src*="recaptcha"], #captcha-form, form[action*="sorry"]')
+    || text.includes('unusual traffic') || text.includes('비정상적인 트래픽')) return 'captcha';
+if (/\\b429\\b/.test(document.title) || text.includes('too many requests')) return 'throttled';
+if (document.querySelector('form[action*="consent"]')
+    || text.includes('before you continue') || text.includes('계속하기 전에')) return 'consent';
+return null;
+"""
+
+TAB_SLOT_TIMEOUT = 10  # 탭 미리 열기에서 요청 슬롯을 기다리는 최대 시간 (초)
+
+class PageBlockedError(Exception):
+    """스토어 페이지 대신 차단/동의/캡차 페이지가 표시됨 (메시지는 감지 사유)"""
+
+_rate_limiters = {}
+
+def rate_limiter_for(options):
+    """캡처 옵션에 설정된 공유 요청 제한기 (프로세스마다 한 번 연결, 설정이 없으면 None)"""
+    config = (options or {}).get("rate_limit")
+    if not config:
+        return None
+    if config["path"] not in _rate_limiters:
+        _rate_limiters[config["path"]] = RateLimiter(config["path"], config["per_minute"], config["burst"],
+                                                     run_id=options.get("run_id"))
+    return _rate_limiters[config["path"]]
+
+def detect_block_page(driver):
+    """현재 페이지가 차단/동의/캡차 페이지이면 사유 문자열, 아니면 None"""
+    return driver.execute_script(BLOCK_PAGE_SCRIPT)
+
+def load_store_page(driver, url, app_id, logger, limiter=None, preloaded=False):
+    """요청 제한을 지키며 스토어 페이지를 불러오고 차단 페이지이면 PageBlockedError 발생
+    
+    preloaded이면 open_tabs()에서 이미 요청 슬롯을 받고 로딩을 시작한 것으로 본다.
+    """
+    if limiter and not preloaded:
+        waited = limiter.acquire()
+        if waited >= 1:
+            logger.info(f"요청 제한으로 {waited:.1f}초 대기")
+    try:
+        if not preloaded:
+            driver.get(url)
+        wait_for_page_ready(driver, logger)
+        reason = detect_block_page(driver)
+    except Exception:
+        if limiter:
+            limiter.release(ok=False)
+        raise
+    
+    if limiter:
+        backoff = limiter.release(reason, app_id)
+        if reason:
+            logger.warning(f"모든 워커의 요청을 {backoff:.0f}초 동안 중단합니다 (사유: {reason})")
+    if reason:
+        raise PageBlockedError(reason)
+
+def parse_count(text):
+    """'리뷰 12.3만개', '1,234', '12.3K reviews' 같은 표기를 정수로 변환 (숫자가 없으면 None)"""
+    if not text:
+        return None
+    match = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*(천|만|억|[KMB](?![a-z]))?", text)
+    if not match:
+        return None
+    units = {"천": 1e3, "만": 1e4, "억": 1e8, "K": 1e3, "M": 1e6, "B": 1e9}
+    return int(round(float(match.group(1).replace(",", "")) * units.get(match.group(2), 1)))
+
+def parse_rating(text):
+    """'4.5' 또는 '4,5' 형식의 평점을 실수로 변환"""
+    match = re.search(r"\d+(?:[.,]\d+)?", text or "")
+    return float(match.group(0).replace(",", ".")) if match else None
+
+def parse_review_stars(text):
+    """'별표 5개 만점에 4개를 받았습니다.' / 'Rated 4 stars out of five stars' 에서 받은 별 수"""
+    numbers = re.findall(r"\d+", text or "")
+    if not numbers:
+        return None
+    return int(numbers[-1] if "만점" in text else numbers[0])
+
+def parse_review_date(text):
+    """'2025. 12. 10.' / 'December 10, 2025' 형식의 날짜를 YYYY-MM-DD로 (알 수 없는 형식이면 원문)"""
+    if not text:
+        return None
+    match = re.fullmatch(r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.?", text.strip())
+    if match:
+        return f"{int(match.group(1)):04d}-{int(match.group(2)):02d}-{int(match.group(3)):02d}"
+    try:
+        return datetime.datetime.strptime(text.strip(), "%B %d, %Y").strftime('%Y-%m-%d')
+    except ValueError:
+        return text.strip()
+
+def structure_review(review):
+    """리뷰 하나의 문자열(작성자, 날짜, 별점 라벨, 본문, 도움됨 표기)을 숫자/날짜로 정리"""
+    return {
+        "review_id": review_id_for(review),
+        "author": review["author"],
+        "date": parse_review_date(review["date"]),
+        "stars": parse_review_stars(review["stars"]),
+        "text": review["text"],
+        "helpful": parse_count(review["helpful"]) or 0,
+    }
+
+def structure_review_data(raw):
+    """페이지에서 뽑은 문자열(EXTRACT_REVIEWS_SCRIPT 결과 형식)을 숫자/날짜로 정리"""
+    histogram = {}
+    for row in raw["histogram"]:
+        stars = parse_count(row["label"])
+        width = re.match(r"([\d.]+)%", row["width"] or "")
+        if stars is not None:
+            histogram[str(stars)] = round(float(width.group(1)), 1) if width else None
+    return {
+        "rating": parse_rating(raw["rating"]),
+        "rating_count": parse_count(raw["rating_count"]),
+        "rating_count_text": raw["rating_count"],
+        "histogram": histogram,
+        "reviews": [structure_review(review) for review in raw["reviews"]],
+    }
+
+def extract_review_data(driver, start_selector, region_top, region_bottom):
+    """캡처 영역과 같은 리뷰 섹션에서 평점, 리뷰 수, 별점 분포, 보이는 리뷰들을 구조화하여 반환"""
+    raw = driver.execute_script(EXTRACT_REVIEWS_SCRIPT, start_selector, REVIEW_SELECTORS, region_top, region_bottom)
+    return structure_review_data(raw)
+
+def review_file_for(save_dir, date_str):
+    """날짜 폴더의 리뷰 텍스트 파일 (JSON Lines, 앱마다 한 줄)"""
+    return os.path.join(save_dir, f"reviews_{date_str}.jsonl")
+
+_review_file_lock = threading.Lock()
+
+def record_review_data(save_dir, app_id, game_name, date_str, language, data):
+    """추출한 리뷰 데이터를 날짜별 리뷰 파일에 추가"""
+    entry = {
+        "ts": datetime.datetime.now().isoformat(timespec='seconds'),
+        "run_id": SPAN_SETTINGS["run_id"],
+        "app_id": app_id,
+        "game_name": game_name,
+        "date": date_str,
+        "language": language,
+    }
+    entry.update(data)
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _review_file_lock:
+        with open(review_file_for(save_dir, date_str), 'a', encoding='utf-8') as f:
+            f.write(line)
+
+def load_review_crawl_state(state_file=REVIEW_CRAWL_STATE_FILE):
+    """앱 ID -> 마지막 전체 탐색에서 본 최신 리뷰 ID 목록과 통계"""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def update_review_crawl_state(app_id, newest_ids, crawled, stop_reason, state_file=REVIEW_CRAWL_STATE_FILE):
+    """앱의 높은 수위 표시(최신 리뷰 ID들) 갱신 (다른 워커가 쓴 앱 기록은 저장 직전에 다시 읽어 유지)
+    
+    newest_ids가 비어 있으면 높은 수위 표시는 그대로 두고 통계만 기록한다.
+    """
+    state = load_review_crawl_state(state_file)
+    entry = state.get(app_id, {})
+    entry["known_ids"] = (newest_ids + [i for i in entry.get("known_ids", []) if i not in newest_ids])[:REVIEW_CRAWL_KNOWN_IDS]
+    entry["total"] = entry.get("total", 0) + crawled
+    entry["last_crawled"] = crawled
+    entry["last_stop"] = stop_reason
+    entry["updated"] = datetime.datetime.now().isoformat(timespec='seconds')
+    state[app_id] = entry
+    
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp_file = f"{state_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, state_file)
+
+def review_crawl_file_for(save_dir, date_str):
+    """날짜 폴더의 전체 탐색 리뷰 파일 (JSON Lines, 리뷰마다 한 줄)"""
+    return os.path.join(save_dir, f"review_crawl_{date_str}.jsonl")
+
+def open_reviews_dialog(driver, button_selectors, logger):
+    """'리뷰 모두 보기'를 눌러 대화상자를 열고 리뷰를 최신순으로 정렬 (최신순 적용 여부 반환, 열지 못하면 None)"""
+    for selector in button_selectors:
+        buttons = driver.find_elements(By.XPATH, selector)
+        if buttons and any(label in buttons[0].text for label in REVIEW_DIALOG_LABELS):
+            driver.execute_script("arguments[0].click();", buttons[0])
+            break
+    else:
+        logger.warning("'리뷰 모두 보기' 버튼을 찾을 수 없습니다")
+        return None
+    
+    opened = _wait_until(
+        driver,
+        lambda d: d.execute_script("const dialog = document.querySelector(arguments[0]);"
+                                   "return !!dialog && dialog.querySelector(arguments[1]) !== null;",
+                                   REVIEW_SELECTORS["reviews_dialog"], REVIEW_SELECTORS["review"]),
+        REVIEW_CRAWL_BATCH_WAIT * 2,
+        "리뷰 대화상자",
+        logger,
+    )
+    if not opened:
+        return None
+    
+    # 높은 수위 표시에서 멈추려면 최신 리뷰부터 읽어야 함
+    if driver.execute_script(REVIEW_SORT_SCRIPT, REVIEW_SELECTORS, REVIEW_SORT_LABELS, "button"):
+        time.sleep(READY_POLL_INTERVAL * 2)  # 정렬 메뉴 펼침 대기
+        if driver.execute_script(REVIEW_SORT_SCRIPT, REVIEW_SELECTORS, REVIEW_SORT_NEWEST_LABELS, "menu"):
+            # 정렬을 바꾸면 목록이 새로 그려지므로 이전 목록이 사라지고 다시 채워질 때까지 대기
+            wait_for_network_idle(driver, logger)
+            return True
+    logger.warning("리뷰를 최신순으로 정렬하지 못했습니다. 이미 저장된 리뷰에서 멈추지 않고 최대 개수까지 읽습니다.")
+    return False
+
+def crawl_all_reviews(driver, app_id, game_name, save_dir, date_str, button_selectors, logger, options=None):
+    """'리뷰 모두 보기' 대화상자를 최신순으로 스크롤하며 새 리뷰만 날짜별 파일에 바로 기록
+    
+    이미 저장된 리뷰 ID(높은 수위 표시)를 만나거나, 목록 끝에 닿거나, 최대 개수를 채우면 멈춘다.
+    리뷰는 배치마다 파일에 쓰고 리뷰 ID로 중복을 거른다. 높은 수위 표시는 빈틈 없이 끝까지 읽은 경우
+    (높은 수위 표시 도달 또는 목록 끝)에만 옮긴다. 최대 개수에서 멈췄는데 옮기면 다음 실행이 새 표시에서 멈춰
+    그 사이 리뷰를 영영 읽지 못하기 때문이다.
+    """
+    options = options or {}
+    max_reviews = options.get("deep_max_reviews") or REVIEW_CRAWL_MAX_REVIEWS
+    known_ids = set(load_review_crawl_state().get(app_id, {}).get("known_ids", []))
+    
+    sorted_newest = open_reviews_dialog(driver, button_selectors, logger)
+    if sorted_newest is None:
+        return 0
+    
+    newest_ids = []
+    seen_ids = set()
+    after_id = None
+    crawled = 0
+    empty_batches = 0
+    stop_reason = "max_reviews"
+    with open(review_crawl_file_for(save_dir, date_str), 'a', encoding='utf-8') as f:
+        while crawled < max_reviews:
+            batch = driver.execute_script(REVIEW_CRAWL_BATCH_SCRIPT, REVIEW_SELECTORS, after_id)
+            if batch is None:
+                stop_reason = "dialog_closed"
+                break
+            if batch:
+                after_id = next((raw["id"] for raw in reversed(batch) if raw["id"]), after_id)
+            fresh = [raw for raw in batch if review_id_for(raw) not in seen_ids]
+            if not fresh:
+                empty_batches += 1
+                if empty_batches >= REVIEW_CRAWL_EMPTY_BATCHES:
+                    stop_reason = "end"
+                    break
+                try:
+                    WebDriverWait(driver, REVIEW_CRAWL_BATCH_WAIT, poll_frequency=READY_POLL_INTERVAL).until(
+                        lambda d: d.execute_script(REVIEW_CRAWL_LAST_ID_SCRIPT, REVIEW_SELECTORS) != after_id)
+                except TimeoutException:
+                    pass
+                continue
+            
+            empty_batches = 0
+            reached_known = False
+            for raw in fresh:
+                review_id = review_id_for(raw)
+                if sorted_newest and review_id in known_ids:
+                    reached_known = True
+                    break
+                if review_id in seen_ids:
+                    continue  # 같은 배치에 같은 리뷰가 두 번 그려진 경우
+                seen_ids.add(review_id)
+                f.write(json.dumps({"app_id": app_id, "game_name": game_name, **structure_review(raw)},
+                                   ensure_ascii=False) + "\n")
+                if len(newest_ids) < REVIEW_CRAWL_KNOWN_IDS:
+                    newest_ids.append(review_id)
+                crawled += 1
+                if crawled >= max_reviews:
+                    break
+            f.flush()
+            if reached_known:
+                stop_reason = "known"
+                break
+    
+    try:
+        ActionChains(driver).send_keys(Keys.ESCAPE).perform()  # 대화상자 닫기
+    except Exception:
+        pass
+    if sorted_newest:
+        complete = stop_reason in ("known", "end")
+        update_review_crawl_state(app_id, newest_ids if complete else [], crawled, stop_reason)
+    logger.info(f"리뷰 전체 탐색 ({game_name}): 새 리뷰 {crawled}개, 종료 사유 {stop_reason}")
+    return crawled
+
+def app_locale(app_id, locale=None):
+    """앱의 (언어, 국가) (locale이 '언어-국가' 문자열이면 그 값 우선, 없으면 레지스트리, 기본값 한국어/한국)"""
+    app = APPS.get(app_id, {})
+    language = app.get("language", STORE_LANGUAGE)
+    country = app.get("country", STORE_COUNTRY)
+    if locale:
+        locale_language, _, locale_country = locale.partition("-")
+        language = locale_language or language
+        country = locale_country or country
+    return language, country
+
+def store_page_url(app_id, locale=None):
+    """앱의 Google Play 상세 페이지 URL (언어/국가 파라미터 포함, app_locale() 참고)"""
+    language, country = app_locale(app_id, locale)
+    return f"{STORE_BASE_URL}/store/apps/details?id={app_id}&hl={language}&gl={country}"
+
+def is_korean_page(driver, language=STORE_LANGUAGE):
+    """문서 언어(한국어면 리뷰 섹션 제목도)로 요청한 언어로 렌더링되었는지 확인"""
+    return driver.execute_script("""
+        const language = arguments[0];
+        const lang = (document.documentElement.lang || '').toLowerCase();
+        const heading = language === 'ko'
+            && Array.from(document.querySelectorAll('h2')).some(h => h.textContent.includes('평점'));
+        return lang.startsWith(language) || heading;
+    """, language)
+
+def capture_game_review_firefox(driver, app_id, game_name, save_dir, logger, options=None, image_sink=None,
+                                preloaded=False, date_str=None, locale=None):
+    """게임 리뷰 섹션 캡처 (Firefox 사용)
+    
+    image_sink가 주어지면 디코딩/인코딩/저장을 직접 하지 않고 캡처 작업을
+    image_sink(job)로 넘긴다 (CapturePipeline.submit).
+    preloaded가 True이면 현재 탭에 이미 페이지 로딩이 시작된 것으로 보고
+    driver.get()을 생략한다 (open_tabs 참고).
+    date_str은 파일 이름과 기록에 쓰는 날짜로, 없으면 options["date"] (실행 시작 날짜), 그것도 없으면 오늘이다.
+    locale('언어-국가', 작업 큐 작업의 locale)이 주어지면 레지스트리의 언어/국가 대신 사용한다.
+    """
+    url = store_page_url(app_id, locale)
+    limiter = rate_limiter_for(options)
+    app = APPS.get(app_id, {})
+    language, _ = app_locale(app_id, locale)
+    start_selectors = app.get("start_selectors") or START_ELEMENT_SELECTORS
+    end_selectors = app.get("end_selectors") or END_ELEMENT_SELECTORS
+    date_str = date_str or (options or {}).get("date") or datetime.datetime.now().strftime('%Y%m%d')
+    timer = StageTimer(app_id=app_id, date=date_str)
+    started = time.perf_counter()
     
     try:
         logger.info(f"캡처 시작: {game_name} ({url})")
-        driver.get(url)
-        time.sleep(8)  # 페이지 로딩 대기 시간 증가
-        
-        # 한국어로 강제 설정
-        logger.info("한국어 설정 적용")
-        driver.execute_script("""
-            // 언어 설정을 한국어로 변경
-            if (navigator.language !== 'ko-KR') {
-                Object.defineProperty(navigator, 'language', {
-                    get: function() { return 'ko-KR'; }
-                });
-            }
-            if (navigator.languages) {
-                Object.defineProperty(navigator, 'languages', {
-                    get: function() { return ['ko-KR', 'ko', 'en-US', 'en']; }
-                });
-            }
-        """)
+        load_store_page(driver, url, app_id, logger, limiter, preloaded)
+        timer.mark("navigate", preloaded=preloaded)
         
-        # 한국어 URL로 리다이렉트 시도
-        current_url = driver.current_url
-        if 'hl=ko' not in current_url:
-            korean_url = current_url + ('&' if '?' in current_url else '?') + 'hl=ko'
-            logger.info(f"한국어 URL로 리다이렉트: {korean_url}")
-            driver.get(korean_url)
-            time.sleep(3)
+        # 언어 렌더링 확인 (URL과 프로필 설정으로 처음부터 해당 언어로 요청하므로 보통 재요청 없음)
+        if is_korean_page(driver, language):
+            logger.info(f"페이지 언어 확인: {language}")
+        else:
+            logger.warning(f"요청한 언어({language}) 페이지가 아닙니다. 다시 요청합니다: {url}")
+            load_store_page(driver, url, app_id, logger, limiter)
+        timer.mark("locale_check")
         
         # 화면 크기 최적화를 위한 동적 조정
         logger.info("화면 크기 최적화 시작")
@@ -115,155 +1379,281 @@ def capture_game_review_firefox(driver, app_id, game_name, save_dir, logger):
             
             # 페이지 내용에 맞게 창 크기 조정
             driver.set_window_size(1920, 1200)
-            time.sleep(2)
-            
-            # 페이지가 완전히 로드될 때까지 대기
-            WebDriverWait(driver, 10).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
+            wait_for_layout_stable(driver, logger)
             
             logger.info("화면 크기 최적화 완료")
         except Exception as e:
             logger.warning(f"화면 크기 최적화 실패: {e}")
+        timer.mark("resize")
         
         # "리뷰 모두 보기" 버튼을 클릭하지 않고 기본 리뷰 섹션만 캡처
         logger.info(f"기본 리뷰 섹션 캡처 시작: {game_name} (버튼 클릭 없음)")
         
-        # 시작 요소 찾기 ('평점 및 리뷰' 텍스트를 포함하는 요소)
-        start_element = None
-        start_element_selectors = [
-            "//h2[text()='평점 및 리뷰']",
-            "//h2[contains(text(), '평점')]",
-            "//h2[contains(text(), '리뷰')]",
-            "//div[contains(text(), '평점 및 리뷰')]",
-            "//span[contains(text(), '평점 및 리뷰')]"
-        ]
+        # 시작/끝 요소를 한 번에 찾고 시작 요소로 스크롤
+        # 지난 실행에서 성공한 선택자를 먼저 시도하고, 실패하면 나머지 목록으로 넘어감
+        selector_cache_file = (options or {}).get("selector_cache_file", SELECTOR_CACHE_FILE)
+        cached = load_selector_cache(selector_cache_file).get(app_id, {})
+        cached_entry = cached.get("fingerprints", {}).get(cached.get("last_fingerprint"), {})
+        start_order = cached_selector_order(start_selectors, cached_entry.get("start_index"))
+        end_order = cached_selector_order(end_selectors, cached_entry.get("end_index"))
+        start_element_selectors = [start_selectors[i] for i in start_order]
+        end_element_selectors = [end_selectors[i] for i in end_order]
         
-        for i, selector in enumerate(start_element_selectors):
-            try:
-                start_element = driver.find_element(By.XPATH, selector)
-                logger.info(f"시작 요소 찾기 성공: '평점 및 리뷰' (선택자 {i+1}: {selector})")
-                break
-            except Exception as e:
-                logger.debug(f"시작 요소 선택자 {i+1} 실패: {selector} - {e}")
-                continue
+        locate_start = time.perf_counter()
+        anchors = locate_anchors(driver, start_element_selectors, end_element_selectors, scroll_to_start=True)
+        locate_ms = (time.perf_counter() - locate_start) * 1000
         
-        if start_element is None:
+        start_index = anchors["start_index"]
+        if start_index < 0:
             logger.error(f"시작 요소를 찾을 수 없습니다: '평점 및 리뷰'")
+            timer.mark("locate", ok=False)
+            record_manifest(options, app_id, game_name, date_str, "failed",
+                            seconds=time.perf_counter() - started, error="시작 요소 없음")
             return False
+        logger.info(f"시작 요소 찾기 성공: '평점 및 리뷰' (선택자 {start_order[start_index]+1}: {start_element_selectors[start_index]})")
         
-        # 끝 요소 찾기 ('리뷰 모두 보기' 텍스트를 포함하는 요소)
-        end_element = None
-        end_element_selectors = [
-            "//div[@role='button']//span[text()='리뷰 모두 보기']",
-            "//span[text()='리뷰 모두 보기']",
-            "//div[contains(text(), '리뷰 모두 보기')]",
-            "//button[contains(text(), '리뷰 모두 보기')]",
-            "//a[contains(text(), '리뷰 모두 보기')]",
-            "//div[contains(text(), '새로운 기능')]",
-            "//h3[contains(text(), '새로운 기능')]",
-            "//div[contains(text(), '부적절한 앱으로 신고')]",
-            "//a[contains(text(), '부적절한 앱으로 신고')]"
-        ]
-        
-        for i, selector in enumerate(end_element_selectors):
-            try:
-                end_element = driver.find_element(By.XPATH, selector)
-                logger.info(f"끝 요소 찾기 성공: (선택자 {i+1}: {selector})")
-                break
-            except Exception as e:
-                logger.debug(f"끝 요소 선택자 {i+1} 실패: {selector} - {e}")
-                continue
-        
-        if end_element is None:
+        end_index = anchors["end_index"]
+        if end_index < 0:
             logger.warning(f"끝 요소를 찾을 수 없습니다. 기본 높이로 캡처합니다.")
-            # 끝 요소를 찾지 못한 경우, 시작 요소에서 2000px 아래로 캡처
-            end_location = {'y': start_location['y'] + 2000}
-            end_size = {'height': 0}
         else:
-            end_location = end_element.location
-            end_size = end_element.size
+            logger.info(f"끝 요소 찾기 성공: (선택자 {end_order[end_index]+1}: {end_element_selectors[end_index]})")
         
-        # 시작 요소로 스크롤
-        logger.info(f"시작 요소로 스크롤: {game_name}")
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'start'});", start_element)
-        time.sleep(3)  # 스크롤 완료 대기
-        
-        # 전체 페이지 높이 설정 (전체 화면 캡처)
-        logger.info("전체 페이지 높이 설정")
-        total_height = driver.execute_script("return document.body.scrollHeight")
-        logger.info(f"전체 페이지 높이: {total_height}px")
+        cache_hit = (cached_entry and anchors["fingerprint"] == cached.get("last_fingerprint")
+                     and start_order[start_index] == cached_entry.get("start_index"))
+        logger.info(f"요소 찾기 소요 시간: {locate_ms:.1f}ms (선택자 캐시 {'적중' if cache_hit else '미적중'})")
+        try:
+            update_selector_cache(app_id, anchors["fingerprint"], start_order[start_index],
+                                  end_order[end_index] if end_index >= 0 else None, locate_ms,
+                                  cache_file=selector_cache_file)
+        except OSError as e:
+            logger.warning(f"선택자 캐시 저장 실패: {e}")
         
-        # 전체 화면 크기로 설정
-        driver.set_window_size(1920, total_height)
-        time.sleep(3)  # 크기 변경 후 안정화 대기
+        logger.info(f"시작 요소로 스크롤: {game_name}")
+        wait_for_layout_stable(driver, logger)  # 스크롤 완료 대기
         
-        # 페이지가 완전히 렌더링될 때까지 대기
-        WebDriverWait(driver, 10).until(
-            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        # 시작 요소와 끝 요소 위치 정보 가져오기 (스크롤 후 레이아웃 기준, 찾은 선택자만 재평가)
+        anchors = locate_anchors(
+            driver,
+            [start_element_selectors[start_index]],
+            [end_element_selectors[end_index]] if end_index >= 0 else []
         )
+        if anchors["start_location"] is None:
+            logger.error(f"최종 레이아웃에서 시작 요소를 찾을 수 없습니다: '평점 및 리뷰'")
+            record_manifest(options, app_id, game_name, date_str, "failed",
+                            seconds=time.perf_counter() - started, error="최종 레이아웃에서 시작 요소 없음")
+            return False
+        start_location = anchors["start_location"]
+        start_size = anchors["start_size"]
+        if anchors["end_location"] is None:
+            # 끝 요소를 찾지 못한 경우, 시작 요소에서 2000px 아래로 캡처
+            end_location = {'x': start_location['x'], 'y': start_location['y'] + 2000}
+            end_size = {'width': 0, 'height': 0}
+        else:
+            end_location = anchors["end_location"]
+            end_size = anchors["end_size"]
+        page_width = anchors["page_width"]
+        page_height = anchors["page_height"]
+        timer.mark("locate")
         
-        # 추가로 스크롤하여 모든 콘텐츠가 로드되도록 함
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
-        
-        # 스크린샷 촬영
-        logger.info(f"전체 페이지 스크린샷 촬영: {game_name}")
-        screenshot = driver.get_screenshot_as_png()
-        img = Image.open(io.BytesIO(screenshot))
-        
-        logger.info(f"전체 스크린샷 크기: {img.width} x {img.height}")
-        
-        # 시작 요소와 끝 요소 위치 정보 가져오기
-        start_location = start_element.location
-        start_size = start_element.size
-        end_location = end_element.location
-        end_size = end_element.size
-        
+        logger.info(f"전체 페이지 크기: {page_width} x {page_height}")
         logger.info(f"시작 요소 위치: x={start_location['x']}, y={start_location['y']}")
         logger.info(f"시작 요소 크기: width={start_size['width']}, height={start_size['height']}")
         logger.info(f"끝 요소 위치: x={end_location['x']}, y={end_location['y']}")
         logger.info(f"끝 요소 크기: width={end_size['width']}, height={end_size['height']}")
         
-        # 캡처 영역 계산 (고정 크기: 1000 x 1800 - 우측 사이드바 제외)
-        crop_width = 1000  # 너비를 1000px로 설정 (우측 사이드바 제외)
+        # 캡처 영역 계산 (기본 크기: 1000 x 1800 - 우측 사이드바 제외, 레지스트리에서 앱별 지정 가능)
+        crop_width = app.get("crop_width", 1000)  # 기본 너비 1000px (우측 사이드바 제외)
+        crop_height = app.get("crop_height", 1800)
         crop_left = max(0, start_location['x'] - 100)  # 시작 요소에서 왼쪽으로 100px 여백
         crop_top = max(0, start_location['y'] - 100)  # 시작 요소 위쪽 100px 여유
-        crop_right = min(img.width, crop_left + crop_width)  # 조정된 너비 적용
+        crop_right = min(page_width, crop_left + crop_width)  # 조정된 너비 적용
         
-        # 고정 높이 1800px로 설정
-        crop_bottom = min(img.height, crop_top + 1800)  # 시작점에서 1800px 아래까지
+        # 고정 높이 (기본 1800px)로 설정
+        crop_bottom = min(page_height, crop_top + crop_height)  # 시작점에서 지정 높이만큼 아래까지
         
-        # 최소 캡처 높이 보장 (최소 1800px)
-        min_height = 1800
+        # 최소 캡처 높이 보장
+        min_height = crop_height
         if crop_bottom - crop_top < min_height:
-            crop_bottom = min(img.height, crop_top + min_height)
+            crop_bottom = min(page_height, crop_top + min_height)
         
         logger.info(f"최종 크롭 영역: left={crop_left}, top={crop_top}, right={crop_right}, bottom={crop_bottom}")
         
-        # 크롭 및 저장
-        if crop_right > crop_left and crop_bottom > crop_top:
-            cropped_img = img.crop((crop_left, crop_top, crop_right, crop_bottom))
-        else:
-            logger.warning(f"크롭 영역이 유효하지 않습니다. 전체 화면을 캡처합니다.")
-            cropped_img = img
+        if not (crop_right > crop_left and crop_bottom > crop_top):
+            logger.warning(f"크롭 영역이 유효하지 않습니다. 페이지 상단 영역을 캡처합니다.")
+            crop_left, crop_top = 0, 0
+            crop_right, crop_bottom = page_width, min(page_height, min_height)
+        
+        # 캡처 영역과 같은 리뷰 섹션의 텍스트를 구조화하여 저장 (실패해도 캡처는 계속)
+        if (options or {}).get("extract_reviews", True):
+            try:
+                review_data = extract_review_data(driver, start_element_selectors[start_index], crop_top, crop_bottom)
+                record_review_data(save_dir, app_id, game_name, date_str, language, review_data)
+                logger.info(f"리뷰 텍스트 추출: 평점 {review_data['rating']}, "
+                            f"리뷰 수 {review_data['rating_count_text'] or '-'}, 보이는 리뷰 {len(review_data['reviews'])}개")
+                timer.mark("extract_reviews", reviews=len(review_data["reviews"]))
+            except Exception as e:
+                logger.warning(f"리뷰 텍스트 추출 실패 ({game_name}): {e}")
+                timer.mark("extract_reviews", ok=False, error=type(e).__name__)
         
-        # 파일 저장
-        filename = f"{game_name}_{datetime.datetime.now().strftime('%Y%m%d')}.png"
-        filepath = os.path.join(save_dir, filename)
-        cropped_img.save(filepath)
+        # 캡처 영역만 렌더링/전송
+        logger.info(f"리뷰 영역 스크린샷 촬영: {game_name}")
+        job = {
+            "game_name": game_name,
+            "save_dir": save_dir,
+            "app_id": app_id,
+            "date_str": date_str,
+            "started": started,
+            "left": crop_left,
+            "width": crop_right - crop_left,
+            "height": crop_bottom - crop_top,
+            "tiles": capture_region_tiles(driver, crop_left, crop_top,
+                                          crop_right - crop_left, crop_bottom - crop_top, logger),
+        }
+        timer.mark("screenshot", bytes=sum(len(tile[0]) for tile in job["tiles"]), tiles=len(job["tiles"]))
         
-        logger.info(f"캡처 완료: {filename} (크기: {cropped_img.width} x {cropped_img.height})")
-        return True
+        # 선택: '리뷰 모두 보기' 대화상자에서 지난 실행 이후의 새 리뷰만 탐색 (스크린샷은 이미 찍었으므로 화면 변경 무관)
+        if (options or {}).get("deep_reviews"):
+            button_selectors = end_element_selectors[end_index:end_index + 1] if end_index >= 0 else []
+            try:
+                crawled = crawl_all_reviews(driver, app_id, game_name, save_dir, date_str,
+                                            button_selectors + end_element_selectors, logger, options)
+                timer.mark("deep_reviews", reviews=crawled)
+            except Exception as e:
+                logger.warning(f"리뷰 전체 탐색 실패 ({game_name}): {e}")
+                timer.mark("deep_reviews", ok=False, error=type(e).__name__)
+        
+        if image_sink is not None:
+            # 디코딩/인코딩/저장은 파이프라인 인코더 스레드에서 처리
+            image_sink(job)
+            logger.info(f"캡처 작업을 인코딩 큐에 전달: {game_name}")
+            return True
         
+        # 파일 저장 (설정된 형식으로 바로 인코딩)
+        encode_capture_job(job, options, logger)
+        return True
+    
+    except PageBlockedError as e:
+        # 호출하는 쪽에서 백오프 후 해당 게임만 다시 시도
+        logger.warning(f"차단 페이지 감지 ({game_name}): {e}")
+        timer.mark("blocked", ok=False, error=str(e))
+        record_manifest(options, app_id, game_name, date_str, "blocked",
+                        seconds=time.perf_counter() - started, error=str(e))
+        raise
     except Exception as e:
         logger.error(f"캡처 실패 ({game_name}): {e}")
+        timer.mark("failed", ok=False, error=type(e).__name__)
+        record_manifest(options, app_id, game_name, date_str, "failed",
+                        seconds=time.perf_counter() - started, error=str(e))
         return False
 
-def update_html_with_new_images(save_dir, logger):
-    """새로 캡처된 이미지들을 HTML 파일에 업데이트"""
+def fetch_review_data(client, app_id, logger, limiter=None):
+    """앱 상세 페이지를 HTTP로 받아 리뷰 데이터 반환
+    
+    차단 페이지이면 PageBlockedError, 리뷰 섹션을 파싱하지 못하면 (평점도 리뷰도 없음) ValueError를 발생시켜
+    빈 데이터의 해시가 스냅샷과 같다는 이유로 캡처를 건너뛰지 않게 한다.
+    """
+    language = APPS.get(app_id, {}).get("language", STORE_LANGUAGE)
+    if limiter:
+        limiter.acquire()
+    try:
+        status, headers, body = client.get(store_page_url(app_id), {"Accept-Language": f"{language},en;q=0.5"})
+    except Exception:
+        if limiter:
+            limiter.release(ok=False)
+        raise
+    
+    reason = detect_block_response(status, headers, body)
+    if limiter:
+        backoff = limiter.release(reason, app_id, ok=status == 200)
+        if reason:
+            logger.warning(f"모든 워커의 요청을 {backoff:.0f}초 동안 중단합니다 (사유: {reason})")
+    if reason:
+        raise PageBlockedError(reason)
+    if status != 200:
+        raise OSError(f"HTTP {status}")
+    data = structure_review_data(parse_store_page(body.decode('utf-8', errors='replace'), REVIEW_SELECTORS))
+    if not has_review_data(data):
+        raise ValueError("리뷰 섹션을 찾지 못했습니다 (평점/리뷰 없음)")
+    return data
+
+def fast_path_targets(games, save_dir, date_str, options, logger, snapshot_file=SNAPSHOT_FILE, threads=FETCH_THREADS):
+    """HTTP로 리뷰 데이터를 확인하여 브라우저 캡처가 필요한 게임만 반환
+    
+    (캡처할 게임 딕셔너리, 이번에 받은 데이터) 튜플을 반환한다. 데이터가 마지막 스냅샷과 같고 이전 날짜 이미지가
+    있는 게임은 변경 없음으로 기록하고 (표시 파일, 리뷰 텍스트, 매니페스트) 캡처 대상에서 뺀다.
+    스냅샷은 캡처가 끝난 뒤 commit_snapshots()로 갱신한다.
+    """
+    options = options or {}
+    snapshots = load_snapshots(snapshot_file)
+    limiter = rate_limiter_for(options)
+    base_dir = os.path.dirname(os.path.abspath(save_dir))
+    client = StoreClient()
+    start = time.perf_counter()
+    
+    def check(app_id):
+        started = time.perf_counter()
+        with timing_span("http_fetch", app_id=app_id, date=date_str) as span:
+            data = fetch_review_data(client, app_id, logger, limiter)
+            span["reviews"] = len(data["reviews"])
+        return data, time.perf_counter() - started
+    
+    fetched = {}
+    targets = {}
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = {app_id: executor.submit(check, app_id) for app_id in games}
+        for app_id, game_name in games.items():
+            try:
+                data, seconds = futures[app_id].result()
+            except (PageBlockedError, OSError, http.client.HTTPException, ValueError, sqlite3.Error) as e:
+                logger.warning(f"HTTP 확인 실패, 브라우저로 캡처합니다 ({game_name}): {e}")
+                targets[app_id] = game_name
+                continue
+            
+            signature = review_signature(data)
+            fetched[app_id] = {"signature": signature, "data": data}
+            if snapshots.get(app_id, {}).get("signature") != signature:
+                logger.info(f"리뷰 데이터 변경됨: {game_name} (평점 {data['rating']}, "
+                            f"리뷰 수 {data['rating_count_text'] or '-'})")
+                targets[app_id] = game_name
+                continue
+            previous, _ = find_previous_capture(base_dir, app_id, game_name, date_str, options.get("manifest_dir"))
+            if previous is None:
+                targets[app_id] = game_name
+                continue
+            
+            files = []
+            if options.get("unchanged_mode", "write") != "skip":
+                files.append(write_unchanged_marker(save_dir, game_name, date_str, previous,
+                                                    signature=signature, source="http"))
+            if options.get("extract_reviews", True):
+                record_review_data(save_dir, app_id, game_name, date_str,
+                                   APPS.get(app_id, {}).get("language", STORE_LANGUAGE),
+                                   dict(data, source="http"))
+            record_manifest(options, app_id, game_name, date_str, "unchanged", files, seconds=seconds,
+                            same_as=previous, signature=signature, source="http")
+            logger.info(f"리뷰 데이터 변경 없음: {game_name} -> {previous}")
+    client.close()
+    
+    logger.info(f"HTTP 확인: {len(games)}개 앱 {time.perf_counter() - start:.1f}초 "
+                f"(요청 {client.stats['requests']}건, 연결 재사용 {client.stats['reused']}건, "
+                f"{client.stats['bytes'] / 1024:.0f}KB), 브라우저 캡처 대상 {len(targets)}개")
+    return targets, fetched
+
+def commit_snapshots(fetched, date_str, options, snapshot_file=SNAPSHOT_FILE):
+    """오늘 캡처가 끝난(또는 변경 없음으로 기록된) 앱만 스냅샷 갱신 (캡처 실패 앱은 다음 실행에서 다시 비교)"""
+    manifest = load_manifest(date_str, options["manifest_dir"]) if options.get("manifest_dir") else {}
+    snapshots = load_snapshots(snapshot_file)
+    for app_id, fetched_entry in fetched.items():
+        if manifest.get(app_id, {}).get("status") in ("done", "unchanged"):
+            snapshots[app_id] = dict(fetched_entry, date=date_str)
+    save_snapshots(snapshots, snapshot_file)
+
+def update_html_with_new_images(save_dir, logger, date_str=None):
+    """새로 캡처된 이미지들을 HTML 파일에 업데이트
+    
+    date_str은 대시보드에 추가할 날짜로, 캡처한 날짜 폴더와 맞도록 실행 시작 날짜(작업 큐 모드에서는 작업 날짜)를
+    넘긴다. 없으면 오늘이다.
+    """
     try:
         html_file = 'aos_review.html'
         
@@ -271,8 +1661,8 @@ def update_html_with_new_images(save_dir, logger):
             logger.error(f"HTML 파일을 찾을 수 없습니다: {html_file}")
             return False
         
-        # 오늘 날짜
-        today = datetime.datetime.now().strftime('%Y%m%d')
+        # 캡처 날짜 (자정을 넘겨 끝난 실행도 시작 날짜로 기록)
+        today = date_str or datetime.datetime.now().strftime('%Y%m%d')
         today_formatted = f"{today[:4]}-{today[4:6]}-{today[6:8]}"
         
         # HTML 파일 읽기
@@ -365,6 +1755,16 @@ def update_html_with_new_images(save_dir, logger):
                             changes_made += 1
                             logger.info(f"availableDates 배열 업데이트: {today} 추가됨 (총 {len(dates)}개 날짜)")
                 
+                # 3. games 배열을 앱 레지스트리와 동기화
+                games_pattern = r"const games = \[.*?\n\s*\];"
+                games_match = re.search(games_pattern, script.string, re.DOTALL)
+                if games_match:
+                    new_games = dashboard_games_js(APPS.values())
+                    if games_match.group(0) != new_games:
+                        script.string = script.string.replace(games_match.group(0), new_games)
+                        changes_made += 1
+                        logger.info(f"games 배열을 앱 레지스트리와 동기화 ({sum(1 for app in APPS.values() if app['dashboard'])}개 게임)")
+                
                 # 페이지 로드 시 기본 날짜 업데이트
                 default_date_pattern = r"showDateContent\('([^']+)'\);"
                 default_date_match = re.search(default_date_pattern, script.string)
@@ -391,7 +1791,7 @@ def update_html_with_new_images(save_dir, logger):
         else:
             logger.info("변경할 내용이 없습니다. 모든 항목이 이미 최신 상태입니다.")
             return True
-            
+    
     except Exception as e:
         logger.error(f"HTML 업데이트 중 오류 발생: {e}")
         import traceback
@@ -450,6 +1850,9 @@ def git_commit_and_push(logger, git_dir=None):
         logger.info("변경된 파일:")
         logger.info(status_result.stdout)
         
+        timer = StageTimer()
+        timer.mark("git_status")
+        
         # git add .
         logger.info("git add . 실행 중...")
         add_result = subprocess.run(['git', 'add', '.'], 
@@ -458,6 +1861,7 @@ def git_commit_and_push(logger, git_dir=None):
                                    cwd=git_dir,
                                    encoding='utf-8')
         logger.info("git add 완료")
+        timer.mark("git_add")
         
         # git commit
         commit_message = "Update and add new log files and scripts"
@@ -468,6 +1872,7 @@ def git_commit_and_push(logger, git_dir=None):
                                       cwd=git_dir,
                                       encoding='utf-8')
         logger.info("git commit 완료")
+        timer.mark("git_commit")
         if commit_result.stdout:
             logger.info(commit_result.stdout)
         
@@ -479,13 +1884,14 @@ def git_commit_and_push(logger, git_dir=None):
                                     cwd=git_dir,
                                     encoding='utf-8')
         logger.info("git push 완료")
+        timer.mark("git_push")
         if push_result.stdout:
             logger.info(push_result.stdout)
         
         logger.info("Git 작업 성공!")
         logger.info("=" * 50)
         return True
-        
+    
     except subprocess.CalledProcessError as e:
         logger.error(f"Git 작업 실패: {e}")
         if e.stdout:
@@ -501,52 +1907,492 @@ def git_commit_and_push(logger, git_dir=None):
         logger.info("=" * 50)
         return False
 
-def main():
+def open_tabs(driver, games, logger, limiter=None):
+    """게임별 상세 페이지를 새 탭에서 동시에 로딩 시작하고 {게임 이름: 탭 핸들} 반환
+    
+    location 변경은 페이지 로딩 완료를 기다리지 않으므로 모든 탭의 네트워크
+    대기 시간이 겹친다. 요청 제한기가 있으면 탭마다 요청 슬롯을 받은 뒤 연다.
+    슬롯은 탭을 캡처할 때 반환되므로 TAB_SLOT_TIMEOUT 안에 슬롯을 받지 못하면
+    (차단 후 시험 요청 하나만 허용되는 중이거나 요청 제한 대기) 나머지 게임은 탭을 열지 않고
+    캡처할 때 차례로 불러온다.
+    """
+    handles = {}
+    for app_id, game_name in games.items():
+        if limiter:
+            try:
+                limiter.acquire(timeout=TAB_SLOT_TIMEOUT)
+            except TimeoutError:
+                logger.info(f"요청 슬롯 대기로 탭 미리 열기 중단: {len(games) - len(handles)}개 게임은 차례로 불러옵니다")
+                break
+        driver.switch_to.new_window('tab')
+        driver.execute_script("window.location.href = arguments[0];", store_page_url(app_id))
+        handles[game_name] = driver.current_window_handle
+    logger.info(f"탭 {len(handles)}개에서 페이지 로딩 시작")
+    return handles
+
+def capture_games_sequential(driver, games, save_dir, logger, options=None):
+    """하나의 WebDriver로 게임들을 순서대로 캡처하고 게임별 결과를 반환
+    
+    인코더 스레드가 설정되어 있으면 앱 k의 인코딩/저장이 앱 k+1의 페이지 로딩과
+    겹쳐 실행된다. options["tabs"]가 1 이상이면 그 수만큼 게임 페이지를 탭으로
+    한꺼번에 열어 로딩한 뒤 탭을 하나씩 전환하며 캡처한다.
+    """
+    options = options or {}
+    results = {}
+    blocked = []
+    limiter = rate_limiter_for(options)
+    
+    pipeline = None
+    if options.get("encoder_threads", 0) > 0:
+        pipeline = CapturePipeline(options, logger, options["encoder_threads"], options.get("queue_depth", 4))
+    
+    tab_batch = options.get("tabs", 0)
+    items = list(games.items())
+    batches = [items[i:i + tab_batch] for i in range(0, len(items), tab_batch)] if tab_batch > 0 else [items]
+    main_handle = driver.current_window_handle
+    
+    for batch in batches:
+        handles = open_tabs(driver, dict(batch), logger, limiter) if tab_batch > 0 else {}
+        
+        for app_id, game_name in batch:
+            logger.info(f"게임 캡처 시작: {game_name} ({app_id})")
+            
+            start = time.perf_counter()
+            if game_name in handles:
+                driver.switch_to.window(handles[game_name])
+            try:
+                captured = capture_game_review_firefox(driver, app_id, game_name, save_dir, logger, options,
+                                                       image_sink=pipeline.submit if pipeline else None,
+                                                       preloaded=game_name in handles)
+            except PageBlockedError:
+                blocked.append((app_id, game_name))
+                captured = False
+            if game_name in handles:
+                # 캡처가 끝난 탭은 닫아서 메모리 반환
+                driver.close()
+                driver.switch_to.window(main_handle)
+            if pipeline:
+                pipeline.record_capture_time(time.perf_counter() - start)
+            
+            if captured:
+                logger.info(f"{game_name} 캡처 성공!")
+                results[game_name] = True
+            else:
+                logger.error(f"{game_name} 캡처 실패")
+                results[game_name] = False
+            
+            logger.info("=" * 50)
+    
+    # 차단 페이지가 나온 게임만 다시 시도 (요청 제한기가 백오프가 끝날 때까지 대기)
+    for attempt in range(options.get("block_retries", 0)):
+        if not blocked:
+            break
+        retry, blocked = blocked, []
+        logger.info(f"차단 감지된 게임 재시도 ({attempt + 1}/{options['block_retries']}): "
+                    f"{', '.join(game_name for _, game_name in retry)}")
+        for app_id, game_name in retry:
+            try:
+                results[game_name] = capture_game_review_firefox(driver, app_id, game_name, save_dir, logger, options,
+                                                                 image_sink=pipeline.submit if pipeline else None)
+            except PageBlockedError:
+                blocked.append((app_id, game_name))
+    if blocked:
+        logger.error(f"차단으로 캡처하지 못한 게임: {', '.join(game_name for _, game_name in blocked)}")
+    
+    if pipeline:
+        # 남은 인코딩 작업 완료 대기 후 인코딩 실패를 결과에 반영
+        for game_name, encoded in pipeline.close().items():
+            if not encoded:
+                results[game_name] = False
+        pipeline.log_stats(logger)
+    
+    return results
+
+def _capture_worker(games, save_dir, options=None):
+    """프로세스 풀 워커: 자체 Firefox 인스턴스로 할당된 게임들을 캡처"""
+    # 워커 프로세스마다 로깅과 span 기록을 다시 설정 (Windows spawn 방식 대응)
+    logger = setup_logging()
+    configure_spans(options.get("run_id") if options else None, options.get("span_file") if options else None)
+    if options and options.get("registry"):
+        use_registry(options["registry"])
+    
+    try:
+        driver = setup_driver(options)
+    except Exception as e:
+        logger.error(f"워커 Firefox WebDriver 초기화 실패 (pid={os.getpid()}): {e}")
+        return {game_name: False for game_name in games.values()}
+    
+    try:
+        return capture_games_sequential(driver, games, save_dir, logger, options)
+    finally:
+        try:
+            driver.quit()
+        except:
+            pass
+
+def capture_games_parallel(games, save_dir, logger, workers, options=None):
+    """여러 헤드리스 Firefox 워커로 게임들을 병렬 캡처하고 결과를 합침"""
+    workers = max(1, min(workers, len(games)))
+    
+    # 게임 목록을 워커 수만큼 나눔 (워커당 브라우저 1개를 재사용)
+    chunks = [{} for _ in range(workers)]
+    for i, (app_id, game_name) in enumerate(games.items()):
+        chunks[i % workers][app_id] = game_name
+    
+    logger.info(f"병렬 캡처 시작: 워커 {workers}개")
+    results = {}
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_capture_worker, chunk, save_dir, options): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                results.update(future.result())
+            except Exception as e:
+                logger.error(f"캡처 워커 오류: {e}")
+                results.update({game_name: False for game_name in chunk.values()})
+    
+    return results
+
+def capture_from_queue(queue_path, date, base_dir, logger, options=None):
+    """작업 큐에서 캡처 작업을 임대하여 남은 작업이 없을 때까지 처리하고 게임별 결과 반환
+    
+    다른 워커가 임대 중인 작업이 남아 있으면 그 임대가 끝나거나 만료될 때까지 기다렸다가
+    만료된 작업을 이어서 처리한다. 이미지는 base_dir/<날짜>/에 저장된다.
+    """
+    queue = WorkQueue(queue_path)
+    owner = worker_name()
+    driver = None
+    results = {}
+    try:
+        while True:
+            job = queue.lease(owner, date)
+            if job is None:
+                if queue.counts(date).get("leased", 0) == 0:
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+            
+            game_name = job["game_name"]
+            logger.info(f"작업 임대: {game_name} ({job['app_id']}, {job['date']}, {job['locale']}, "
+                        f"시도 {job['attempts']}/{job['max_attempts']})")
+            save_dir = os.path.join(base_dir, job["date"])
+            os.makedirs(save_dir, exist_ok=True)
+            error = None
+            with LeaseHeartbeat(queue, job, owner) as heartbeat:
+                try:
+                    if driver is None:
+                        driver = setup_driver(options)
+                    ok = capture_game_review_firefox(driver, job["app_id"], game_name, save_dir, logger, options,
+                                                     date_str=job["date"], locale=job["locale"])
+                except PageBlockedError as e:
+                    # 작업은 큐로 돌아가고, 요청 제한기가 모든 워커의 다음 요청을 늦춤
+                    ok, error = False, f"차단 페이지: {e}"
+                except Exception as e:
+                    # 브라우저가 비정상 상태일 수 있으므로 다음 작업에서 새로 시작
+                    ok, error = False, str(e)
+                    if driver is not None:
+                        try:
+                            driver.quit()
+                        except:
+                            pass
+                        driver = None
+            
+            saved = sorted(name for name in os.listdir(save_dir) if name.startswith(f"{game_name}_{job['date']}."))
+            if ok and not saved and (options or {}).get("unchanged_mode") != "skip":
+                ok, error = False, "저장된 이미지 없음"
+            if heartbeat.lost or not queue.complete(job, owner, ok, result=",".join(saved) if ok else None,
+                                                    error=None if ok else (error or "캡처 실패")):
+                logger.warning(f"작업 임대를 잃어 결과를 기록하지 못했습니다: {game_name}")
+            results[game_name] = ok
+            logger.info(f"작업 {'완료' if ok else '실패'}: {game_name}")
+            logger.info("=" * 50)
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except:
+                pass
+        queue.close()
+    return results
+
+def _queue_worker(queue_path, date, base_dir, options=None):
+    """프로세스 풀 워커: 작업 큐에서 작업을 가져와 처리"""
+    logger = setup_logging()
+    configure_spans(options.get("run_id") if options else None, options.get("span_file") if options else None)
+    if options and options.get("registry"):
+        use_registry(options["registry"])
+    return capture_from_queue(queue_path, date, base_dir, logger, options)
+
+def capture_games_from_queue(queue_path, date, base_dir, logger, workers, options=None):
+    """작업 큐 워커 workers개를 실행하고 결과를 합침 (0이면 캡처하지 않음)"""
+    if workers <= 0:
+        return {}
+    if workers == 1:
+        return capture_from_queue(queue_path, date, base_dir, logger, options)
+    
+    logger.info(f"작업 큐 병렬 처리 시작: 워커 {workers}개")
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_queue_worker, queue_path, date, base_dir, options) for _ in range(workers)]
+        for future in as_completed(futures):
+            try:
+                results.update(future.result())
+            except Exception as e:
+                logger.error(f"작업 큐 워커 오류: {e}")
+    return results
+
+def refresh_review_store(review_store, base_dir, dates, logger):
+    """날짜 폴더의 리뷰 텍스트를 리뷰 저장소에 적재하고 대시보드가 읽는 평점 지표 (rating_summary.json) 갱신
+    
+    실패해도 캡처/HTML 업데이트는 계속하도록 경고만 남기고 False를 반환한다.
+    """
+    try:
+        store = ReviewStore(review_store)
+        try:
+            ingest_dates(store, base_dir, dates, logger=logger)
+            with timing_span("rating_series", date=dates[-1]):
+                update_rating_series(store, list(APPS.values()), base_dir, logger=logger)
+        finally:
+            store.close()
+        return True
+    except (OSError, sqlite3.Error, RuntimeError) as e:
+        logger.warning(f"리뷰 저장소 적재/평점 집계 실패: {e}")
+        return False
+
+def publish_when_finished(queue_path, date, save_dir, logger, timeout, review_store=None):
+    """해당 날짜의 모든 작업이 끝나면 리뷰 저장소 적재, HTML 업데이트와 Git 작업을 한 번만 실행 (코디네이터)"""
+    queue = WorkQueue(queue_path)
+    try:
+        deadline = time.time() + timeout
+        while not queue.day_finished(date):
+            if time.time() > deadline:
+                logger.error(f"작업 완료 대기 시간 초과: {queue.counts(date)}")
+                return False
+            time.sleep(POLL_INTERVAL)
+        
+        counts = queue.counts(date)
+        logger.info(f"{date} 작업 종료: 완료 {counts.get('done', 0)}개, 실패 {counts.get('failed', 0)}개")
+        if not queue.claim_publish(date, worker_name()):
+            logger.info("다른 코디네이터가 이미 게시했습니다.")
+            return True
+        
+        if review_store:
+            refresh_review_store(review_store, os.path.dirname(os.path.abspath(save_dir)), [date], logger)
+        
+        logger.info("HTML 파일 업데이트 시작")
+        with timing_span("html_update", date=date) as span:
+            html_updated = update_html_with_new_images(save_dir, logger, date_str=date)
+            span["updated"] = html_updated
+        git_success = git_commit_and_push(logger, git_dir=r'D:\aos_review')
+        return html_updated and git_success and counts.get("done", 0) > 0
+    finally:
+        queue.close()
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="Google Play 리뷰 자동 캡처 및 HTML 업데이트")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="동시에 실행할 Firefox 워커 수 (기본값: 1, 순차 캡처)")
+    parser.add_argument("--format", choices=sorted(IMAGE_FORMATS), default=DEFAULT_IMAGE_FORMAT,
+                        help=f"캡처 이미지 저장 형식 (기본값: {DEFAULT_IMAGE_FORMAT})")
+    parser.add_argument("--quality", type=int, default=None,
+                        help="이미지 품질 (미지정 시 형식별 기본값 사용)")
+    parser.add_argument("--keep-png", action="store_true",
+                        help="선택한 형식과 함께 무손실 PNG 원본도 저장")
+    parser.add_argument("--encoder-threads", type=int, default=2,
+                        help="이미지 디코딩/인코딩/저장 스레드 수 (0이면 브라우저 스레드에서 바로 처리)")
+    parser.add_argument("--queue-depth", type=int, default=4,
+                        help="브라우저와 인코더 사이 작업 큐 최대 크기")
+    parser.add_argument("--tabs", type=int, default=0,
+                        help="한 Firefox에서 동시에 로딩할 탭 수 (0이면 탭을 사용하지 않음)")
+    parser.add_argument("--block-resources", action="store_true",
+                        help="로컬 프록시로 추적기/분석/동영상 등 캡처에 불필요한 리소스 차단")
+    parser.add_argument("--blocklist", default=None,
+                        help="차단 목록 JSON 파일 (hosts, urls, destinations, content_types)")
+    parser.add_argument("--asset-cache", action="store_true",
+                        help="로컬 프록시의 디스크 캐시로 정적 리소스(JS, 폰트, 아이콘)를 모든 워커가 공유")
+    parser.add_argument("--asset-cache-mb", type=int, default=512,
+                        help="정적 리소스 캐시 최대 크기 (MB)")
+    parser.add_argument("--registry", default=REGISTRY_FILE,
+                        help="캡처 대상 앱 레지스트리 파일 (기본값: apps.json)")
+    parser.add_argument("--shard", default=None,
+                        help="'인덱스/개수' 형식으로 지정하면 앱 ID 해시로 나눈 해당 샤드의 앱만 캡처 (예: 0/4)")
+    parser.add_argument("--queue", default=None,
+                        help="작업 큐 SQLite 파일 (지정하면 오늘 작업을 추가하고 큐에서 가져와 캡처, "
+                             "로컬 디스크의 한 호스트 전용 파일)")
+    parser.add_argument("--coordinate", action="store_true",
+                        help="작업 큐 모드에서 모든 작업이 끝날 때까지 기다린 뒤 HTML 업데이트와 Git 작업 실행 "
+                             "(--workers 0이면 캡처 없이 코디네이터만)")
+    parser.add_argument("--rate-limit", type=float, default=0,
+                        help=f"모든 워커가 공유하는 분당 스토어 페이지 요청 수 (기본값: 0, 제한 없음; 권장값: {DEFAULT_RATE_PER_MINUTE})")
+    parser.add_argument("--rate-burst", type=int, default=DEFAULT_BURST,
+                        help="요청 제한기가 연속으로 허용하는 최대 요청 수")
+    parser.add_argument("--rate-limit-file", default=None,
+                        help="요청 제한기 상태 파일 (기본값: 작업 큐와 같은 폴더 또는 .cache/rate_limiter.sqlite)")
+    parser.add_argument("--block-retries", type=int, default=2,
+                        help="차단/동의/캡차 페이지가 나온 게임을 백오프 후 다시 시도하는 횟수")
+    parser.add_argument("--unchanged", choices=UNCHANGED_MODES, default="write",
+                        help="이전 날짜 이미지와 차이가 없을 때: write(그대로 저장), "
+                             "marker(이전 이미지를 가리키는 .unchanged.json만 저장, 대시보드가 이전 이미지 표시), "
+                             "skip(저장 안 함)")
+    parser.add_argument("--no-reviews", action="store_true",
+                        help="리뷰 텍스트(평점, 별점 분포, 보이는 리뷰)를 reviews_날짜.jsonl에 저장하지 않음")
+    parser.add_argument("--deep-reviews", action="store_true",
+                        help="스크린샷 후 '리뷰 모두 보기' 대화상자를 최신순으로 스크롤하며 지난 실행 이후의 새 리뷰를 "
+                             "review_crawl_날짜.jsonl에 저장")
+    parser.add_argument("--deep-max-reviews", type=int, default=REVIEW_CRAWL_MAX_REVIEWS,
+                        help=f"앱마다 한 번에 읽을 최대 리뷰 수 (기본값: {REVIEW_CRAWL_MAX_REVIEWS})")
+    parser.add_argument("--review-store", nargs="?", const=REVIEW_STORE_FILE, default=None,
+                        help=f"지정하면 캡처 후 오늘 리뷰 텍스트를 리뷰 저장소 SQLite 파일에 적재 (파일 생략 시 {REVIEW_STORE_FILE})")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="먼저 브라우저 없이 HTTP로 리뷰 데이터를 받아 마지막 스냅샷과 비교하고, "
+                             "바뀐 게임만 Firefox로 캡처 (그대로인 게임은 이전 이미지를 가리키는 표시 파일만 저장)")
+    parser.add_argument("--force", action="store_true",
+                        help="오늘 이미 완료된 게임도 다시 캡처 (기본값: 실행 매니페스트에서 완료된 게임은 건너뜀)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="오늘 실행 매니페스트에서 실패/차단으로 기록된 게임만 다시 캡처")
+    parser.add_argument("--coordinate-timeout", type=int, default=3 * 3600,
+                        help="코디네이터가 작업 완료를 기다리는 최대 시간 (초)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """메인 실행 함수"""
+    args = parse_args(argv)
+    options = build_capture_options(args)
+    
     # 로깅 설정
     logger = setup_logging()
     
+    # 앱 레지스트리 로드 (워커 프로세스도 같은 파일 사용)
+    try:
+        use_registry(args.registry, parse_shard(args.shard) if args.shard else None)
+    except (OSError, ValueError) as e:
+        logger.error(f"앱 레지스트리를 불러올 수 없습니다: {e}")
+        return False
+    options["registry"] = os.path.abspath(args.registry)
+    
     base_dir = os.getcwd()  # 현재 작업 디렉토리 사용
     today = datetime.datetime.now().strftime('%Y%m%d')
     save_dir = os.path.join(base_dir, today)
     
+    # 단계별 소요 시간 기록 (워커 프로세스도 같은 실행 ID로 같은 파일에 기록)
+    options["run_id"] = datetime.datetime.now().strftime('%Y%m%d%H%M%S') + f"-{os.getpid()}"
+    options["date"] = today  # 자정을 넘겨도 실행 시작 날짜 폴더/파일 이름으로 저장
+    options["span_file"] = os.path.abspath(span_file_for(today))
+    configure_spans(options["run_id"], options["span_file"])
+    
+    # 실행 매니페스트: 오늘 이미 완료된 게임은 건너뛰고 (--force 제외), --retry-failed이면 실패한 게임만
+    options["manifest_dir"] = os.path.abspath("logs")
+    manifest = load_manifest(today, options["manifest_dir"])
+    targets = select_run_targets(GAMES, manifest, save_dir, args.force, args.retry_failed)
+    
     logger.info("=" * 50)
     logger.info("자동 Google Play 리뷰 캡처 및 HTML 업데이트 시작")
     logger.info(f"실행 날짜: {today}")
     logger.info(f"저장 폴더: {save_dir}")
-    logger.info(f"캡처할 게임 수: {len(GAMES)}개")
+    logger.info(f"캡처할 게임 수: {len(targets)}개" + (f" (샤드 {args.shard})" if args.shard else "")
+                + (f", 실행 매니페스트 기준 건너뜀 {len(GAMES) - len(targets)}개" if len(targets) < len(GAMES) else ""))
+    logger.info(f"캡처 워커 수: {args.workers}개")
+    logger.info(f"이미지 형식: {args.format}" + (" (+PNG 원본)" if args.keep_png else ""))
     logger.info("=" * 50)
     
     # 폴더 생성
     os.makedirs(save_dir, exist_ok=True)
     logger.info(f"저장 폴더 생성: {save_dir}")
     
-    # WebDriver 설정
-    try:
-        driver = setup_driver()
-        logger.info("Firefox WebDriver 초기화 성공")
-    except Exception as e:
-        logger.error(f"Firefox WebDriver 초기화 실패: {e}")
-        return False
+    # 리소스 차단/캐시 프록시 시작 (모든 워커가 같은 프록시 사용)
+    proxy = None
+    if args.block_resources or args.asset_cache:
+        try:
+            blocklist = load_blocklist(args.blocklist) if args.block_resources else {}
+            cache = AssetCache(max_mb=args.asset_cache_mb) if args.asset_cache else None
+            proxy = CaptureProxy(blocklist, logger=logger, cache=cache).start()
+            options["proxy"] = f"{proxy.address[0]}:{proxy.address[1]}"
+        except (OSError, ValueError) as e:
+            logger.warning(f"캡처 프록시 시작 실패, 프록시 없이 진행합니다: {e}")
     
+    limiter = None
+    driver = None
     try:
-        # 모든 게임 캡처
-        success_count = 0
+        # 모든 워커 프로세스가 공유하는 요청 제한기
+        if args.rate_limit > 0:
+            limiter_file = args.rate_limit_file or (
+                os.path.join(os.path.dirname(os.path.abspath(args.queue)), "rate_limiter.sqlite") if args.queue
+                else LIMITER_FILE)
+            options["rate_limit"] = {"path": os.path.abspath(limiter_file), "per_minute": args.rate_limit,
+                                     "burst": args.rate_burst}
+            limiter = rate_limiter_for(options)
+            limiter.start_run()
+            logger.info(f"요청 제한: 분당 {args.rate_limit:g}건, 연속 {args.rate_burst}건 ({limiter_file})")
         
-        for app_id, game_name in GAMES.items():
-            logger.info(f"게임 캡처 시작: {game_name} ({app_id})")
-            
-            if capture_game_review_firefox(driver, app_id, game_name, save_dir, logger):
-                logger.info(f"{game_name} 캡처 성공!")
-                success_count += 1
-            else:
-                logger.error(f"{game_name} 캡처 실패")
-            
-            logger.info("=" * 50)
+        # HTTP 빠른 경로: 리뷰 데이터가 마지막 스냅샷과 달라진 게임만 브라우저로 캡처
+        fetched = None
+        if args.fast_path and targets:
+            with timing_span("fast_path", date=today) as span:
+                targets, fetched = fast_path_targets(targets, save_dir, today, options, logger)
+                span["targets"] = len(targets)
+        
+        # 작업 큐 모드: 오늘 작업 추가 (다른 실행이 이미 추가했으면 무시)
+        if args.queue:
+            try:
+                queue = WorkQueue(args.queue)
+            except QueueHostError as e:
+                logger.error(e)
+                return False
+            added = queue.enqueue(registry_jobs([APPS[app_id] for app_id in targets], today))
+            if args.retry_failed:
+                logger.info(f"작업 큐: 실패한 작업 {queue.retry_failed(today)}개 재시도 대기")
+            queue.close()
+            logger.info(f"작업 큐: {args.queue} (새 작업 {added}개)")
+        
+        # WebDriver 설정 (병렬 모드와 작업 큐 모드에서는 워커가 각자 생성)
+        if args.workers <= 1 and not args.queue and targets:
+            try:
+                driver = setup_driver(options)
+                logger.info("Firefox WebDriver 초기화 성공")
+            except Exception as e:
+                logger.error(f"Firefox WebDriver 초기화 실패: {e}")
+                return False
+        
+        if args.queue:
+            results = capture_games_from_queue(args.queue, today, base_dir, logger, args.workers, options)
+            if fetched:
+                commit_snapshots(fetched, today, options)
+            if proxy:
+                proxy.log_stats(logger)
+            logger.info(f"이 실행에서 처리한 작업: {sum(1 for ok in results.values() if ok)}/{len(results)}개 성공")
+            if not args.coordinate:
+                logger.info("리뷰 저장소 적재, HTML 업데이트와 Git 작업은 코디네이터(--coordinate)가 실행합니다.")
+                return all(results.values())
+            return publish_when_finished(args.queue, today, save_dir, logger, args.coordinate_timeout,
+                                         review_store=args.review_store)
+        
+        # 남은 게임 캡처
+        if not targets:
+            logger.info("오늘 캡처할 게임이 없습니다 (모두 완료됨). HTML 업데이트와 Git 작업만 실행합니다.")
+            results = {}
+        elif driver is not None:
+            results = capture_games_sequential(driver, targets, save_dir, logger, options)
+        else:
+            results = capture_games_parallel(targets, save_dir, logger, args.workers, options)
+        
+        success_count = sum(1 for ok in results.values() if ok)
+        if fetched:
+            commit_snapshots(fetched, today, options)
+        
+        # 오늘 리뷰 텍스트를 검색용 리뷰 저장소에 적재
+        if args.review_store:
+            refresh_review_store(args.review_store, base_dir, [today], logger)
+        
+        if proxy:
+            proxy.log_stats(logger)
         
         # HTML 파일 업데이트
         logger.info("HTML 파일 업데이트 시작")
-        html_updated = update_html_with_new_images(save_dir, logger)
+        with timing_span("html_update", date=today) as span:
+            html_updated = update_html_with_new_images(save_dir, logger, date_str=today)
+            span["updated"] = html_updated
         if html_updated:
             logger.info("HTML 파일 업데이트 성공!")
         else:
@@ -558,14 +2404,14 @@ def main():
         # D:\aos_review 디렉토리에서 Git 작업 실행
         git_success = git_commit_and_push(logger, git_dir=r'D:\aos_review')
         
-        if success_count == len(GAMES):
+        if success_count == len(targets):
             logger.info("모든 게임 캡처 및 HTML 업데이트 성공!")
             if git_success:
                 logger.info("Git 작업도 성공적으로 완료되었습니다!")
             logger.info("=" * 50)
             return True
         elif success_count > 0:
-            logger.info(f"{success_count}/{len(GAMES)} 게임 캡처 성공!")
+            logger.info(f"{success_count}/{len(targets)} 게임 캡처 성공!")
             if git_success:
                 logger.info("Git 작업도 성공적으로 완료되었습니다!")
             logger.info("=" * 50)
@@ -580,11 +2426,18 @@ def main():
         return False
     
     finally:
-        try:
-            driver.quit()
-            logger.info("Firefox WebDriver 종료")
-        except:
-            pass
+        if driver is not None:
+            try:
+                driver.quit()
+                logger.info("Firefox WebDriver 종료")
+            except:
+                pass
+        if proxy:
+            proxy.stop()
+        if limiter:
+            limiter.log_summary(logger)
+        log_span_summary(logger)
+        logger.info(f"단계별 기록: {options['span_file']} (run_id={options['run_id']})")
 
 if __name__ == "__main__":
     success = main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+저장해 둔 스토어 페이지 스냅샷을 로컬 HTTP 서버로 제공하여 캡처 성능을 측정하는 벤치마크
+
+실제 capture_game_review_firefox 로직을 그대로 실행하되 상세 페이지 HTML은 play.google.com 대신 로컬 서버에서
+받으므로 스토어 응답 시간의 영향 없이 커밋 간 성능을 비교할 수 있습니다.
+스냅샷 모드에서도 이미지, 폰트 등 하위 리소스는 실제 네트워크에서 받습니다 (브라우저 캐시는 예열 회차에서 채워짐).
+네트워크 없이 측정하려면 page_archive.py로 기록한 아카이브를 --archive-dir로 재생하세요.
+
+사용 예:
+    python capture_benchmark.py snapshot                 # 모든 게임의 현재 스토어 페이지 저장 (1회)
+    python capture_benchmark.py run --repeat 5           # 벤치마크 실행, 결과 JSON 저장
+    python capture_benchmark.py run --archive-dir archives   # page_archive.py 기록을 재생하여 실행
+    python capture_benchmark.py compare old.json new.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import datetime
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from bs4 import BeautifulSoup
+
+import auto_capture_and_update as capture
+from auto_capture_and_update import GAMES, use_registry, setup_driver, capture_game_review_firefox, wait_for_page_ready
+from app_registry import REGISTRY_FILE, select_apps
+from capture_daemon import driver_rss_mb
+from capture_proxy import CaptureProxy
+from page_archive import load_replay_archive
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SNAPSHOT_DIR = os.path.join("benchmarks", "snapshots")
+RESULT_DIR = os.path.join("benchmarks", "results")
+RSS_SAMPLE_INTERVAL = 0.2
+
+def setup_logging():
+    """로깅 설정"""
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
+    
+    log_file = os.path.join(log_dir, f"capture_benchmark_{datetime.datetime.now().strftime('%Y%m%d')}.log")
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    return logging.getLogger(__name__)
+
+def snapshot_path(app_id, snapshot_dir=SNAPSHOT_DIR):
+    """앱의 스냅샷 HTML 파일 경로"""
+    return os.path.join(snapshot_dir, f"{app_id}.html")
+
+def strip_scripts(html):
+    """렌더링이 끝난 DOM에서 스크립트를 제거하여 재생 시 페이지가 다시 그려지지 않도록 함"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup.find_all('script'):
+        tag.decompose()
+    for tag in soup.find_all('link', rel='preload'):
+        if tag.get('as') == 'script':
+            tag.decompose()
+    return str(soup)
+
+def save_snapshots(games, snapshot_dir, logger):
+    """실제 스토어 페이지를 렌더링한 뒤 DOM을 스냅샷으로 저장"""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    driver = setup_driver()
+    saved = 0
+    try:
+        for app_id, game_name in games.items():
+            try:
+                driver.get(capture.store_page_url(app_id))
+                wait_for_page_ready(driver, logger)
+                html = "<!DOCTYPE html>\n" + strip_scripts(driver.execute_script(
+                    "return document.documentElement.outerHTML"))
+                with open(snapshot_path(app_id, snapshot_dir), 'w', encoding='utf-8') as f:
+                    f.write(html)
+                saved += 1
+                logger.info(f"스냅샷 저장: {game_name} ({len(html):,}자)")
+            except Exception as e:
+                logger.error(f"스냅샷 저장 실패 ({game_name}): {e}")
+    finally:
+        driver.quit()
+    return saved == len(games)
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    """/store/apps/details?id=<앱 ID> 요청에 저장된 스냅샷을 응답"""
+    
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        app_id = parse_qs(parsed.query).get("id", [None])[0]
+        path = snapshot_path(app_id, self.server.snapshot_dir) if app_id else None
+        if parsed.path != "/store/apps/details" or not path or not os.path.exists(path):
+            self.send_error(404)
+            return
+        
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_snapshot_server(snapshot_dir):
+    """스냅샷 서버를 임의의 포트로 시작하고 (서버, 기본 URL) 반환"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SnapshotHandler)
+    server.snapshot_dir = snapshot_dir
+    threading.Thread(target=server.serve_forever, name="snapshot-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+class PeakRssSampler(threading.Thread):
+    """벤치마크 프로세스와 브라우저 프로세스들의 메모리(RSS) 합계 최대값을 주기적으로 기록"""
+    
+    def __init__(self, driver, interval=RSS_SAMPLE_INTERVAL):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.driver = driver
+        self.interval = interval
+        self.peak_mb = None
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        own = psutil.Process(os.getpid())
+        while not self._stop_event.is_set():
+            browser = driver_rss_mb(self.driver) or 0
+            total = browser + own.memory_info().rss / (1024 * 1024)
+            self.peak_mb = max(self.peak_mb or 0, total)
+            self._stop_event.wait(self.interval)
+    
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return round(self.peak_mb, 1) if self.peak_mb is not None else None
+
+def git_revision():
+    """현재 커밋 해시 (Git 저장소가 아니면 None)"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                check=True, encoding='utf-8')
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def describe(values):
+    """측정값 목록의 요약 통계"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.mean(ordered), 4),
+        "median": round(statistics.median(ordered), 4),
+        "p90": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 4),
+        "min": round(ordered[0], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+def collect_stage_seconds(span_file):
+    """span 파일에서 단계별 소요 시간 목록 수집"""
+    stages = {}
+    if not os.path.exists(span_file):
+        return stages
+    with open(span_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            stages.setdefault(record["stage"], []).append(record["seconds"])
+    return stages
+
+def run_benchmark(games, repeat, options, snapshot_dir, logger, archive_dir=None):
+    """스냅샷 서버(또는 기록 재생 프록시)를 대상으로 캡처를 반복 실행하고 측정 결과 반환
+    
+    스냅샷 서버는 상세 페이지 HTML만 제공하므로 하위 리소스까지 고정하려면 archive_dir을 사용한다.
+    """
+    replay = server = None
+    original_base_url = capture.STORE_BASE_URL
+    if archive_dir:
+        # 실제 스토어 주소 그대로, 프록시가 기록된 응답만 돌려줌
+        replay = load_replay_archive(games, archive_dir)
+        server = CaptureProxy({}, port=0, logger=logger, archive=replay).start()
+        options = dict(options, proxy=f"{server.address[0]}:{server.address[1]}")
+    else:
+        missing = [game_name for app_id, game_name in games.items() if not os.path.exists(snapshot_path(app_id, snapshot_dir))]
+        if missing:
+            raise FileNotFoundError(f"스냅샷이 없습니다: {', '.join(missing)} (먼저 snapshot 명령을 실행하세요)")
+        server, base_url = start_snapshot_server(snapshot_dir)
+        capture.STORE_BASE_URL = base_url
+    work_dir = tempfile.mkdtemp(prefix="capture_bench_")
+    span_file = os.path.join(work_dir, "spans.jsonl")
+    # 선택자 캐시도 임시 폴더에 두어 실제 캡처의 캐시(.cache/selector_cache.json)를 바꾸지 않음 (예열 회차에서 채워짐)
+    options = dict(options, selector_cache_file=os.path.join(work_dir, "selector_cache.json"))
+    capture.configure_spans("benchmark", span_file)
+    
+    end_to_end = []
+    per_game = {game_name: {"seconds": [], "bytes": []} for game_name in games.values()}
+    failures = 0
+    driver = setup_driver(options)
+    sampler = PeakRssSampler(driver) if psutil is not None else None
+    if sampler:
+        sampler.start()
+    else:
+        logger.warning("psutil이 설치되어 있지 않아 최대 메모리는 측정하지 않습니다.")
+    
+    try:
+        # 첫 회는 브라우저 캐시/JIT 예열용으로 측정에서 제외
+        for round_index in range(repeat + 1):
+            for app_id, game_name in games.items():
+                save_dir = os.path.join(work_dir, str(round_index))
+                os.makedirs(save_dir, exist_ok=True)
+                if replay:
+                    replay.rewind()
+                if round_index == 0:
+                    capture.configure_spans("warmup", None)
+                else:
+                    capture.configure_spans(f"round-{round_index}", span_file)
+                
+                start = time.perf_counter()
+                ok = capture_game_review_firefox(driver, app_id, game_name, save_dir, logger, options)
+                elapsed = time.perf_counter() - start
+                if round_index == 0:
+                    continue
+                if not ok:
+                    failures += 1
+                    continue
+                
+                output_bytes = sum(os.path.getsize(os.path.join(save_dir, name)) for name in os.listdir(save_dir)
+                                   if name.startswith(f"{game_name}_"))
+                end_to_end.append(elapsed)
+                per_game[game_name]["seconds"].append(elapsed)
+                per_game[game_name]["bytes"].append(output_bytes)
+            if round_index > 0:
+                logger.info(f"{round_index}/{repeat}회 완료")
+    finally:
+        peak_rss = sampler.stop() if sampler else None
+        driver.quit()
+        if replay:
+            server.stop()
+        else:
+            server.shutdown()
+        capture.STORE_BASE_URL = original_base_url
+        capture.configure_spans(None, None)
+    
+    stages = collect_stage_seconds(span_file)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "created": datetime.datetime.now().isoformat(timespec='seconds'),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "source": "archive" if archive_dir else "snapshot",
+        "options": {key: value for key, value in options.items() if key != "proxy"},
+        "failures": failures,
+        "end_to_end": describe(end_to_end),
+        "stages": {stage: describe(values) for stage, values in stages.items()},
+        "peak_rss_mb": peak_rss,
+        "games": {
+            game_name: {"seconds": describe(values["seconds"]),
+                        "bytes": int(statistics.median(values["bytes"])) if values["bytes"] else None}
+            for game_name, values in per_game.items()
+        },
+    }
+
+def compare_results(old_file, new_file):
+    """두 벤치마크 결과의 단계별 중앙값 비교표 출력"""
+    with open(old_file, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_file, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    
+    print(f"{'단계':<16}{old.get('revision') or 'old':>12}{new.get('revision') or 'new':>12}{'변화':>10}")
+    rows = [("end_to_end", old.get("end_to_end"), new.get("end_to_end"))]
+    for stage in sorted(set(old["stages"]) | set(new["stages"])):
+        rows.append((stage, old["stages"].get(stage), new["stages"].get(stage)))
+    for name, before, after in rows:
+        if not before or not after:
+            print(f"{name:<16}{'-':>12}{'-':>12}{'-':>10}")
+            continue
+        change = (after["median"] - before["median"]) / before["median"] * 100 if before["median"] else 0.0
+        print(f"{name:<16}{before['median']:>11.3f}s{after['median']:>11.3f}s{change:>+9.1f}%")
+    
+    old_bytes = sum(game["bytes"] or 0 for game in old["games"].values())
+    new_bytes = sum(game["bytes"] or 0 for game in new["games"].values())
+    print(f"{'output_bytes':<16}{old_bytes:>12,}{new_bytes:>12,}")
+    print(f"{'peak_rss_mb':<16}{str(old.get('peak_rss_mb')):>12}{str(new.get('peak_rss_mb')):>12}")
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="스토어 페이지 스냅샷/아카이브 기반 캡처 성능 벤치마크")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR,
+                        help="스냅샷 HTML 폴더 (HTML만 로컬에서 제공, 하위 리소스는 실제 네트워크 사용)")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="캡처 대상 앱 레지스트리 파일 (기본값: apps.json)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    snapshot_parser = sub.add_parser("snapshot", help="현재 스토어 페이지를 스냅샷으로 저장")
+    snapshot_parser.add_argument("games", nargs="*", help="게임 이름 (기본값: 전체)")
+    
+    run_parser = sub.add_parser("run", help="벤치마크 실행")
+    run_parser.add_argument("games", nargs="*", help="게임 이름 (기본값: 전체)")
+    run_parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수 (예열 1회 별도)")
+    run_parser.add_argument("--format", default=capture.DEFAULT_IMAGE_FORMAT,
+                            choices=sorted(capture.IMAGE_FORMATS), help="캡처 이미지 저장 형식")
+    run_parser.add_argument("--quality", type=int, default=None, help="손실 압축 품질")
+    run_parser.add_argument("--archive-dir", default=None, help="스냅샷 대신 재생할 page_archive.py 아카이브 폴더 (모든 응답을 아카이브에서 제공, 네트워크 사용 안 함)")
+    run_parser.add_argument("--output", default=None, help="결과 JSON 파일 (기본값: benchmarks/results/)")
+    
+    compare_parser = sub.add_parser("compare", help="두 결과 파일 비교")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    
+    if args.command == "compare":
+        compare_results(args.old, args.new)
+        return True
+    
+    logger = setup_logging()
+    try:
+        use_registry(args.registry)
+        games = select_apps(GAMES, args.games)
+        if args.command == "snapshot":
+            return save_snapshots(games, args.snapshot_dir, logger)
+        
+        options = {"image_format": args.format, "image_quality": args.quality}
+        result = run_benchmark(games, args.repeat, options, args.snapshot_dir, logger, args.archive_dir)
+    except (ValueError, OSError) as e:
+        logger.error(e)
+        return False
+    
+    output = args.output or os.path.join(
+        RESULT_DIR, f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{result['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    
+    end_to_end = result["end_to_end"]
+    if end_to_end:
+        logger.info(f"전체 캡처: 중앙값 {end_to_end['median']:.2f}초, p90 {end_to_end['p90']:.2f}초 "
+                    f"({end_to_end['count']}회, 실패 {result['failures']}회)")
+    for stage, stats in sorted(result["stages"].items(), key=lambda item: -item[1]["median"]):
+        logger.info(f"  {stage}: 중앙값 {stats['median']:.3f}초, 최대 {stats['max']:.3f}초")
+    logger.info(f"최대 메모리: {result['peak_rss_mb']}MB")
+    logger.info(f"결과 저장: {output}")
+    return result["failures"] == 0
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
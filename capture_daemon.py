@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+초기화된 Firefox WebDriver를 계속 띄워 두고 로컬 소켓으로 캡처 작업을 받는 상주 서비스
+
+사용 예:
+    python capture_daemon.py serve --drivers 1
+    python capture_daemon.py capture NewMatgo Poker
+    python capture_daemon.py status
+    python capture_daemon.py stop
+"""
+
+import os
+import secrets
+import datetime
+import logging
+import argparse
+import queue
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+
+from auto_capture_and_update import GAMES, IMAGE_FORMATS, use_registry, setup_driver, capture_game_review_firefox
+from app_registry import REGISTRY_FILE, resolve_app
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DAEMON_ADDRESS = ("127.0.0.1", 6170)
+DAEMON_AUTHKEY_FILE = os.path.join(".cache", "capture_daemon.key")  # 설치마다 생성하는 인증 키 (소유자만 읽기)
+DAEMON_AUTHKEY_BYTES = 32
+DEFAULT_RECYCLE_PAGES = 50       # 이 횟수만큼 캡처하면 브라우저 재시작
+DEFAULT_MAX_RSS_MB = 1500        # Firefox 프로세스 메모리가 이 값을 넘으면 브라우저 재시작
+DRIVER_START_ATTEMPTS = 3        # 브라우저 시작 실패 시 작업 하나당 시도 횟수
+DRIVER_START_DELAY = 2           # 브라우저 시작 재시도 대기 시간 (초, 실패할 때마다 두 배)
+DRIVER_START_DELAY_MAX = 60
+
+def setup_logging():
+    """로깅 설정"""
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
+    
+    log_file = os.path.join(log_dir, f"capture_daemon_{datetime.datetime.now().strftime('%Y%m%d')}.log")
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(threadName)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    return logging.getLogger(__name__)
+
+def load_authkey(path=DAEMON_AUTHKEY_FILE, create=False):
+    """서비스 인증 키 읽기 (create이면 없을 때 무작위 키를 만들어 소유자만 읽을 수 있게 저장)
+    
+    연결된 클라이언트는 pickle 데이터를 보내므로 키를 아는 사용자만 서비스를 쓸 수 있어야 한다.
+    """
+    if create and not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # 다른 프로세스가 먼저 만듦
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(secrets.token_bytes(DAEMON_AUTHKEY_BYTES))
+    if create:
+        os.chmod(path, 0o600)
+    with open(path, 'rb') as f:
+        key = f.read()
+    if len(key) < DAEMON_AUTHKEY_BYTES:
+        raise ValueError(f"서비스 인증 키가 올바르지 않습니다: {path}")
+    return key
+
+def driver_rss_mb(driver):
+    """geckodriver와 하위 Firefox 프로세스들의 메모리(RSS) 합계 (psutil이 없으면 None)"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except (psutil.Error, AttributeError):
+        return None
+
+class WarmDriverSlot(threading.Thread):
+    """초기화된 WebDriver 하나를 유지하며 작업 큐에서 캡처 작업을 처리하는 스레드"""
+    
+    def __init__(self, index, jobs, logger, recycle_pages, max_rss_mb):
+        super().__init__(name=f"driver-{index}", daemon=True)
+        self.jobs = jobs
+        self.logger = logger
+        self.recycle_pages = recycle_pages
+        self.max_rss_mb = max_rss_mb
+        self.driver = None
+        self.pages = 0
+        self.total_pages = 0
+        self.restarts = 0
+        self.busy = False
+        self.last_error = None
+    
+    def _start_driver(self):
+        """브라우저 시작 (실패하면 대기 시간을 두 배씩 늘리며 재시도하고, 끝내 실패하면 마지막 예외 발생)"""
+        delay = DRIVER_START_DELAY
+        for attempt in range(1, DRIVER_START_ATTEMPTS + 1):
+            try:
+                self.driver = setup_driver()
+                self.pages = 0
+                self.logger.info("Firefox WebDriver 초기화 성공")
+                return
+            except Exception as e:
+                self.driver = None
+                self.last_error = f"Firefox WebDriver 초기화 실패: {e}"
+                self.logger.error(f"{self.last_error} ({attempt}/{DRIVER_START_ATTEMPTS})")
+                if attempt == DRIVER_START_ATTEMPTS:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, DRIVER_START_DELAY_MAX)
+    
+    def _quit_driver(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+    
+    def _maybe_recycle(self):
+        """페이지 수 또는 메모리 기준을 넘으면 브라우저 재시작"""
+        rss = driver_rss_mb(self.driver)
+        reason = None
+        if self.pages >= self.recycle_pages:
+            reason = f"{self.pages}페이지 처리"
+        elif rss is not None and rss >= self.max_rss_mb:
+            reason = f"메모리 {rss:.0f}MB"
+        
+        if reason:
+            self.logger.info(f"브라우저 재시작 ({reason})")
+            self._quit_driver()
+            self.restarts += 1
+            try:
+                self._start_driver()
+            except Exception:
+                pass  # 다음 작업을 받을 때 다시 시도
+    
+    def run(self):
+        # 브라우저를 시작하지 못해도 스레드는 계속 작업을 받고, 작업마다 다시 시작을 시도한다
+        # (실패하면 그 작업에 오류 응답을 보내므로 클라이언트가 무한히 기다리지 않음)
+        try:
+            self._start_driver()
+        except Exception:
+            pass
+        while True:
+            job, reply = self.jobs.get()
+            if job is None:
+                break
+            
+            self.busy = True
+            start = time.time()
+            result = {"game_name": job["game_name"], "ok": False}
+            try:
+                if self.driver is None:
+                    self.restarts += 1
+                    self._start_driver()
+                os.makedirs(job["save_dir"], exist_ok=True)
+                result["ok"] = capture_game_review_firefox(self.driver, job["app_id"], job["game_name"],
+                                                           job["save_dir"], self.logger, job.get("options"))
+                self.pages += 1
+                self.total_pages += 1
+            except Exception as e:
+                self.logger.error(f"캡처 작업 오류 ({job['game_name']}): {e}")
+                result["error"] = str(e)
+                # 브라우저가 비정상 상태일 수 있으므로 다음 작업에서 새로 시작
+                self._quit_driver()
+            finally:
+                self.busy = False
+                result["seconds"] = round(time.time() - start, 2)
+                reply.put(result)
+            
+            if self.driver is not None:
+                self._maybe_recycle()
+        
+        self._quit_driver()
+    
+    def status(self):
+        rss = driver_rss_mb(self.driver) if self.driver is not None else None
+        return {
+            "name": self.name,
+            "busy": self.busy,
+            "pages": self.pages,
+            "total_pages": self.total_pages,
+            "restarts": self.restarts,
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "running": self.driver is not None,
+            "last_error": self.last_error,
+        }
+
+def serve(args):
+    """상주 캡처 서비스 실행"""
+    logger = setup_logging()
+    authkey = load_authkey(create=True)
+    jobs = queue.Queue()
+    slots = [WarmDriverSlot(i, jobs, logger, args.recycle_pages, args.max_rss_mb) for i in range(args.drivers)]
+    for slot in slots:
+        slot.start()
+    
+    logger.info(f"캡처 서비스 시작: {DAEMON_ADDRESS[0]}:{DAEMON_ADDRESS[1]} (드라이버 {args.drivers}개)")
+    if psutil is None:
+        logger.warning("psutil이 설치되어 있지 않아 메모리 기준 재시작은 사용하지 않습니다.")
+    
+    def handle(conn, request):
+        try:
+            command = request.get("cmd")
+            if command == "capture":
+                replies = []
+                for app_id, game_name in request["games"]:
+                    reply = queue.Queue()
+                    jobs.put(({"app_id": app_id, "game_name": game_name,
+                               "save_dir": request["save_dir"], "options": request.get("options")}, reply))
+                    replies.append(reply)
+                conn.send({"ok": True, "results": [reply.get() for reply in replies]})
+            elif command == "status":
+                conn.send({"ok": True, "pending": jobs.qsize(), "drivers": [slot.status() for slot in slots]})
+            else:
+                conn.send({"ok": False, "error": f"알 수 없는 명령: {command}"})
+        except (EOFError, OSError) as e:
+            logger.warning(f"클라이언트 연결 오류: {e}")
+        finally:
+            conn.close()
+    
+    with Listener(DAEMON_ADDRESS, authkey=authkey) as listener:
+        while True:
+            conn = listener.accept()
+            try:
+                request = conn.recv()
+            except (EOFError, OSError) as e:
+                logger.warning(f"클라이언트 연결 오류: {e}")
+                conn.close()
+                continue
+            
+            if request.get("cmd") == "stop":
+                conn.send({"ok": True})
+                conn.close()
+                break
+            # 캡처 요청은 끝날 때까지 연결을 유지하므로 별도 스레드에서 처리
+            threading.Thread(target=handle, args=(conn, request), daemon=True).start()
+    
+    logger.info("캡처 서비스 종료 중...")
+    for _ in slots:
+        jobs.put((None, None))
+    for slot in slots:
+        slot.join()
+    logger.info("캡처 서비스 종료")
+
+def send_request(request):
+    """상주 서비스에 요청을 보내고 응답 반환"""
+    with Client(DAEMON_ADDRESS, authkey=load_authkey()) as conn:
+        conn.send(request)
+        return conn.recv()
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="상주 Firefox 캡처 서비스")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="캡처 대상 앱 레지스트리 파일 (기본값: apps.json)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    serve_parser = sub.add_parser("serve", help="캡처 서비스 실행")
+    serve_parser.add_argument("--drivers", type=int, default=1, help="유지할 Firefox 인스턴스 수")
+    serve_parser.add_argument("--recycle-pages", type=int, default=DEFAULT_RECYCLE_PAGES,
+                              help="브라우저 재시작 전 최대 캡처 횟수")
+    serve_parser.add_argument("--max-rss-mb", type=int, default=DEFAULT_MAX_RSS_MB,
+                              help="브라우저 재시작 메모리 기준 (MB, psutil 필요)")
+    
+    capture_parser = sub.add_parser("capture", help="게임 캡처 요청")
+    capture_parser.add_argument("games", nargs="+", help="게임 이름 또는 앱 ID")
+    capture_parser.add_argument("--save-dir", default=None, help="저장 폴더 (기본값: 오늘 날짜 폴더)")
+    capture_parser.add_argument("--format", default=None, choices=sorted(IMAGE_FORMATS),
+                                help="캡처 이미지 저장 형식 (기본값: 서비스 기본 형식)")
+    
+    sub.add_parser("status", help="서비스 상태 확인")
+    sub.add_parser("stop", help="서비스 종료")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    
+    # 서비스는 앱별 설정(캡처 크기, 선택자)에, 요청은 게임 이름 확인에 레지스트리 사용
+    if args.command in ("serve", "capture"):
+        try:
+            use_registry(args.registry)
+        except (OSError, ValueError) as e:
+            print(f"앱 레지스트리를 불러올 수 없습니다: {e}")
+            return False
+    
+    if args.command == "serve":
+        serve(args)
+        return True
+    
+    try:
+        if args.command == "capture":
+            games = [resolve_app(GAMES, name) for name in args.games]
+            save_dir = os.path.abspath(args.save_dir or datetime.datetime.now().strftime('%Y%m%d'))
+            options = {"image_format": args.format} if args.format else None
+            response = send_request({"cmd": "capture", "games": games, "save_dir": save_dir, "options": options})
+            for result in response.get("results", []):
+                status = "성공" if result["ok"] else "실패"
+                error = f" - {result['error']}" if result.get("error") else ""
+                print(f"{result['game_name']}: {status} ({result['seconds']}초){error}")
+            return all(result["ok"] for result in response.get("results", []))
+        
+        response = send_request({"cmd": args.command})
+        if args.command == "status":
+            print(f"대기 중인 작업: {response['pending']}개")
+            for driver in response["drivers"]:
+                print(f"{driver['name']}: {'작업 중' if driver['busy'] else '대기'}, "
+                      f"현재 {driver['pages']}페이지 / 누적 {driver['total_pages']}페이지, "
+                      f"재시작 {driver['restarts']}회, 메모리 {driver['rss_mb']}MB"
+                      + ("" if driver["running"] else f", 브라우저 없음 ({driver['last_error']})"))
+        return response.get("ok", False)
+    except ConnectionRefusedError:
+        print(f"캡처 서비스에 연결할 수 없습니다: {DAEMON_ADDRESS[0]}:{DAEMON_ADDRESS[1]}")
+        return False
+    except FileNotFoundError:
+        print(f"서비스 인증 키가 없습니다 (서비스를 먼저 실행하세요): {DAEMON_AUTHKEY_FILE}")
+        return False
+    except ValueError as e:
+        print(e)
+        return False
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,730 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+캡처용 로컬 필터링/캐싱 프록시
+
+스토어 페이지 캡처에 필요 없는 추적기, 분석 비콘, 동영상 미리보기 등을
+URL 패턴과 콘텐츠 유형으로 차단하여 페이지당 전송량과 로딩 시간을 줄인다.
+선택적으로 gstatic JS 번들, 폰트, 아이콘 같은 정적 리소스를 디스크 LRU 캐시에
+저장하여 여러 앱, 여러 워커, 여러 날의 캡처가 같은 리소스를 다시 받지 않게 한다.
+HTTPS 요청의 경로와 콘텐츠 유형을 보려면 자체 서명 인증서로 TLS를 중계하며
+(Firefox는 acceptInsecureCerts로 이를 허용), 인증서를 만들 수 없으면
+호스트 단위 차단만 한다.
+page_archive.py의 아카이브를 연결하면 응답을 기록하거나, 기록된 응답만으로 페이지를 재생한다.
+
+사용 예:
+    python capture_proxy.py serve
+    python capture_proxy.py --no-block serve --cache
+    python capture_proxy.py compare NewMatgo Poker
+"""
+
+import os
+import datetime
+import logging
+import argparse
+import fnmatch
+import hashlib
+import json
+import select
+import socket
+import ssl
+import subprocess
+import threading
+import time
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+try:
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+except ImportError:
+    x509 = None
+
+PROXY_HOST = "127.0.0.1"
+PROXY_PORT = 0  # 0이면 운영체제가 빈 포트를 고름 (실행이 겹쳐도 충돌하지 않음, 실제 포트는 시작할 때 로그에 기록)
+CERT_DIR = os.path.join(".cache", "proxy")
+UPSTREAM_TIMEOUT = 30
+
+# 정적 리소스 캐시 설정
+ASSET_CACHE_DIR = os.path.join(".cache", "proxy_assets")
+ASSET_CACHE_MAX_MB = 512
+# 캐시할 호스트 (Play 스토어 정적 리소스)
+ASSET_CACHE_HOSTS = ["*.gstatic.com", "*.googleusercontent.com", "fonts.googleapis.com"]
+# 콘텐츠 유형별 캐시 유효 시간 (초, 위에서부터 처음 일치하는 규칙 적용, 0이면 캐시 안 함)
+ASSET_CACHE_TTL = [
+    ("font/*", 30 * 86400),
+    ("application/font*", 30 * 86400),
+    ("image/*", 7 * 86400),
+    ("text/css", 86400),
+    ("*javascript*", 86400),
+    ("text/html", 0),
+    ("application/json", 0),
+]
+
+# 기본 차단 목록 (--blocklist JSON 파일로 교체 가능)
+DEFAULT_BLOCKLIST = {
+    # 호스트 단위 차단 (CONNECT 단계에서 바로 거부)
+    "hosts": [
+        "*.doubleclick.net",
+        "*google-analytics.com",
+        "*googletagmanager.com",
+        "*googlesyndication.com",
+        "*googlevideo.com",
+        "*.youtube.com",
+        "*ytimg.com",
+    ],
+    # 전체 URL 패턴
+    "urls": [
+        "*://play.google.com/log*",
+        "*://play.google.com/_/PlayStoreUi/jserror*",
+        "*://*.google.com/gen_204*",
+    ],
+    # 요청 목적지 (Sec-Fetch-Dest 헤더)
+    "destinations": ["video", "audio", "track"],
+    # 응답 콘텐츠 유형
+    "content_types": ["video/*", "audio/*"],
+}
+
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "proxy-connection", "te", "trailers", "transfer-encoding", "upgrade",
+}
+
+def setup_logging():
+    """로깅 설정"""
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
+    
+    log_file = os.path.join(log_dir, f"capture_proxy_{datetime.datetime.now().strftime('%Y%m%d')}.log")
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    return logging.getLogger(__name__)
+
+def load_blocklist(path=None):
+    """차단 목록 읽기 (파일에 없는 항목은 기본값 사용)"""
+    blocklist = {key: list(value) for key, value in DEFAULT_BLOCKLIST.items()}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            blocklist.update(json.load(f))
+    return blocklist
+
+class BlockPolicy:
+    """차단 목록으로 호스트/URL/목적지/콘텐츠 유형 차단 여부 판단"""
+    
+    def __init__(self, blocklist):
+        self.hosts = [pattern.lower() for pattern in blocklist.get("hosts", [])]
+        self.urls = blocklist.get("urls", [])
+        self.destinations = set(blocklist.get("destinations", []))
+        self.content_types = [pattern.lower() for pattern in blocklist.get("content_types", [])]
+    
+    def blocked_host(self, host):
+        host = host.lower()
+        return any(fnmatch.fnmatch(host, pattern) for pattern in self.hosts)
+    
+    def blocked_request(self, url, headers):
+        """요청 단계 차단 사유 (차단하지 않으면 None)"""
+        if self.blocked_host(urlsplit(url).hostname or ""):
+            return "host"
+        if any(fnmatch.fnmatch(url, pattern) for pattern in self.urls):
+            return "url"
+        if headers.get("Sec-Fetch-Dest", "") in self.destinations:
+            return "destination"
+        return None
+    
+    def blocked_content_type(self, content_type):
+        content_type = (content_type or "").split(";")[0].strip().lower()
+        return bool(content_type) and any(fnmatch.fnmatch(content_type, pattern) for pattern in self.content_types)
+
+def ensure_certificate(cert_dir=CERT_DIR):
+    """TLS 중계용 자체 서명 인증서 생성 (cryptography 또는 openssl 필요, 실패 시 None)"""
+    cert_file = os.path.join(cert_dir, "proxy_cert.pem")
+    key_file = os.path.join(cert_dir, "proxy_key.pem")
+    if os.path.exists(cert_file) and os.path.exists(key_file):
+        return cert_file, key_file
+    
+    os.makedirs(cert_dir, exist_ok=True)
+    if x509 is not None:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "aos-review-capture-proxy")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (x509.CertificateBuilder()
+                .subject_name(name).issuer_name(name)
+                .public_key(key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - datetime.timedelta(days=1))
+                .not_valid_after(now + datetime.timedelta(days=3650))
+                .sign(key, hashes.SHA256()))
+        with open(key_file, 'wb') as f:
+            f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL,
+                                      serialization.NoEncryption()))
+        with open(cert_file, 'wb') as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        return cert_file, key_file
+    
+    try:
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+                        '-keyout', key_file, '-out', cert_file, '-days', '3650',
+                        '-subj', '/CN=aos-review-capture-proxy'],
+                       capture_output=True, check=True)
+        return cert_file, key_file
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+class ProxyStats:
+    """요청/차단/전송량 카운터"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+    
+    def add(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+class AssetCache:
+    """URL 단위 디스크 LRU 캐시 (콘텐츠 유형별 TTL)
+    
+    항목마다 본문(.bin)과 메타데이터(.json)를 저장하고, 전체 크기가 max_bytes를
+    넘으면 마지막 사용 시각이 가장 오래된 항목부터 지운다.
+    """
+    
+    def __init__(self, cache_dir=ASSET_CACHE_DIR, max_mb=ASSET_CACHE_MAX_MB,
+                 hosts=ASSET_CACHE_HOSTS, ttl_rules=ASSET_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024 * 1024
+        self.hosts = hosts
+        self.ttl_rules = ttl_rules
+        self._lock = threading.Lock()
+        self._index = {}  # key -> {"size", "last_access", "expires"}
+        self.evicted = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+    
+    def _load_index(self):
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".json"):
+                continue
+            key = filename[:-5]
+            try:
+                with open(os.path.join(self.cache_dir, filename), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                self._index[key] = {"size": meta["size"], "expires": meta["expires"],
+                                    "last_access": os.path.getmtime(self._body_path(key))}
+            except (OSError, ValueError, KeyError):
+                self._remove(key)
+    
+    def _key(self, url, headers):
+        # 압축 방식이 다르면 본문이 다르므로 키에 포함
+        raw = f"{url}\n{headers.get('Accept-Encoding', '')}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.bin")
+    
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _remove(self, key):
+        self._index.pop(key, None)
+        for path in (self._body_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def cacheable_url(self, url):
+        host = (urlsplit(url).hostname or "").lower()
+        return any(fnmatch.fnmatch(host, pattern) for pattern in self.hosts)
+    
+    def ttl_for(self, content_type):
+        content_type = (content_type or "").split(";")[0].strip().lower()
+        for pattern, ttl in self.ttl_rules:
+            if fnmatch.fnmatch(content_type, pattern):
+                return ttl
+        return 0
+    
+    def get(self, url, headers):
+        """캐시된 (상태, 사유, 헤더 목록, 본문) 반환 (없거나 만료되면 None)"""
+        key = self._key(url, headers)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            if entry["expires"] < time.time():
+                self._remove(key)
+                return None
+            entry["last_access"] = time.time()
+        
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+            os.utime(self._body_path(key))  # 다음 실행에서도 LRU 순서 유지
+        except (OSError, ValueError):
+            with self._lock:
+                self._remove(key)
+            return None
+        return meta["status"], meta["reason"], [tuple(h) for h in meta["headers"]], body
+    
+    def put(self, url, headers, status, reason, response_headers, body):
+        """캐시 가능한 응답이면 저장하고 True 반환"""
+        if status != 200:
+            return False
+        header_map = {name.lower(): value for name, value in response_headers}
+        cache_control = header_map.get("cache-control", "").lower()
+        if "no-store" in cache_control or "set-cookie" in header_map:
+            return False
+        ttl = self.ttl_for(header_map.get("content-type"))
+        if ttl <= 0:
+            return False
+        
+        key = self._key(url, headers)
+        meta = {"url": url, "status": status, "reason": reason, "headers": response_headers,
+                "size": len(body), "expires": time.time() + ttl}
+        tmp_suffix = f".{threading.get_ident()}.tmp"
+        try:
+            with open(self._body_path(key) + tmp_suffix, 'wb') as f:
+                f.write(body)
+            with open(self._meta_path(key) + tmp_suffix, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(self._body_path(key) + tmp_suffix, self._body_path(key))
+            os.replace(self._meta_path(key) + tmp_suffix, self._meta_path(key))
+        except OSError:
+            return False
+        
+        with self._lock:
+            self._index[key] = {"size": len(body), "expires": meta["expires"], "last_access": time.time()}
+        self._evict()
+        return True
+    
+    def _evict(self):
+        """전체 크기가 한도를 넘으면 오래 사용하지 않은 항목부터 삭제하고 삭제 수 반환"""
+        evicted = 0
+        with self._lock:
+            total = sum(entry["size"] for entry in self._index.values())
+            if total <= self.max_bytes:
+                return 0
+            for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+                if total <= self.max_bytes:
+                    break
+                total -= entry["size"]
+                self._remove(key)
+                evicted += 1
+            self.evicted += evicted
+        return evicted
+    
+    def summary(self):
+        """캐시 항목 수, 전체 크기, 누적 삭제 수"""
+        with self._lock:
+            return {"entries": len(self._index), "bytes": sum(e["size"] for e in self._index.values()),
+                    "evicted": self.evicted}
+
+class CaptureProxyHandler(BaseHTTPRequestHandler):
+    """HTTP 요청 중계 및 CONNECT 터널 (가능하면 TLS 중계) 처리"""
+    
+    protocol_version = "HTTP/1.1"
+    tunnel_host = None
+    
+    def log_message(self, format, *args):
+        # 요청마다 로그를 남기지 않음 (통계로 대체)
+        pass
+    
+    def do_CONNECT(self):
+        host, _, port = self.path.rpartition(":")
+        stats = self.server.stats
+        stats.add("connect")
+        
+        if self.server.policy.blocked_host(host):
+            stats.add("blocked")
+            stats.add("blocked_host")
+            self.send_error(403, "Blocked by capture proxy")
+            return
+        
+        if self.server.ssl_context is None:
+            self._raw_tunnel(host, int(port))
+            return
+        
+        # TLS를 직접 종료하고 같은 연결에서 HTTP 요청을 계속 처리
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        try:
+            tls = self.server.ssl_context.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError):
+            self.close_connection = True
+            return
+        self.connection = tls
+        self.rfile = tls.makefile('rb', self.rbufsize)
+        self.wfile = tls.makefile('wb', self.wbufsize)
+        self.tunnel_host = host if port == "443" else f"{host}:{port}"
+        self.close_connection = False
+    
+    def _raw_tunnel(self, host, port):
+        """인증서가 없을 때: 내용을 보지 않고 바이트만 전달"""
+        try:
+            upstream = socket.create_connection((host, port), timeout=UPSTREAM_TIMEOUT)
+        except OSError:
+            self.send_error(502)
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, UPSTREAM_TIMEOUT)
+                if errored or not readable:
+                    break
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+            self.close_connection = True
+    
+    def _request_url(self):
+        if self.tunnel_host:
+            return f"https://{self.tunnel_host}{self.path}"
+        return self.path
+    
+    def _upstream_connection(self, scheme, netloc):
+        """스레드(클라이언트 연결)별로 업스트림 연결 재사용"""
+        pool = getattr(self, "_pool", None)
+        if pool is None:
+            pool = self._pool = {}
+        key = (scheme, netloc)
+        if key not in pool:
+            if scheme == "https":
+                pool[key] = http.client.HTTPSConnection(netloc, timeout=UPSTREAM_TIMEOUT,
+                                                        context=self.server.upstream_context)
+            else:
+                pool[key] = http.client.HTTPConnection(netloc, timeout=UPSTREAM_TIMEOUT)
+        return pool[key]
+    
+    def _send_blocked(self, reason):
+        self.server.stats.add("blocked")
+        self.server.stats.add(f"blocked_{reason}")
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
+    def _send(self, status, reason, headers, body):
+        self.send_response(status, reason)
+        for name, value in headers:
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self.server.stats.add("bytes_to_client", len(body))
+    
+    def fetch_upstream(self, url, body):
+        """업스트림 요청 후 (상태, 사유, 헤더 목록, 본문) 반환
+        
+        응답 헤더의 콘텐츠 유형이 차단 대상이면 본문을 받지 않고 업스트림 연결을 끊은 뒤 본문 자리에 None을 반환한다.
+        """
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in HOP_BY_HOP_HEADERS}
+        
+        for attempt in range(2):
+            conn = self._upstream_connection(parts.scheme, parts.netloc)
+            try:
+                conn.request(self.command, path, body=body, headers=headers)
+                response = conn.getresponse()
+                if self.server.policy.blocked_content_type(response.getheader("Content-Type", "")):
+                    # 남은 본문을 읽지 않도록 연결을 버림 (다음 요청은 새 연결 사용)
+                    conn.close()
+                    self._pool.pop((parts.scheme, parts.netloc), None)
+                    data = None
+                else:
+                    data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # 재사용하던 연결이 끊긴 경우 한 번만 새 연결로 재시도
+                conn.close()
+                self._pool.pop((parts.scheme, parts.netloc), None)
+                if attempt == 1:
+                    raise
+        
+        self.server.stats.add("upstream_requests")
+        if data is not None:
+            self.server.stats.add("bytes_from_upstream", len(data))
+        return response.status, response.reason, response.getheaders(), data
+    
+    def _forward(self):
+        stats = self.server.stats
+        stats.add("requests")
+        url = self._request_url()
+        
+        reason = self.server.policy.blocked_request(url, self.headers)
+        if reason:
+            self._send_blocked(reason)
+            return
+        
+        archive = self.server.archive
+        if archive is not None and archive.replaying:
+            # 재생 모드: 업스트림에 연결하지 않고 기록된 응답만 사용
+            length = int(self.headers.get("Content-Length", 0) or 0)
+            if length:
+                self.rfile.read(length)
+            recorded = archive.lookup(self.command, url)
+            if recorded is None:
+                stats.add("replay_miss")
+                self.send_error(404, "Not in archive")
+                return
+            stats.add("replay_hit")
+            self._send(*recorded)
+            return
+        
+        cache = self.server.cache
+        use_cache = cache is not None and self.command == "GET" and cache.cacheable_url(url)
+        if use_cache:
+            cached = cache.get(url, self.headers)
+            if cached is not None:
+                stats.add("cache_hit")
+                stats.add("bytes_from_cache", len(cached[3]))
+                if archive is not None:
+                    archive.add(self.command, url, *cached, elapsed_ms=0)
+                self._send(*cached)
+                return
+            stats.add("cache_miss")
+        
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        body = self.rfile.read(length) if length else None
+        start = time.time()
+        try:
+            status, status_reason, headers, data = self.fetch_upstream(url, body)
+        except (http.client.HTTPException, OSError) as e:
+            stats.add("upstream_errors")
+            self.send_error(502, str(e))
+            return
+        elapsed_ms = (time.time() - start) * 1000
+        
+        if data is None:
+            self._send_blocked("content_type")
+            return
+        if use_cache and cache.put(url, self.headers, status, status_reason, headers, data):
+            stats.add("cache_store")
+        if archive is not None:
+            archive.add(self.command, url, status, status_reason, headers, data, elapsed_ms=elapsed_ms)
+        self._send(status, status_reason, headers, data)
+    
+    do_GET = _forward
+    do_HEAD = _forward
+    do_POST = _forward
+    do_PUT = _forward
+    do_DELETE = _forward
+    do_OPTIONS = _forward
+    do_PATCH = _forward
+    
+    def finish(self):
+        for conn in getattr(self, "_pool", {}).values():
+            conn.close()
+        super().finish()
+
+class CaptureProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, address, policy, ssl_context, cache=None, handler_class=CaptureProxyHandler, archive=None):
+        super().__init__(address, handler_class)
+        self.policy = policy
+        self.ssl_context = ssl_context
+        self.cache = cache
+        self.archive = archive
+        self.upstream_context = ssl.create_default_context()
+        self.stats = ProxyStats()
+
+class CaptureProxy:
+    """백그라운드 스레드에서 실행되는 캡처 프록시"""
+    
+    server_class = CaptureProxyServer
+    
+    def __init__(self, blocklist=None, host=PROXY_HOST, port=PROXY_PORT, logger=None, cache=None, archive=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.policy = BlockPolicy(blocklist if blocklist is not None else DEFAULT_BLOCKLIST)
+        
+        ssl_context = None
+        cert = ensure_certificate()
+        if cert:
+            ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ssl_context.load_cert_chain(*cert)
+            ssl_context.set_alpn_protocols(["http/1.1"])
+        else:
+            self.logger.warning("프록시 인증서를 만들 수 없어 HTTPS는 호스트 단위로만 차단합니다 "
+                                "(cryptography 패키지 또는 openssl 필요).")
+            if cache is not None:
+                self.logger.warning("프록시 인증서가 없어 HTTPS 리소스는 캐시하지 않습니다.")
+            if archive is not None:
+                raise ValueError("프록시 인증서가 없어 HTTPS 응답을 기록/재생할 수 없습니다.")
+        
+        self.cache = cache
+        self.server = self.server_class((host, port), self.policy, ssl_context, cache, archive=archive)
+        self.address = self.server.server_address
+        self.thread = threading.Thread(target=self.server.serve_forever, name="capture-proxy", daemon=True)
+    
+    def start(self):
+        self.thread.start()
+        self.logger.info(f"캡처 프록시 시작: {self.address[0]}:{self.address[1]}")
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+    
+    def stats(self):
+        return self.server.stats.snapshot()
+    
+    def log_stats(self, logger=None):
+        logger = logger or self.logger
+        stats = self.stats()
+        logger.info(f"프록시 통계: 요청 {stats.get('requests', 0)}건, 차단 {stats.get('blocked', 0)}건 "
+                    f"(호스트 {stats.get('blocked_host', 0)}, URL {stats.get('blocked_url', 0)}, "
+                    f"목적지 {stats.get('blocked_destination', 0)}, 콘텐츠 유형 {stats.get('blocked_content_type', 0)}), "
+                    f"업스트림 수신 {stats.get('bytes_from_upstream', 0):,} bytes")
+        if self.cache is not None:
+            summary = self.cache.summary()
+            hits, misses = stats.get('cache_hit', 0), stats.get('cache_miss', 0)
+            hit_rate = hits / (hits + misses) if hits + misses else 0.0
+            logger.info(f"리소스 캐시: 적중 {hits}건, 미적중 {misses}건 (적중률 {hit_rate:.1%}), "
+                        f"저장 {stats.get('cache_store', 0)}건, 캐시에서 전송 {stats.get('bytes_from_cache', 0):,} bytes, "
+                        f"보관 {summary['entries']}개 / {summary['bytes']:,} bytes, 누적 삭제 {summary['evicted']}개")
+        if stats.get('replay_hit') or stats.get('replay_miss'):
+            logger.info(f"아카이브 재생: 적중 {stats.get('replay_hit', 0)}건, 없음 {stats.get('replay_miss', 0)}건")
+
+def compare_blocking(games, logger, blocklist=None):
+    """같은 게임을 차단 없이/차단하여 캡처하고 소요 시간, 전송량, 이미지 차이를 비교"""
+    import tempfile
+    import time
+    from PIL import Image, ImageChops
+    from auto_capture_and_update import GAMES, PageBlockedError, setup_driver, capture_game_review_firefox
+    from app_registry import resolve_app
+    
+    proxy = CaptureProxy(blocklist, logger=logger).start()
+    proxy_address = f"{proxy.address[0]}:{proxy.address[1]}"
+    work_dir = tempfile.mkdtemp(prefix="proxy_compare_")
+    date_str = datetime.datetime.now().strftime('%Y%m%d')
+    all_same = True
+    
+    try:
+        for name in games:
+            try:
+                app_id, game_name = resolve_app(GAMES, name)
+            except ValueError as e:
+                logger.error(e)
+                all_same = False
+                continue
+            
+            images = {}
+            for mode, options in (("plain", {"image_format": "png"}),
+                                  ("blocked", {"image_format": "png", "proxy": proxy_address})):
+                save_dir = os.path.join(work_dir, mode)
+                os.makedirs(save_dir, exist_ok=True)
+                before = proxy.stats().get("bytes_from_upstream", 0)
+                driver = setup_driver(options)
+                start = time.time()
+                try:
+                    ok = capture_game_review_firefox(driver, app_id, game_name, save_dir, logger, options,
+                                                     date_str=date_str)
+                except PageBlockedError as e:
+                    # 차단된 게임만 비교에서 빼고 나머지 게임은 계속 비교
+                    logger.warning(f"[{mode}] {game_name}: 차단 페이지 감지 ({e})")
+                    ok = False
+                finally:
+                    driver.quit()
+                elapsed = time.time() - start
+                transferred = proxy.stats().get("bytes_from_upstream", 0) - before
+                logger.info(f"[{mode}] {game_name}: {'성공' if ok else '실패'}, {elapsed:.1f}초"
+                            + (f", 프록시 수신 {transferred:,} bytes" if mode == "blocked" else ""))
+                if ok:
+                    path = os.path.join(save_dir, f"{game_name}_{date_str}.png")
+                    images[mode] = Image.open(path).convert('RGB')
+            
+            if len(images) < 2:
+                all_same = False
+            else:
+                plain, blocked = images["plain"], images["blocked"]
+                if plain.size != blocked.size:
+                    logger.warning(f"{game_name}: 이미지 크기가 다릅니다 {plain.size} vs {blocked.size}")
+                    all_same = False
+                    continue
+                diff = ImageChops.difference(plain, blocked).convert('L')
+                changed = sum(diff.point(lambda v: 255 if v > 16 else 0).histogram()[255:])
+                ratio = changed / (plain.width * plain.height)
+                logger.info(f"{game_name}: 차단 모드 이미지 차이 {ratio:.2%} (영역 {diff.getbbox()})")
+                all_same = all_same and ratio < 0.01
+    finally:
+        proxy.log_stats(logger)
+        proxy.stop()
+    
+    logger.info(f"비교 이미지 폴더: {work_dir}")
+    return all_same
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="캡처용 로컬 필터링/캐싱 프록시")
+    parser.add_argument("--blocklist", default=None, help="차단 목록 JSON 파일")
+    parser.add_argument("--no-block", action="store_true", help="리소스 차단 없이 중계/캐시만 사용")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    serve_parser = sub.add_parser("serve", help="프록시 실행")
+    serve_parser.add_argument("--port", type=int, default=PROXY_PORT, help="프록시 포트 (기본값: 빈 포트 자동 선택)")
+    serve_parser.add_argument("--cache", action="store_true", help="정적 리소스 디스크 캐시 사용")
+    serve_parser.add_argument("--cache-max-mb", type=int, default=ASSET_CACHE_MAX_MB, help="캐시 최대 크기 (MB)")
+    
+    compare_parser = sub.add_parser("compare", help="차단 모드와 일반 모드 캡처 비교")
+    compare_parser.add_argument("games", nargs="+", help="게임 이름 또는 앱 ID")
+    compare_parser.add_argument("--registry", default=None, help="캡처 대상 앱 레지스트리 파일 (기본값: apps.json)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    logger = setup_logging()
+    blocklist = {} if args.no_block else load_blocklist(args.blocklist)
+    
+    if args.command == "compare":
+        from auto_capture_and_update import REGISTRY_FILE, use_registry
+        try:
+            use_registry(args.registry or REGISTRY_FILE)
+        except (OSError, ValueError) as e:
+            logger.error(f"앱 레지스트리를 불러올 수 없습니다: {e}")
+            return False
+        return compare_blocking(args.games, logger, blocklist)
+    
+    cache = AssetCache(max_mb=args.cache_max_mb) if args.cache else None
+    proxy = CaptureProxy(blocklist, port=args.port, logger=logger, cache=cache).start()
+    try:
+        proxy.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.log_stats()
+        proxy.stop()
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스토어 페이지 기록/재생 아카이브
+
+record 모드는 캡처 프록시를 거쳐 실제 캡처 과정(스크롤, 지연 로딩 이미지, 폰트, XHR 포함)을 한 번 실행하면서
+모든 응답(본문, 헤더, 소요 시간)과 렌더링이 끝난 DOM, 페이지 타이밍을 앱별 zip 아카이브로 저장한다.
+replay 모드는 프록시가 업스트림 대신 아카이브의 응답만 돌려주므로 네트워크 없이 같은 페이지를
+반복해서 불러올 수 있다 (선택자 디버깅, 잘라내기 영역 조정, 벤치마크용).
+
+사용 예:
+    python page_archive.py record                        # 모든 게임 기록
+    python page_archive.py record NewMatgo
+    python page_archive.py replay NewMatgo --save-dir replay_out
+    python page_archive.py serve --port 8899             # 다른 스크립트용 재생 프록시
+    python page_archive.py info
+"""
+
+import os
+import json
+import time
+import zipfile
+import hashlib
+import shutil
+import logging
+import datetime
+import argparse
+import tempfile
+import threading
+from urllib.parse import urlsplit
+
+from auto_capture_and_update import (GAMES, IMAGE_FORMATS, use_registry, setup_driver, capture_game_review_firefox,
+                                     store_page_url)
+from app_registry import REGISTRY_FILE, select_apps
+from capture_proxy import CaptureProxy, PROXY_PORT, load_blocklist
+
+ARCHIVE_DIR = "archives"
+
+# 기록할 때 함께 저장하는 페이지 타이밍 (Navigation/Resource Timing)
+PAGE_TIMING_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+return {
+    navigation: nav ? nav.toJSON() : null,
+    resources: performance.getEntriesByType('resource').map(r => ({
+        name: r.name, type: r.initiatorType, start: r.startTime, duration: r.duration,
+        transfer_size: r.transferSize,
+    })),
+};
+"""
+
+def setup_logging():
+    """로깅 설정"""
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
+    
+    log_file = os.path.join(log_dir, f"page_archive_{datetime.datetime.now().strftime('%Y%m%d')}.log")
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    return logging.getLogger(__name__)
+
+def archive_path(app_id, archive_dir=ARCHIVE_DIR):
+    """앱의 아카이브 파일 경로"""
+    return os.path.join(archive_dir, f"{app_id}.zip")
+
+class PageArchive:
+    """프록시를 지나는 응답을 기록하고 zip 파일로 저장
+    
+    zip 안에는 index.json(요청 목록), bodies/<sha256>(본문, 같은 내용은 한 번만),
+    dom.html(렌더링된 DOM), timing.json(페이지 타이밍), meta.json이 들어간다.
+    """
+    
+    replaying = False
+    
+    def __init__(self):
+        self.entries = []
+        self.bodies = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+    
+    def add(self, method, url, status, reason, headers, body, elapsed_ms=0):
+        """응답 하나 기록 (프록시 처리 스레드에서 호출)"""
+        digest = hashlib.sha256(body).hexdigest()
+        entry = {
+            "method": method,
+            "url": url,
+            "status": status,
+            "reason": reason,
+            "headers": [list(h) for h in headers],
+            "body": digest,
+            "size": len(body),
+            "offset_ms": round((time.time() - self.started) * 1000 - elapsed_ms, 1),
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        with self._lock:
+            self.entries.append(entry)
+            self.bodies[digest] = body
+    
+    def save(self, path, meta, dom_html, timing):
+        """기록한 응답과 DOM, 타이밍을 zip 아카이브로 저장"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            entries = sorted(self.entries, key=lambda e: e["offset_ms"])
+            bodies = dict(self.bodies)
+        
+        tmp_path = path + ".tmp"
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("meta.json", json.dumps(meta, ensure_ascii=False, indent=2))
+            zf.writestr("index.json", json.dumps(entries, ensure_ascii=False))
+            zf.writestr("dom.html", dom_html)
+            zf.writestr("timing.json", json.dumps(timing, ensure_ascii=False))
+            for digest, body in bodies.items():
+                zf.writestr(f"bodies/{digest}", body)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+class ReplayArchive:
+    """여러 아카이브의 응답을 합쳐 요청에 맞는 기록을 돌려줌
+    
+    같은 URL이 여러 번 기록되었으면 기록 순서대로 돌려주고 마지막 것을 반복한다.
+    URL이 정확히 일치하지 않으면 (요청 ID, 타임스탬프 같은 쿼리 차이) 같은 호스트/경로의
+    기록을 순서대로 사용한다.
+    """
+    
+    replaying = True
+    
+    def __init__(self, paths):
+        self._exact = {}
+        self._by_path = {}
+        self._served = {}
+        self._lock = threading.Lock()
+        self.archives = []
+        for path in paths:
+            self._load(path)
+    
+    def _load(self, path):
+        with zipfile.ZipFile(path) as zf:
+            meta = json.loads(zf.read("meta.json"))
+            entries = json.loads(zf.read("index.json"))
+            bodies = {name[len("bodies/"):]: zf.read(name) for name in zf.namelist() if name.startswith("bodies/")}
+        for entry in entries:
+            recorded = (entry["status"], entry["reason"], [tuple(h) for h in entry["headers"]], bodies[entry["body"]])
+            self._exact.setdefault((entry["method"], entry["url"]), []).append(recorded)
+            self._by_path.setdefault((entry["method"],) + self._path_key(entry["url"]), []).append(recorded)
+        self.archives.append(meta)
+    
+    @staticmethod
+    def _path_key(url):
+        parts = urlsplit(url)
+        return parts.netloc, parts.path
+    
+    def _next(self, key, candidates):
+        with self._lock:
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        return candidates[min(index, len(candidates) - 1)]
+    
+    def lookup(self, method, url):
+        """요청에 해당하는 (상태, 사유, 헤더 목록, 본문) 반환 (기록이 없으면 None)"""
+        key = (method, url)
+        if key in self._exact:
+            return self._next(key, self._exact[key])
+        path_key = (method,) + self._path_key(url)
+        if path_key in self._by_path:
+            return self._next(path_key, self._by_path[path_key])
+        return None
+    
+    def rewind(self):
+        """재생 순서를 처음으로 되돌림 (같은 페이지를 다시 불러오기 전에 호출)"""
+        with self._lock:
+            self._served.clear()
+
+def load_replay_archive(games, archive_dir=ARCHIVE_DIR):
+    """게임들의 아카이브를 모아 재생용 아카이브 생성"""
+    paths = [archive_path(app_id, archive_dir) for app_id in games]
+    missing = [GAMES.get(app_id, app_id) for app_id, path in zip(games, paths) if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"아카이브가 없습니다: {', '.join(missing)} (먼저 record 명령을 실행하세요)")
+    return ReplayArchive(paths)
+
+def scratch_options(work_dir, **options):
+    """기록/재생용 캡처 옵션 (선택자 캐시는 임시 폴더에 두고 리뷰 텍스트는 저장하지 않음)"""
+    return dict(options, selector_cache_file=os.path.join(work_dir, "selector_cache.json"), extract_reviews=False)
+
+def record_archives(games, archive_dir, blocklist, logger):
+    """실제 스토어 페이지를 프록시로 불러와 캡처까지 실행하며 앱별 아카이브 저장
+    
+    재생 캡처가 요청하는 지연 로딩 이미지, 폰트, XHR도 기록되도록 페이지 준비 대기만 하지 않고 같은 캡처 경로를 탄다.
+    """
+    proxy = CaptureProxy(blocklist, port=0, logger=logger, archive=PageArchive()).start()
+    work_dir = tempfile.mkdtemp(prefix="page_archive_")
+    options = scratch_options(work_dir, proxy=f"{proxy.address[0]}:{proxy.address[1]}")
+    driver = setup_driver(options)
+    saved = 0
+    try:
+        for app_id, game_name in games.items():
+            archive = proxy.server.archive = PageArchive()
+            url = store_page_url(app_id)
+            try:
+                start = time.time()
+                if not capture_game_review_firefox(driver, app_id, game_name, work_dir, logger, options):
+                    raise RuntimeError("캡처 실패")
+                load_seconds = time.time() - start
+                meta = {
+                    "app_id": app_id,
+                    "game_name": game_name,
+                    "url": url,
+                    "recorded": datetime.datetime.now().isoformat(timespec='seconds'),
+                    "load_seconds": round(load_seconds, 2),
+                    "requests": len(archive.entries),
+                }
+                dom_html = "<!DOCTYPE html>\n" + driver.execute_script("return document.documentElement.outerHTML")
+                timing = driver.execute_script(PAGE_TIMING_SCRIPT)
+                size = archive.save(archive_path(app_id, archive_dir), meta, dom_html, timing)
+                saved += 1
+                logger.info(f"기록 완료: {game_name} (요청 {meta['requests']}건, 로딩+캡처 {load_seconds:.1f}초, "
+                            f"아카이브 {size:,} bytes)")
+            except Exception as e:
+                logger.error(f"기록 실패 ({game_name}): {e}")
+    finally:
+        driver.quit()
+        proxy.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return saved == len(games)
+
+def replay_captures(games, archive_dir, save_dir, options, logger):
+    """아카이브만으로 페이지를 불러와 실제 캡처 로직 실행"""
+    replay = load_replay_archive(games, archive_dir)
+    proxy = CaptureProxy({}, port=0, logger=logger, archive=replay).start()
+    work_dir = tempfile.mkdtemp(prefix="page_replay_")
+    options = scratch_options(work_dir, **options, proxy=f"{proxy.address[0]}:{proxy.address[1]}")
+    os.makedirs(save_dir, exist_ok=True)
+    driver = setup_driver(options)
+    results = {}
+    try:
+        for app_id, game_name in games.items():
+            replay.rewind()
+            start = time.time()
+            results[game_name] = capture_game_review_firefox(driver, app_id, game_name, save_dir, logger, options)
+            logger.info(f"재생 캡처: {game_name} {'성공' if results[game_name] else '실패'} ({time.time() - start:.1f}초)")
+    finally:
+        driver.quit()
+        proxy.log_stats(logger)
+        proxy.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return all(results.values())
+
+def print_archive_info(archive_dir):
+    """저장된 아카이브 목록과 요약 출력"""
+    if not os.path.isdir(archive_dir):
+        print(f"아카이브 폴더가 없습니다: {archive_dir}")
+        return False
+    for filename in sorted(os.listdir(archive_dir)):
+        if not filename.endswith(".zip"):
+            continue
+        path = os.path.join(archive_dir, filename)
+        with zipfile.ZipFile(path) as zf:
+            meta = json.loads(zf.read("meta.json"))
+            entries = json.loads(zf.read("index.json"))
+        body_bytes = sum(entry["size"] for entry in entries)
+        print(f"{meta['game_name']}: {meta['recorded']} 기록, 요청 {len(entries)}건, "
+              f"응답 {body_bytes:,} bytes -> 아카이브 {os.path.getsize(path):,} bytes, 로딩 {meta['load_seconds']}초")
+    return True
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="스토어 페이지 기록/재생 아카이브")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR, help="아카이브 폴더")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="캡처 대상 앱 레지스트리 파일 (기본값: apps.json)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    record_parser = sub.add_parser("record", help="실제 페이지를 불러와 아카이브 저장")
+    record_parser.add_argument("games", nargs="*", help="게임 이름 또는 앱 ID (기본값: 전체)")
+    record_parser.add_argument("--blocklist", default=None, help="기록 중 사용할 차단 목록 JSON 파일")
+    record_parser.add_argument("--no-block", action="store_true", help="차단 없이 모든 응답 기록")
+    
+    replay_parser = sub.add_parser("replay", help="아카이브로 캡처 실행")
+    replay_parser.add_argument("games", nargs="*", help="게임 이름 또는 앱 ID (기본값: 전체)")
+    replay_parser.add_argument("--save-dir", default="replay_output", help="캡처 저장 폴더")
+    replay_parser.add_argument("--format", default="png", choices=sorted(IMAGE_FORMATS), help="캡처 이미지 저장 형식")
+    
+    serve_parser = sub.add_parser("serve", help="재생 프록시만 실행")
+    serve_parser.add_argument("games", nargs="*", help="게임 이름 또는 앱 ID (기본값: 전체)")
+    serve_parser.add_argument("--port", type=int, default=PROXY_PORT, help="프록시 포트")
+    
+    sub.add_parser("info", help="저장된 아카이브 요약")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    if args.command == "info":
+        return print_archive_info(args.archive_dir)
+    
+    logger = setup_logging()
+    try:
+        use_registry(args.registry)
+        games = select_apps(GAMES, args.games)
+        if args.command == "record":
+            blocklist = {} if args.no_block else load_blocklist(args.blocklist)
+            return record_archives(games, args.archive_dir, blocklist, logger)
+        if args.command == "replay":
+            return replay_captures(games, args.archive_dir, os.path.abspath(args.save_dir),
+                                   {"image_format": args.format}, logger)
+        
+        proxy = CaptureProxy({}, port=args.port, logger=logger,
+                             archive=load_replay_archive(games, args.archive_dir)).start()
+    except (ValueError, OSError) as e:
+        logger.error(e)
+        return False
+    
+    logger.info("재생 프록시 실행 중 (Firefox에서 인증서 오류 허용 필요, Ctrl+C로 종료)")
+    try:
+        proxy.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.log_stats()
+        proxy.stop()
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
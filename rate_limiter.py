@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+모든 캡처 워커가 공유하는 스토어 요청 제한기 (SQLite 파일 기반)
+
+토큰 버킷으로 페이지 요청 속도를 제한하고, 차단/동의/캡차 페이지가 감지되면
+회로 차단기처럼 모든 워커의 요청을 일정 시간 멈춘다. 차단이 이어지면 대기 시간을 두 배씩 늘리고,
+대기가 끝나면 요청 하나만 먼저 보내 (half-open) 정상이면 다시 평소 속도로 돌아간다.
+같은 호스트의 여러 프로세스가 같은 파일을 쓰면 같은 제한을 공유한다 (SQLite 잠금을 믿을 수 있도록 로컬 디스크에 둔다).
+
+사용 예:
+    python rate_limiter.py status
+    python rate_limiter.py reset
+"""
+
+import os
+import time
+import random
+import socket
+import sqlite3
+import argparse
+import datetime
+import threading
+
+LIMITER_FILE = os.path.join(".cache", "rate_limiter.sqlite")
+DEFAULT_RATE_PER_MINUTE = 20
+DEFAULT_BURST = 4
+BACKOFF_BASE = 30       # 첫 차단 감지 후 대기 시간 (초)
+BACKOFF_MAX = 600       # 최대 대기 시간 (초)
+BACKOFF_JITTER = 0.2    # 대기 시간에 ±20% 무작위 편차 (워커들이 동시에 재시작하지 않도록)
+LEASE_SECONDS = 300     # 반환되지 않은 요청 슬롯은 이 시간이 지나면 동시 요청 수에서 빠짐 (종료된 프로세스 대비)
+WAIT_POLL_MAX = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS limiter (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    tokens REAL NOT NULL,
+    refilled_at REAL NOT NULL,
+    backoff_until REAL NOT NULL DEFAULT 0,
+    consecutive_blocks INTEGER NOT NULL DEFAULT 0,
+    in_flight INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS leases (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    acquired_at REAL NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    acquired INTEGER NOT NULL DEFAULT 0,
+    waited REAL NOT NULL DEFAULT 0,
+    max_in_flight INTEGER NOT NULL DEFAULT 0,
+    backoff_total REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    ts REAL NOT NULL,
+    reason TEXT NOT NULL,
+    app_id TEXT,
+    backoff REAL NOT NULL
+);
+"""
+
+class RateLimiter:
+    """토큰 버킷 + 회로 차단기 (상태는 SQLite 파일에 저장되어 프로세스 간 공유)
+    
+    동시 요청 수는 요청 슬롯마다 남기는 임대(lease) 행으로 센다. 임대는 받은 프로세스만 반환하고,
+    반환되지 않은 임대는 lease_seconds가 지나면 만료되므로 다른 실행의 계산을 건드리지 않는다.
+    통계는 run_id별로 쌓이므로 같은 실행의 워커 프로세스들은 run_id를 같게 준다.
+    한 인스턴스를 여러 스레드가 공유해도 된다.
+    """
+    
+    def __init__(self, path=LIMITER_FILE, rate_per_minute=DEFAULT_RATE_PER_MINUTE, burst=DEFAULT_BURST,
+                 run_id=None, lease_seconds=LEASE_SECONDS):
+        self.path = path
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.run_id = run_id or self.owner
+        self._leases = []  # 이 인스턴스가 받고 아직 반환하지 않은 임대 ID
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO limiter (id, tokens, refilled_at) VALUES (1, ?, ?)",
+                          (burst, time.time()))
+        self.conn.execute("INSERT OR IGNORE INTO runs (run_id, started) VALUES (?, ?)", (self.run_id, time.time()))
+    
+    def close(self):
+        self.conn.close()
+    
+    def _transaction(self, update):
+        """상태 행을 잠근 채 update(state, now)를 실행하고 결과 반환
+        
+        state["in_flight"]는 만료되지 않은 임대 수로 다시 계산된다. SQLite 연결 하나를 스레드들이 공유하므로
+        프로세스 안에서는 잠금으로, 프로세스 간에는 BEGIN IMMEDIATE로 직렬화한다.
+        """
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                self.conn.execute("DELETE FROM leases WHERE expires < ?", (now,))
+                state = dict(self.conn.execute(
+                    "SELECT tokens, refilled_at, backoff_until, consecutive_blocks FROM limiter WHERE id = 1"
+                ).fetchone())
+                state["in_flight"] = self.conn.execute("SELECT COUNT(*) FROM leases").fetchone()[0]
+                result = update(state, now)
+                self.conn.execute(
+                    "UPDATE limiter SET tokens = :tokens, refilled_at = :refilled_at, backoff_until = :backoff_until, "
+                    "consecutive_blocks = :consecutive_blocks, in_flight = :in_flight WHERE id = 1", state)
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+    
+    def _refill(self, state, now):
+        state["tokens"] = min(self.burst, state["tokens"] + (now - state["refilled_at"]) * self.rate)
+        state["refilled_at"] = now
+    
+    def acquire(self, timeout=None):
+        """요청 하나를 보낼 수 있을 때까지 대기하고 대기 시간(초) 반환 (시간 초과 시 TimeoutError)"""
+        start = time.time()
+        
+        def try_take(state, now):
+            self._refill(state, now)
+            if now < state["backoff_until"]:
+                return state["backoff_until"] - now
+            # 차단 직후 대기가 끝난 상태 (half-open): 요청 하나만 시험적으로 허용
+            if state["consecutive_blocks"] > 0 and state["in_flight"] > 0:
+                return WAIT_POLL_MAX
+            if state["tokens"] < 1:
+                return (1 - state["tokens"]) / self.rate if self.rate > 0 else WAIT_POLL_MAX
+            state["tokens"] -= 1
+            state["in_flight"] += 1
+            lease = self.conn.execute("INSERT INTO leases (owner, acquired_at, expires) VALUES (?, ?, ?)",
+                                      (self.owner, now, now + self.lease_seconds)).lastrowid
+            self._leases.append(lease)
+            self.conn.execute(
+                "UPDATE runs SET acquired = acquired + 1, waited = waited + ?, "
+                "max_in_flight = MAX(max_in_flight, ?) WHERE run_id = ?",
+                (now - start, state["in_flight"], self.run_id))
+            return 0
+        
+        while True:
+            wait = self._transaction(try_take)
+            if wait <= 0:
+                return time.time() - start
+            if timeout is not None and time.time() - start + wait > timeout:
+                raise TimeoutError(f"요청 제한 대기 시간 초과 ({timeout}초)")
+            time.sleep(min(wait, WAIT_POLL_MAX))
+    
+    def release(self, blocked_reason=None, app_id=None, ok=True):
+        """요청 결과 보고 (차단 사유가 있으면 회로를 열고 대기 시간 반환, 아니면 0)
+        
+        ok=False는 차단과 무관한 오류(시간 초과 등)로, 동시 요청 수만 줄이고 회로 상태는 바꾸지 않는다.
+        """
+        def report(state, now):
+            if self._leases:
+                lease = self._leases.pop()
+                state["in_flight"] -= self.conn.execute("DELETE FROM leases WHERE id = ?", (lease,)).rowcount
+            if not blocked_reason:
+                if ok:
+                    state["consecutive_blocks"] = 0
+                return 0
+            state["consecutive_blocks"] += 1
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (state["consecutive_blocks"] - 1))
+            backoff *= random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+            # 다른 워커가 이미 더 긴 대기를 걸어 두었으면 그대로 둠
+            until = max(state["backoff_until"], now + backoff)
+            self.conn.execute("UPDATE runs SET backoff_total = backoff_total + ? WHERE run_id = ?",
+                              (until - max(state["backoff_until"], now), self.run_id))
+            state["backoff_until"] = until
+            state["tokens"] = 0
+            self.conn.execute("INSERT INTO blocks (ts, reason, app_id, backoff) VALUES (?, ?, ?, ?)",
+                              (now, blocked_reason, app_id, until - now))
+            return until - now
+        
+        return self._transaction(report)
+    
+    def start_run(self):
+        """이번 실행의 통계를 처음부터 기록하고 오래된 기록 정리
+        
+        다른 실행의 임대와 통계는 건드리지 않는다. 회로 상태(차단 대기, 연속 차단 수)도 일부러 유지하므로
+        직전 실행이 차단된 채 끝났으면 이번 실행은 대기 후 시험 요청 하나부터 보낸다 (초기화는 reset 명령).
+        """
+        def start(state, now):
+            self.conn.execute("INSERT OR REPLACE INTO runs (run_id, started) VALUES (?, ?)", (self.run_id, now))
+            self.conn.execute("DELETE FROM runs WHERE started < ?", (now - 7 * 86400,))
+            self.conn.execute("DELETE FROM blocks WHERE ts < ?", (now - 7 * 86400,))
+        
+        self._transaction(start)
+    
+    def summary(self, since=None):
+        """현재 상태와 이번 실행 통계 (since 이후 차단 감지 사유별 횟수 포함, 기본값은 실행 시작 시각)"""
+        with self._lock:
+            state = dict(self.conn.execute(
+                "SELECT tokens, refilled_at, backoff_until, consecutive_blocks FROM limiter WHERE id = 1").fetchone())
+            now = time.time()
+            state["in_flight"] = self.conn.execute("SELECT COUNT(*) FROM leases WHERE expires >= ?", (now,)).fetchone()[0]
+            run = self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (self.run_id,)).fetchone()
+            run = dict(run) if run else {"started": now, "acquired": 0, "waited": 0.0, "max_in_flight": 0,
+                                         "backoff_total": 0.0}
+            since = since if since is not None else run["started"]
+            blocks = {row["reason"]: row["n"] for row in self.conn.execute(
+                "SELECT reason, COUNT(*) AS n FROM blocks WHERE ts >= ? GROUP BY reason", (since,))}
+        if now < state["backoff_until"]:
+            circuit = "open"
+        elif state["consecutive_blocks"] > 0:
+            circuit = "half-open"
+        else:
+            circuit = "closed"
+        state.update({key: run[key] for key in ("acquired", "waited", "max_in_flight", "backoff_total")})
+        state.update(circuit=circuit, blocks=blocks, backoff_remaining=max(0.0, state["backoff_until"] - now))
+        return state
+    
+    def log_summary(self, logger):
+        s = self.summary()
+        blocks = ", ".join(f"{reason} {n}" for reason, n in sorted(s["blocks"].items())) or "없음"
+        logger.info(f"요청 제한: 요청 {s['acquired']}건, 대기 {s['waited']:.1f}초, "
+                    f"현재 동시 요청 {s['in_flight']}건 (최대 {s['max_in_flight']}건), 차단 감지 {blocks}, "
+                    f"백오프 {s['backoff_total']:.0f}초, 회로 {s['circuit']}"
+                    + (f" (남은 대기 {s['backoff_remaining']:.0f}초)" if s["backoff_remaining"] else ""))
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="공유 스토어 요청 제한기")
+    parser.add_argument("--file", default=LIMITER_FILE, help="제한기 상태 파일")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="현재 상태와 최근 차단 감지 기록 출력")
+    sub.add_parser("reset", help="차단 대기 상태와 모든 임대 초기화")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    limiter = RateLimiter(args.file)
+    try:
+        if args.command == "reset":
+            limiter.conn.execute("UPDATE limiter SET backoff_until = 0, consecutive_blocks = 0, in_flight = 0")
+            limiter.conn.execute("DELETE FROM leases")
+            limiter.start_run()
+        s = limiter.summary(since=0)
+        print(f"회로: {s['circuit']}, 남은 대기 {s['backoff_remaining']:.0f}초, 연속 차단 {s['consecutive_blocks']}회, "
+              f"토큰 {s['tokens']:.1f}, 동시 요청 {s['in_flight']}건")
+        for row in limiter.conn.execute("SELECT * FROM blocks ORDER BY ts DESC LIMIT 20"):
+            ts = datetime.datetime.fromtimestamp(row["ts"]).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"  {ts} {row['reason']:<10} {row['app_id'] or '-'} (대기 {row['backoff']:.0f}초)")
+        return True
+    finally:
+        limiter.close()
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+앱별 평점 지표 시계열 (NumPy 열 배열) 과 대시보드용 집계
+
+리뷰 저장소(review_store.py)의 날짜별 평점 기록을 지표마다 (앱 x 날짜) 배열 하나로 모아
+.cache/rating_series.npz에 저장한다. 날짜 축은 첫 캡처일부터 마지막 캡처일까지의 달력 일 단위이며
+캡처가 없는 날은 NaN이다. 7일 이동 평균, 주간 변화, 평점 수 증가 속도, 1점 비율과
+사업실(red/blue/brown)별 합계는 모두 배열 연산으로 한 번에 계산하고,
+캡처 날짜별 결과를 rating_summary.json으로 저장하여 대시보드(aos_review.html)가 그대로 표시한다.
+
+사용 예:
+    python rating_series.py build
+    python rating_series.py show Poker
+"""
+
+import os
+import json
+import datetime
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from app_registry import REGISTRY_FILE, load_registry
+from review_store import ReviewStore, REVIEW_STORE_FILE
+
+SERIES_FILE = os.path.join(".cache", "rating_series.npz")
+SUMMARY_FILE = "rating_summary.json"
+METRICS = ("rating", "rating_count", "one_star_share")
+WINDOW_DAYS = 7
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("평점 시계열에는 numpy가 필요합니다 (pip install numpy)")
+
+def build_series(rows, app_ids):
+    """리뷰 저장소의 app_days 행들로 지표별 (앱 x 날짜) 배열 생성"""
+    _require_numpy()
+    rows = [row for row in rows if row["app_id"] in app_ids]
+    series = {"apps": np.array(app_ids), "start": np.datetime64("today", "D"), "days": 0}
+    if not rows:
+        for metric in METRICS:
+            series[metric] = np.full((len(app_ids), 0), np.nan)
+        return series
+    
+    app_index = {app_id: i for i, app_id in enumerate(app_ids)}
+    dates = np.array([f"{row['date'][:4]}-{row['date'][4:6]}-{row['date'][6:8]}" for row in rows],
+                     dtype="datetime64[D]")
+    start = dates.min()
+    days = int((dates.max() - start).astype(int)) + 1
+    rows_app = np.array([app_index[row["app_id"]] for row in rows])
+    rows_day = (dates - start).astype(int)
+    
+    histograms = [json.loads(row["histogram"] or "{}") for row in rows]
+    # 막대 너비를 합이 1이 되도록 정규화 (막대가 최대값 기준 너비여도 비율이 맞도록)
+    totals = np.array([sum(v for v in h.values() if v is not None) for h in histograms], dtype=float)
+    one_star = np.array([h.get("1") if h.get("1") is not None else np.nan for h in histograms], dtype=float)
+    values = {
+        "rating": np.array([row["rating"] if row["rating"] is not None else np.nan for row in rows], dtype=float),
+        "rating_count": np.array([row["rating_count"] if row["rating_count"] is not None else np.nan
+                                  for row in rows], dtype=float),
+        "one_star_share": np.divide(one_star, totals, out=np.full_like(one_star, np.nan), where=totals > 0),
+    }
+    series.update(start=start, days=days)
+    for metric in METRICS:
+        column = np.full((len(app_ids), days), np.nan)
+        column[rows_app, rows_day] = values[metric]
+        series[metric] = column
+    return series
+
+def save_series(series, path=SERIES_FILE):
+    _require_numpy()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp_file, apps=series["apps"], start=np.array(series["start"]),
+                        days=np.array(series["days"]), **{metric: series[metric] for metric in METRICS})
+    os.replace(tmp_file, path)
+
+def load_series(path=SERIES_FILE):
+    _require_numpy()
+    with np.load(path) as data:
+        series = {key: data[key] for key in data.files}
+    series["start"] = series["start"][()]
+    series["days"] = int(series["days"])
+    return series
+
+def forward_fill(values):
+    """각 행의 NaN을 왼쪽(이전 날짜)의 마지막 값으로 채움 (처음부터 NaN인 구간은 그대로)"""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = values[np.arange(values.shape[0])[:, None], index]
+    filled[~np.maximum.accumulate(valid, axis=1)] = np.nan
+    return filled
+
+def _require_window(days):
+    if days < 1:
+        raise ValueError(f"기간은 1일 이상이어야 합니다: {days}")
+
+def rolling_mean(values, window=WINDOW_DAYS):
+    """NaN을 제외한 window일 이동 평균 (창 안에 값이 없으면 NaN)"""
+    _require_window(window)
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    counts[:, window:] = counts[:, window:] - counts[:, :-window]
+    return np.divide(sums, counts, out=np.full(values.shape, np.nan), where=counts > 0)
+
+def lag(values, days):
+    """days일 전 값 (앞쪽은 NaN, days는 1 이상)"""
+    _require_window(days)
+    lagged = np.full(values.shape, np.nan)
+    if days < values.shape[1]:
+        lagged[:, days:] = values[:, :-days]
+    return lagged
+
+def weighted_mean(values, weights, axis=0):
+    """값이 있는 항목만 가중 평균 (가중치가 없으면 NaN)"""
+    usable = ~np.isnan(values) & ~np.isnan(weights)
+    total = np.where(usable, weights, 0.0).sum(axis=axis)
+    weighted = np.where(usable, values * weights, 0.0).sum(axis=axis)
+    return np.divide(weighted, total, out=np.full(total.shape, np.nan), where=total > 0)
+
+def nan_sum(values, axis=0):
+    """NaN을 제외한 합계 (모든 항목이 NaN이면 0이 아니라 NaN)"""
+    return np.where(np.isnan(values).all(axis=axis), np.nan, np.nansum(values, axis=axis))
+
+def compute_aggregates(series, businesses, window=WINDOW_DAYS):
+    """앱별/사업실별 지표 배열 계산 (앱별은 (앱 x 날짜), 사업실별은 사업실 -> (날짜,))"""
+    rating = forward_fill(series["rating"])
+    rating_count = forward_fill(series["rating_count"])
+    one_star = forward_fill(series["one_star_share"])
+    rating_avg = forward_fill(rolling_mean(series["rating"], window))
+    apps = {
+        "rating": rating,
+        "rating_avg": rating_avg,
+        "rating_wow": rating_avg - lag(rating_avg, window),
+        "rating_count": rating_count,
+        "count_velocity": (rating_count - lag(rating_count, window)) / window,  # 하루당 평점 수 증가
+        "one_star_share": one_star,
+        "one_star_wow": one_star - lag(one_star, window),
+    }
+    
+    groups = {}
+    app_business = np.array([businesses.get(app_id) for app_id in series["apps"]])
+    for business in sorted(set(businesses.values())):
+        mask = app_business == business
+        weights = rating_count[mask]
+        groups[business] = {
+            "rating": weighted_mean(rating[mask], weights),
+            "rating_wow": weighted_mean(apps["rating_wow"][mask], weights),
+            "rating_count": nan_sum(weights),
+            "count_velocity": nan_sum(apps["count_velocity"][mask]),
+            "one_star_share": weighted_mean(one_star[mask], weights),
+        }
+    return apps, groups
+
+def _number(value, digits):
+    return None if np.isnan(value) else round(float(value), digits)
+
+def summary_for_dashboard(series, aggregates, names, capture_days):
+    """캡처 날짜별 앱/사업실 지표 (대시보드가 바로 쓰는 JSON 구조)"""
+    apps, groups = aggregates
+    digits = {"rating": 2, "rating_avg": 2, "rating_wow": 3, "rating_count": 0, "count_velocity": 1,
+              "one_star_share": 4, "one_star_wow": 4}
+    dates = {}
+    for day in capture_days:
+        date_str = str(series["start"] + np.timedelta64(int(day), "D")).replace("-", "")
+        dates[date_str] = {
+            # 아직 평점 기록이 없는 앱은 생략
+            "apps": {names[app_id]: {metric: _number(values[i, day], digits[metric])
+                                     for metric, values in apps.items()}
+                     for i, app_id in enumerate(series["apps"]) if not np.isnan(apps["rating"][i, day])},
+            "business": {business: {metric: _number(values[day], digits[metric])
+                                    for metric, values in metrics.items()}
+                         for business, metrics in groups.items()},
+        }
+    return {"generated": datetime.datetime.now().isoformat(timespec='seconds'), "window_days": WINDOW_DAYS,
+            "dates": dates}
+
+def update_rating_series(store, apps, base_dir=".", series_file=SERIES_FILE, logger=None):
+    """리뷰 저장소의 평점 기록으로 시계열 파일과 대시보드 집계 파일(rating_summary.json)을 다시 만듦"""
+    dashboard_apps = [app for app in apps if app.get("business")]
+    app_ids = [app["app_id"] for app in dashboard_apps]
+    series = build_series(store.rating_history(app_ids), app_ids)
+    save_series(series, series_file)
+    
+    aggregates = compute_aggregates(series, {app["app_id"]: app["business"] for app in dashboard_apps})
+    capture_days = np.flatnonzero((~np.isnan(series["rating"])).any(axis=0))
+    summary = summary_for_dashboard(series, aggregates, {app["app_id"]: app["name"] for app in dashboard_apps},
+                                    capture_days)
+    summary_file = os.path.join(base_dir, SUMMARY_FILE)
+    tmp_file = f"{summary_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, summary_file)
+    if logger:
+        logger.info(f"평점 시계열: 앱 {len(app_ids)}개 x {series['days']}일, 캡처 날짜 {len(capture_days)}개 "
+                    f"-> {summary_file}")
+    return summary
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="평점 지표 시계열과 대시보드 집계")
+    parser.add_argument("--store", default=REVIEW_STORE_FILE, help="리뷰 저장소 SQLite 파일")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="앱 레지스트리 파일")
+    parser.add_argument("--series-file", default=SERIES_FILE, help="시계열 배열 파일 (.npz)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="시계열과 rating_summary.json 다시 만들기")
+    build_parser.add_argument("--base-dir", default=".", help="rating_summary.json을 저장할 폴더")
+    show_parser = sub.add_parser("show", help="저장된 시계열의 앱별 최근 지표 출력")
+    show_parser.add_argument("games", nargs="*", help="게임 이름 또는 앱 ID (기본값: 전체)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    try:
+        _require_numpy()
+        apps = load_registry(args.registry)
+    except (RuntimeError, OSError, ValueError) as e:
+        print(e)
+        return False
+    
+    if args.command == "build":
+        store = ReviewStore(args.store)
+        try:
+            summary = update_rating_series(store, apps, args.base_dir, args.series_file)
+        finally:
+            store.close()
+        print(f"캡처 날짜 {len(summary['dates'])}개 -> {os.path.join(args.base_dir, SUMMARY_FILE)}")
+        return True
+    
+    try:
+        series = load_series(args.series_file)
+    except OSError as e:
+        print(f"시계열 파일을 읽을 수 없습니다: {e}")
+        return False
+    businesses = {app["app_id"]: app["business"] for app in apps if app.get("business")}
+    names = {app["app_id"]: app["name"] for app in apps}
+    app_metrics, _ = compute_aggregates(series, businesses)
+    for i, app_id in enumerate(series["apps"]):
+        if args.games and app_id not in args.games and names.get(app_id) not in args.games:
+            continue
+        latest = {metric: values[i, -1] if series["days"] else np.nan for metric, values in app_metrics.items()}
+        print(f"{names.get(app_id, app_id):<16} 평점 {latest['rating']:.2f} (7일 평균 {latest['rating_avg']:.2f}, "
+              f"주간 {latest['rating_wow']:+.3f}), 평점 수 {latest['rating_count']:.0f} "
+              f"(하루 {latest['count_velocity']:+.1f}), 1점 비율 {latest['one_star_share']:.1%}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+날짜별 리뷰 텍스트를 모아 검색하는 로컬 리뷰 저장소 (SQLite + FTS5)
+
+캡처 스크립트가 날짜 폴더에 남기는 reviews_날짜.jsonl(상세 페이지 리뷰와 평점)과
+review_crawl_날짜.jsonl(전체 탐색 리뷰)을 하루 단위 트랜잭션 하나로 적재한다.
+리뷰는 (앱 ID, 리뷰 ID)로 upsert하므로 같은 리뷰를 여러 날 캡처해도 한 행만 남고,
+본문은 FTS5 색인으로, 날짜/별점/앱은 보조 색인으로 검색한다.
+
+사용 예:
+    python review_store.py ingest                    # 모든 날짜 폴더 적재
+    python review_store.py ingest 20251217
+    python review_store.py search 결제 --app PokerKakao --app Poker --stars 1 --since 2025-12-01
+    python review_store.py stats
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+
+REVIEW_STORE_FILE = os.path.join(".cache", "reviews.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    app_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    game_name TEXT,
+    author TEXT,
+    review_date TEXT,
+    stars INTEGER,
+    text TEXT,
+    helpful INTEGER NOT NULL DEFAULT 0,
+    language TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    UNIQUE (app_id, review_id)
+);
+CREATE INDEX IF NOT EXISTS reviews_date ON reviews (review_date);
+CREATE INDEX IF NOT EXISTS reviews_stars ON reviews (stars, review_date);
+CREATE INDEX IF NOT EXISTS reviews_app_date ON reviews (app_id, review_date);
+CREATE TABLE IF NOT EXISTS app_days (
+    app_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    game_name TEXT,
+    rating REAL,
+    rating_count INTEGER,
+    histogram TEXT,
+    PRIMARY KEY (app_id, date)
+);
+CREATE TABLE IF NOT EXISTS ingested (
+    date TEXT NOT NULL,
+    file TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    ingested_at REAL NOT NULL,
+    PRIMARY KEY (date, file)
+);
+"""
+
+# 리뷰 본문 전문 검색 색인 (reviews 테이블을 원본으로 하고 트리거로 동기화)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+    text, content='reviews', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+    INSERT INTO reviews_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+    INSERT INTO reviews_fts (reviews_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_fts_update AFTER UPDATE OF text ON reviews BEGIN
+    INSERT INTO reviews_fts (reviews_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO reviews_fts (rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+# 같은 리뷰가 다시 들어오면 바뀔 수 있는 값만 갱신 (값이 같으면 행과 FTS 색인을 건드리지 않음)
+UPSERT_REVIEW = """
+INSERT INTO reviews (app_id, review_id, game_name, author, review_date, stars, text, helpful, language,
+                     first_seen, last_seen)
+VALUES (:app_id, :review_id, :game_name, :author, :review_date, :stars, :text, :helpful, :language,
+        :seen, :seen)
+ON CONFLICT (app_id, review_id) DO UPDATE SET
+    stars = COALESCE(excluded.stars, stars),
+    text = COALESCE(excluded.text, text),
+    helpful = MAX(helpful, excluded.helpful),
+    first_seen = MIN(first_seen, excluded.first_seen),
+    last_seen = MAX(last_seen, excluded.last_seen)
+WHERE excluded.stars IS NOT stars OR excluded.text IS NOT text OR excluded.helpful > helpful
+    OR excluded.first_seen < first_seen OR excluded.last_seen > last_seen
+"""
+
+UPSERT_APP_DAY = """
+INSERT OR REPLACE INTO app_days (app_id, date, game_name, rating, rating_count, histogram)
+VALUES (:app_id, :date, :game_name, :rating, :rating_count, :histogram)
+"""
+
+def review_id_for(review):
+    """리뷰 ID (페이지에 ID가 없으면 작성자/날짜/본문 앞부분의 해시)"""
+    if review.get("id"):
+        return review["id"]
+    key = "|".join(str(review.get(field) or "") for field in ("author", "date", "text"))
+    return "h:" + hashlib.sha1(key[:300].encode('utf-8')).hexdigest()[:16]
+
+def fts_query(text):
+    """검색어를 FTS5 질의로 변환 (단어마다 접두어 검색이므로 '결제'는 '결제가', '결제를'도 찾음)"""
+    terms = re.findall(r"\w+", text or "")
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+def day_files(date_dir, date_str):
+    """날짜 폴더에서 적재할 리뷰 파일들"""
+    names = (f"reviews_{date_str}.jsonl", f"review_crawl_{date_str}.jsonl")
+    return [os.path.join(date_dir, name) for name in names if os.path.exists(os.path.join(date_dir, name))]
+
+class ReviewStore:
+    """(앱 ID, 리뷰 ID) 단위 리뷰 저장소"""
+    
+    def __init__(self, path=REVIEW_STORE_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        # FTS5가 없는 SQLite 빌드에서는 LIKE 검색으로 대체
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+    
+    def close(self):
+        self.conn.close()
+    
+    def ingest_day(self, date_dir, date_str, force=False):
+        """하루치 리뷰 파일들을 트랜잭션 하나로 적재하고 {"files", "reviews", "changed", "app_days"} 반환
+        
+        이미 같은 크기/수정 시각으로 적재한 파일은 건너뛴다 (force이면 다시 적재).
+        """
+        seen = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        result = {"files": 0, "reviews": 0, "changed": 0, "app_days": 0}
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for path in day_files(date_dir, date_str):
+                    name, stat = os.path.basename(path), os.stat(path)
+                    done = self.conn.execute("SELECT size, mtime FROM ingested WHERE date = ? AND file = ?",
+                                             (date_str, name)).fetchone()
+                    if done and not force and (done["size"], done["mtime"]) == (stat.st_size, stat.st_mtime):
+                        continue
+                    
+                    reviews, app_days = self._read_file(path, date_str, seen)
+                    result["changed"] += max(0, self.conn.executemany(UPSERT_REVIEW, reviews).rowcount)
+                    self.conn.executemany(UPSERT_APP_DAY, app_days)
+                    self.conn.execute("INSERT OR REPLACE INTO ingested VALUES (?, ?, ?, ?, ?)",
+                                      (date_str, name, stat.st_size, stat.st_mtime, time.time()))
+                    result["files"] += 1
+                    result["reviews"] += len(reviews)
+                    result["app_days"] += len(app_days)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return result
+    
+    @staticmethod
+    def _read_file(path, date_str, seen):
+        """리뷰 파일 한 개를 upsert용 리뷰 행과 앱별 평점 행으로 변환"""
+        reviews, app_days = [], []
+        
+        def review_row(entry, review):
+            return {
+                "app_id": entry["app_id"],
+                "review_id": review.get("review_id") or review_id_for(review),
+                "game_name": entry.get("game_name"),
+                "author": review.get("author"),
+                "review_date": review.get("date"),
+                "stars": review.get("stars"),
+                "text": review.get("text"),
+                "helpful": review.get("helpful") or 0,
+                "language": entry.get("language"),
+                "seen": seen,
+            }
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 중단된 실행이 남긴 불완전한 줄
+                if "reviews" not in entry:
+                    # review_crawl 파일: 한 줄이 리뷰 하나
+                    reviews.append(review_row(entry, entry))
+                    continue
+                reviews.extend(review_row(entry, review) for review in entry["reviews"])
+                if entry.get("rating") is not None:
+                    app_days.append({
+                        "app_id": entry["app_id"],
+                        "date": date_str,
+                        "game_name": entry.get("game_name"),
+                        "rating": entry["rating"],
+                        "rating_count": entry.get("rating_count"),
+                        "histogram": json.dumps(entry.get("histogram") or {}),
+                    })
+        return reviews, app_days
+    
+    def search(self, text=None, apps=None, stars=None, since=None, until=None, limit=100):
+        """리뷰 검색 (본문 검색어, 앱 ID/게임 이름 목록, 별점 목록, 리뷰 날짜 범위 YYYY-MM-DD), 최신 리뷰부터"""
+        where, params = [], []
+        if text:
+            if self.fts:
+                where.append("r.id IN (SELECT rowid FROM reviews_fts WHERE reviews_fts MATCH ?)")
+                params.append(fts_query(text))
+            else:
+                where.append("r.text LIKE ?")
+                params.append(f"%{text}%")
+        if apps:
+            marks = ", ".join("?" * len(apps))
+            where.append(f"(r.app_id IN ({marks}) OR r.game_name IN ({marks}))")
+            params.extend(apps)
+            params.extend(apps)
+        if stars:
+            where.append(f"r.stars IN ({', '.join('?' * len(stars))})")
+            params.extend(stars)
+        if since:
+            where.append("r.review_date >= ?")
+            params.append(since)
+        if until:
+            where.append("r.review_date <= ?")
+            params.append(until)
+        sql = ("SELECT r.* FROM reviews r" + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY r.review_date DESC, r.id DESC LIMIT ?")
+        return [dict(row) for row in self.conn.execute(sql, params + [limit])]
+    
+    def stats(self):
+        """앱별 리뷰 수, 리뷰 날짜 범위, 평균 별점"""
+        return [dict(row) for row in self.conn.execute(
+            "SELECT app_id, MAX(game_name) AS game_name, COUNT(*) AS reviews, MIN(review_date) AS first_date, "
+            "MAX(review_date) AS last_date, AVG(stars) AS avg_stars FROM reviews GROUP BY app_id ORDER BY app_id")]
+    
+    def rating_history(self, apps=None):
+        """앱별 날짜순 평점 기록 (app_days 행 목록)"""
+        sql = "SELECT * FROM app_days"
+        params = []
+        if apps:
+            marks = ", ".join("?" * len(apps))
+            sql += f" WHERE app_id IN ({marks}) OR game_name IN ({marks})"
+            params = list(apps) * 2
+        return [dict(row) for row in self.conn.execute(sql + " ORDER BY app_id, date", params)]
+
+def ingest_dates(store, base_dir, dates=None, force=False, logger=None):
+    """날짜 폴더들(기본값: base_dir의 모든 YYYYMMDD 폴더)을 적재하고 날짜별 결과 반환"""
+    if not dates:
+        dates = sorted(name for name in os.listdir(base_dir) if re.fullmatch(r"\d{8}", name))
+    results = {}
+    for date_str in dates:
+        start = time.perf_counter()
+        results[date_str] = result = store.ingest_day(os.path.join(base_dir, date_str), date_str, force)
+        if logger and result["files"]:
+            logger.info(f"리뷰 저장소 적재 {date_str}: 파일 {result['files']}개, 리뷰 {result['reviews']}개 "
+                        f"(추가/변경 {result['changed']}개), 평점 {result['app_days']}개 "
+                        f"({(time.perf_counter() - start) * 1000:.0f}ms)")
+    return results
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="로컬 리뷰 저장소 (SQLite + FTS5)")
+    parser.add_argument("--store", default=REVIEW_STORE_FILE, help="리뷰 저장소 SQLite 파일")
+    parser.add_argument("--base-dir", default=".", help="날짜 폴더들이 있는 폴더")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    ingest_parser = sub.add_parser("ingest", help="날짜 폴더의 리뷰 파일 적재")
+    ingest_parser.add_argument("dates", nargs="*", help="날짜 (YYYYMMDD, 기본값: 전체)")
+    ingest_parser.add_argument("--force", action="store_true", help="이미 적재한 파일도 다시 적재")
+    
+    search_parser = sub.add_parser("search", help="리뷰 검색")
+    search_parser.add_argument("text", nargs="?", default=None, help="본문 검색어")
+    search_parser.add_argument("--app", action="append", help="앱 ID 또는 게임 이름 (여러 번 지정 가능)")
+    search_parser.add_argument("--stars", type=int, action="append", help="별점 (여러 번 지정 가능)")
+    search_parser.add_argument("--since", default=None, help="리뷰 날짜 시작 (YYYY-MM-DD)")
+    search_parser.add_argument("--until", default=None, help="리뷰 날짜 끝 (YYYY-MM-DD)")
+    search_parser.add_argument("--limit", type=int, default=50, help="최대 결과 수")
+    
+    sub.add_parser("stats", help="앱별 리뷰 통계")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    store = ReviewStore(args.store)
+    try:
+        if args.command == "ingest":
+            results = ingest_dates(store, args.base_dir, args.dates, args.force)
+            for date_str, result in results.items():
+                if result["files"]:
+                    print(f"{date_str}: 파일 {result['files']}개, 리뷰 {result['reviews']}개 "
+                          f"(추가/변경 {result['changed']}개), 평점 {result['app_days']}개")
+            print(f"적재한 날짜: {sum(1 for result in results.values() if result['files'])}/{len(results)}개")
+        elif args.command == "search":
+            start = time.perf_counter()
+            rows = store.search(args.text, args.app, args.stars, args.since, args.until, args.limit)
+            for row in rows:
+                text = (row["text"] or "").replace("\n", " ")
+                print(f"{row['review_date'] or '-':<10} {row['game_name'] or row['app_id']:<16} "
+                      f"★{row['stars'] or '-'} {row['author'] or '-'}: {text[:80]}")
+            print(f"{len(rows)}개 ({(time.perf_counter() - start) * 1000:.1f}ms)")
+        else:
+            for row in store.stats():
+                avg = f"{row['avg_stars']:.2f}" if row["avg_stars"] is not None else "-"
+                print(f"{row['game_name'] or row['app_id']:<16} 리뷰 {row['reviews']}개 "
+                      f"({row['first_date'] or '-'} ~ {row['last_date'] or '-'}), 평균 별점 {avg}")
+        return True
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
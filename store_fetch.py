@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+브라우저 없이 스토어 페이지를 HTTP로 받아 리뷰 데이터 변경 여부를 확인하는 빠른 경로
+
+호스트별 keep-alive 연결을 재사용하는 HTTP 클라이언트로 상세 페이지 HTML만 받아
+서버 렌더링된 리뷰 섹션(평점, 리뷰 수, 별점 분포, 리뷰)을 파싱하고, 마지막으로 저장한 스냅샷과 비교한다.
+캡처 스크립트(--fast-path)는 데이터가 그대로인 앱은 이전 날짜 이미지를 가리키는 변경 없음 표시 파일과
+리뷰 텍스트만 남기고, 바뀐 앱(또는 HTTP로 확인하지 못한 앱)만 Firefox로 캡처한다.
+
+사용 예:
+    python store_fetch.py check
+    python store_fetch.py check NewMatgo Poker
+"""
+
+import os
+import re
+import gzip
+import json
+import hashlib
+import logging
+import datetime
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+from app_registry import REGISTRY_FILE, select_apps
+
+SNAPSHOT_FILE = os.path.join(".cache", "store_snapshots.json")
+FETCH_TIMEOUT = 20
+FETCH_THREADS = 4
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0"
+REVIEW_HEADINGS = ("평점 및 리뷰", "Ratings and reviews")
+
+def setup_logging():
+    """로깅 설정"""
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
+    
+    log_file = os.path.join(log_dir, f"store_fetch_{datetime.datetime.now().strftime('%Y%m%d')}.log")
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    
+    return logging.getLogger(__name__)
+
+class StoreClient:
+    """호스트별 keep-alive 연결을 재사용하는 HTTP 클라이언트 (여러 스레드가 공유)"""
+    
+    def __init__(self, timeout=FETCH_TIMEOUT):
+        self.timeout = timeout
+        self._idle = {}  # (scheme, netloc) -> 쉬고 있는 연결 목록
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "reused": 0, "bytes": 0}
+    
+    def _connection(self, scheme, netloc):
+        """쉬고 있는 연결을 꺼내거나 새로 만들어 (연결, 재사용 여부) 반환"""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+    
+    def _release(self, scheme, netloc, conn):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(conn)
+    
+    def get(self, url, headers=None):
+        """GET 요청을 보내 (상태 코드, 소문자 헤더 딕셔너리, 본문 바이트) 반환 (리다이렉트는 따라가지 않음)"""
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        request_headers = {"User-Agent": USER_AGENT, "Accept": "text/html", "Accept-Encoding": "gzip"}
+        request_headers.update(headers or {})
+        
+        for attempt in range(2):
+            conn, reused = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # 서버가 닫은 keep-alive 연결이었으면 새 연결로 한 번 더 시도
+                if reused and attempt == 0:
+                    continue
+                raise
+            break
+        
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(parts.scheme, parts.netloc, conn)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["reused"] += 1 if reused else 0
+            self.stats["bytes"] += len(body)
+        if response_headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        return response.status, response_headers, body
+    
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for conn in connections:
+                    conn.close()
+            self._idle.clear()
+
+def detect_block_response(status, headers, body):
+    """HTTP 응답이 차단/동의/캡차 페이지이면 사유 문자열, 아니면 None (BLOCK_PAGE_SCRIPT와 같은 기준)"""
+    location = headers.get("location", "")
+    if "/sorry/" in location:
+        return "captcha"
+    if "consent.google." in location:
+        return "consent"
+    if status == 429:
+        return "throttled"
+    text = body[:20000].decode('utf-8', errors='ignore').lower()
+    if "unusual traffic" in text or "비정상적인 트래픽" in text:
+        return "captcha"
+    return None
+
+def parse_store_page(html, selectors):
+    """상세 페이지 HTML의 리뷰 섹션에서 EXTRACT_REVIEWS_SCRIPT 결과와 같은 형식의 문자열 추출
+    
+    레이아웃이 없으므로 캡처 영역으로 거르지 않고 서버가 렌더링한 리뷰를 모두 반환한다.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    root = soup
+    for heading in soup.find_all('h2'):
+        if any(title in heading.get_text() for title in REVIEW_HEADINGS):
+            root = heading.find_parent('section') or soup
+            break
+    
+    def text(node, selector):
+        found = node.select_one(selector)
+        return found.get_text(strip=True) if found else None
+    
+    def histogram_row(row):
+        bar = row.select_one(selectors["histogram_bar"])
+        width = re.search(r"width:\s*([\d.]+%)", bar.get("style", "")) if bar else None
+        return {"label": text(row, selectors["histogram_label"]) or row.get("aria-label"),
+                "width": width.group(1) if width else None}
+    
+    def review(node):
+        stars = node.select_one(selectors["review_stars"])
+        id_node = node if node.has_attr("data-review-id") else node.select_one(selectors["review_id"])
+        return {
+            "id": id_node.get("data-review-id") if id_node else None,
+            "author": text(node, selectors["review_author"]),
+            "date": text(node, selectors["review_date"]),
+            "stars": stars.get("aria-label") if stars else None,
+            "text": text(node, selectors["review_text"]),
+            "helpful": text(node, selectors["review_helpful"]),
+        }
+    
+    return {
+        "rating": text(root, selectors["rating"]),
+        "rating_count": text(root, selectors["rating_count"]),
+        "histogram": [histogram_row(row) for row in root.select(selectors["histogram_row"])],
+        "reviews": [review(node) for node in root.select(selectors["review"])],
+    }
+
+def review_signature(data):
+    """변경 비교용 리뷰 데이터 해시 (평점, 리뷰 수 표기, 별점 분포, 리뷰 내용)
+    
+    '도움됨' 수는 리뷰가 그대로여도 수시로 바뀌므로 비교에서 뺀다 (캡처 이미지의 작은 숫자 차이는 감수).
+    """
+    content = {
+        "rating": data["rating"],
+        "rating_count_text": data["rating_count_text"],
+        "histogram": data["histogram"],
+        "reviews": [[review[key] for key in ("author", "date", "stars", "text")] for review in data["reviews"]],
+    }
+    return hashlib.sha1(json.dumps(content, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+def has_review_data(data):
+    """HTTP로 받은 페이지에서 리뷰 섹션을 실제로 파싱했는지 (평점도 리뷰도 없으면 레이아웃 변경/빈 페이지로 봄)"""
+    return data["rating"] is not None or bool(data["reviews"])
+
+def load_snapshots(path=SNAPSHOT_FILE):
+    """앱 ID -> 마지막으로 캡처까지 끝난 리뷰 데이터 스냅샷"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_snapshots(snapshots, path=SNAPSHOT_FILE):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(snapshots, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, path)
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="HTTP 리뷰 데이터 확인 (브라우저 없음)")
+    parser.add_argument("--snapshot-file", default=SNAPSHOT_FILE, help="리뷰 데이터 스냅샷 파일")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="캡처 대상 앱 레지스트리 파일 (기본값: apps.json)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check_parser = sub.add_parser("check", help="리뷰 데이터를 받아 마지막 스냅샷과 비교만 함 (아무것도 기록하지 않음)")
+    check_parser.add_argument("games", nargs="*", help="게임 이름 또는 앱 ID (기본값: 전체)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    logger = setup_logging()
+    from auto_capture_and_update import GAMES, PageBlockedError, use_registry, fetch_review_data
+    try:
+        use_registry(args.registry)
+        games = select_apps(GAMES, args.games)
+    except (OSError, ValueError) as e:
+        logger.error(e)
+        return False
+    
+    snapshots = load_snapshots(args.snapshot_file)
+    client = StoreClient()
+    success = True
+    try:
+        for app_id, game_name in games.items():
+            try:
+                data = fetch_review_data(client, app_id, logger)
+            except (PageBlockedError, OSError, http.client.HTTPException, ValueError) as e:
+                print(f"{game_name:<16} 확인 실패: {e}")
+                success = False
+                continue
+            changed = snapshots.get(app_id, {}).get("signature") != review_signature(data)
+            print(f"{game_name:<16} 평점 {data['rating']}, 리뷰 수 {data['rating_count_text'] or '-'}, "
+                  f"리뷰 {len(data['reviews'])}개 -> {'변경됨' if changed else '변경 없음'}")
+    finally:
+        client.close()
+    return success
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
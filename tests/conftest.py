@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""테스트에서 저장소 최상위 모듈을 가져올 수 있도록 경로 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""app_registry: 레지스트리 로드와 게임 이름/앱 ID 선택"""
+
+import json
+
+import pytest
+
+from app_registry import load_registry, resolve_app, select_apps
+
+GAMES = {"com.example.matgo": "NewMatgo", "com.example.poker": "Poker"}
+
+def write_registry(tmp_path, apps, defaults=None):
+    path = tmp_path / "apps.json"
+    path.write_text(json.dumps({"defaults": defaults or {}, "apps": apps}), encoding='utf-8')
+    return str(path)
+
+def test_resolve_app_by_id_or_name():
+    assert resolve_app(GAMES, "com.example.poker") == ("com.example.poker", "Poker")
+    assert resolve_app(GAMES, "poker") == ("com.example.poker", "Poker")
+    with pytest.raises(ValueError):
+        resolve_app(GAMES, "Sudda")
+
+def test_select_apps_keeps_requested_order():
+    assert select_apps(GAMES, []) == GAMES
+    assert list(select_apps(GAMES, ["Poker", "com.example.matgo"])) == ["com.example.poker", "com.example.matgo"]
+    with pytest.raises(ValueError):
+        select_apps(GAMES, ["Poker", "unknown"])
+
+def test_load_registry_defaults_and_priority(tmp_path):
+    path = write_registry(tmp_path, [
+        {"app_id": "a", "name": "A", "business": "red"},
+        {"app_id": "b", "name": "B", "business": "blue", "priority": 1},
+    ])
+    apps = load_registry(path)
+    assert [app["name"] for app in apps] == ["B", "A"]
+    assert apps[1]["language"] == "ko" and apps[1]["country"] == "KR"
+
+def test_load_registry_rejects_duplicates(tmp_path):
+    path = write_registry(tmp_path, [
+        {"app_id": "a", "name": "A", "business": "red"},
+        {"app_id": "a", "name": "B", "business": "red"},
+    ])
+    with pytest.raises(ValueError):
+        load_registry(path)
+
+def test_load_registry_rejects_unsupported_language(tmp_path):
+    path = write_registry(tmp_path, [{"app_id": "a", "name": "A", "business": "red", "language": "en"}])
+    with pytest.raises(ValueError, match="지원하지 않는 언어"):
+        load_registry(path)
+    
+    # 국가만 다른 한국어 페이지는 허용
+    path = write_registry(tmp_path, [{"app_id": "a", "name": "A", "business": "red", "country": "US"}])
+    assert load_registry(path)[0]["country"] == "US"
@@ -0,0 +1,712 @@
+# -*- coding: utf-8 -*-
+"""auto_capture_and_update: 탭 미리 열기, 요청 제한기, HTTP 빠른 경로, 작업 큐, 리뷰 전체 탐색"""
+
+import io
+import os
+import json
+import hashlib
+import logging
+import threading
+import http.server
+
+import pytest
+from PIL import Image
+
+import auto_capture_and_update as capture
+from rate_limiter import RateLimiter
+
+logger = logging.getLogger("test")
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def new_window(self, kind):
+        self.driver.handles.append(f"tab-{len(self.driver.handles)}")
+    
+    def window(self, handle):
+        self.driver.current = handle
+
+class FakeDriver:
+    """탭 열기만 흉내 내는 WebDriver"""
+    
+    def __init__(self):
+        self.handles = ["main"]
+        self.urls = []
+        self.switch_to = FakeSwitchTo(self)
+    
+    @property
+    def current_window_handle(self):
+        return self.handles[-1]
+    
+    def execute_script(self, script, *args):
+        self.urls.extend(args)
+
+@pytest.fixture
+def games(monkeypatch):
+    monkeypatch.setattr(capture, "APPS", {})
+    return {"app.a": "A", "app.b": "B", "app.c": "C"}
+
+def test_open_tabs_takes_slot_per_tab(tmp_path, games):
+    limiter = RateLimiter(str(tmp_path / "limiter.sqlite"), 60000, 100)
+    handles = capture.open_tabs(FakeDriver(), games, logger, limiter)
+    assert list(handles) == ["A", "B", "C"]
+    assert limiter.summary()["in_flight"] == 3
+    limiter.close()
+
+def test_open_tabs_stops_when_half_open(tmp_path, games, monkeypatch):
+    # 차단 후 시험 요청 하나만 허용되는 동안에는 첫 탭만 열고 나머지는 캡처할 때 차례로 불러옴
+    monkeypatch.setattr(capture, "TAB_SLOT_TIMEOUT", 1)
+    limiter = RateLimiter(str(tmp_path / "limiter.sqlite"), 60000, 100)
+    limiter.conn.execute("UPDATE limiter SET consecutive_blocks = 1")
+    handles = capture.open_tabs(FakeDriver(), games, logger, limiter)
+    assert list(handles) == ["A"]
+    assert limiter.summary()["in_flight"] == 1
+    limiter.close()
+
+STORE_PAGE = "<html><body><section><h2>평점 및 리뷰</h2><div class=\"jILTFe\">4.5</div></section></body></html>"
+
+class StorePageHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    page = STORE_PAGE
+    
+    def do_GET(self):
+        body = self.page.encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+def test_fast_path_threads_share_limiter(tmp_path, monkeypatch):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StorePageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(capture, "STORE_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(capture, "APPS", {})
+    games = {f"app.{i}": f"Game{i}" for i in range(8)}
+    options = {"rate_limit": {"path": str(tmp_path / "limiter.sqlite"), "per_minute": 60000, "burst": 100}}
+    try:
+        targets, fetched = capture.fast_path_targets(games, str(tmp_path / "20251217"), "20251217", options, logger,
+                                                     snapshot_file=str(tmp_path / "snapshots.json"), threads=4)
+    finally:
+        server.shutdown()
+    
+    # 스냅샷이 없으므로 모두 브라우저 캡처 대상이지만 HTTP 확인은 모두 성공
+    assert targets == games
+    assert set(fetched) == set(games)
+    summary = capture.rate_limiter_for(options).summary()
+    assert summary["acquired"] == 8
+    assert summary["in_flight"] == 0
+
+class EmptyStorePageHandler(StorePageHandler):
+    page = "<html><body><section><h2>평점 및 리뷰</h2></section></body></html>"
+
+def test_fast_path_treats_unparsed_page_as_miss(tmp_path, monkeypatch):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), EmptyStorePageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(capture, "STORE_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(capture, "APPS", {})
+    games = {"app.a": "A", "app.b": "B"}
+    snapshot_file = str(tmp_path / "snapshots.json")
+    # 빈 파싱 결과의 해시를 이미 저장해 두었어도 '변경 없음'으로 처리하면 안 됨
+    empty = {"rating": None, "rating_count_text": None, "histogram": {}, "reviews": []}
+    capture.save_snapshots({app_id: {"signature": capture.review_signature(empty)} for app_id in games}, snapshot_file)
+    try:
+        targets, fetched = capture.fast_path_targets(games, str(tmp_path / "20251217"), "20251217", {}, logger,
+                                                     snapshot_file=snapshot_file, threads=2)
+    finally:
+        server.shutdown()
+    
+    assert targets == games
+    assert fetched == {}
+
+def test_review_signature_ignores_helpful():
+    review = {"review_id": "r1", "author": "a", "date": "2024-01-01", "stars": 5, "text": "좋아요", "helpful": 3}
+    data = {"rating": 4.5, "rating_count_text": "리뷰 1만개", "histogram": {"5": 80.0}, "reviews": [review]}
+    changed = dict(data, reviews=[dict(review, helpful=10)])
+    assert capture.review_signature(data) == capture.review_signature(changed)
+    assert capture.review_signature(data) != capture.review_signature(dict(data, rating=4.4))
+
+def test_store_page_url_locale(monkeypatch):
+    monkeypatch.setattr(capture, "APPS", {"app.a": {"language": "ko", "country": "KR"}})
+    assert capture.store_page_url("app.a").endswith("?id=app.a&hl=ko&gl=KR")
+    assert capture.store_page_url("app.a", "en-US").endswith("?id=app.a&hl=en&gl=US")
+    assert capture.store_page_url("app.a", "ja").endswith("?id=app.a&hl=ja&gl=KR")
+
+def test_capture_uses_given_date_and_locale(tmp_path, monkeypatch):
+    monkeypatch.setattr(capture, "APPS", {"app.a": {"language": "ko", "country": "KR"}})
+    requested = []
+    
+    def fail_load(driver, url, *args, **kwargs):
+        requested.append(url)
+        raise RuntimeError("페이지 없음")
+    
+    monkeypatch.setattr(capture, "load_store_page", fail_load)
+    options = {"manifest_dir": str(tmp_path)}
+    ok = capture.capture_game_review_firefox(None, "app.a", "A", str(tmp_path), logger, options,
+                                             date_str="20240101", locale="en-US")
+    assert ok is False
+    assert requested == [capture.store_page_url("app.a", "en-US")]
+    assert capture.load_manifest("20240101", str(tmp_path))["app.a"]["status"] == "failed"
+
+class QuitDriver:
+    def quit(self):
+        pass
+
+def test_queue_job_date_and_locale_reach_capture(tmp_path, monkeypatch):
+    monkeypatch.setattr(capture, "APPS", {})
+    queue_path = str(tmp_path / "queue.sqlite")
+    queue = capture.WorkQueue(queue_path)
+    queue.enqueue([("app.a", "A", "20240101", "en-US", 100)])
+    queue.close()
+    calls = []
+    
+    def fake_capture(driver, app_id, game_name, save_dir, logger, options=None, image_sink=None,
+                     preloaded=False, date_str=None, locale=None):
+        calls.append((app_id, date_str, locale))
+        with open(f"{save_dir}/{game_name}_{date_str}.webp", 'wb') as f:
+            f.write(b"RIFF")
+        return True
+    
+    monkeypatch.setattr(capture, "setup_driver", lambda options=None: QuitDriver())
+    monkeypatch.setattr(capture, "capture_game_review_firefox", fake_capture)
+    results = capture.capture_from_queue(queue_path, "20240101", str(tmp_path), logger, {})
+    
+    # 오늘이 아닌 작업 날짜로 저장되어도 저장 확인을 통과하여 완료 처리
+    assert results == {"A": True}
+    assert calls == [("app.a", "20240101", "en-US")]
+    queue = capture.WorkQueue(queue_path)
+    assert queue.counts("20240101") == {"done": 1}
+    assert queue.jobs("20240101")[0]["result"] == "A_20240101.webp"
+    queue.close()
+
+def test_coordinator_refreshes_review_store(tmp_path, monkeypatch):
+    queue_path = str(tmp_path / "queue.sqlite")
+    queue = capture.WorkQueue(queue_path)
+    queue.enqueue([("app.a", "A", "20240101", "ko-KR", 100)])
+    queue.complete(queue.lease("w1", "20240101"), "w1", True)
+    queue.close()
+    calls = []
+    monkeypatch.setattr(capture, "refresh_review_store",
+                        lambda store, base_dir, dates, logger: calls.append((store, base_dir, dates)))
+    monkeypatch.setattr(capture, "update_html_with_new_images", lambda *args, **kwargs: True)
+    monkeypatch.setattr(capture, "git_commit_and_push", lambda *args, **kwargs: True)
+    
+    save_dir = str(tmp_path / "20240101")
+    assert capture.publish_when_finished(queue_path, "20240101", save_dir, logger, 5,
+                                         review_store=str(tmp_path / "reviews.sqlite"))
+    assert calls == [(str(tmp_path / "reviews.sqlite"), str(tmp_path), ["20240101"])]
+
+def test_invalid_registry_fails_entry_point_not_import(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = tmp_path / "apps.json"
+    registry.write_text("{", encoding='utf-8')
+    # 모듈은 레지스트리 없이 import되고 진입점에서만 실패
+    assert capture.main(["--registry", str(registry)]) is False
+
+def raw_review(review_id):
+    return {"id": review_id, "author": f"user {review_id}", "date": "2024. 1. 2.", "stars": "별표 5개 만점에 5개를 받았습니다.",
+            "text": f"리뷰 {review_id}", "helpful": None}
+
+class CrawlDriver:
+    """배치 스크립트마다 준비된 배치를 차례로 돌려주는 대화상자 흉내 (가상 목록처럼 이전 리뷰가 다시 섞여 나옴)"""
+    
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.after_ids = []
+    
+    def execute_script(self, script, *args):
+        if script == capture.REVIEW_CRAWL_BATCH_SCRIPT:
+            self.after_ids.append(args[1])
+            return self.batches.pop(0) if self.batches else []
+        return None
+
+def crawl(tmp_path, monkeypatch, batches, **options):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(capture, "open_reviews_dialog", lambda *args: True)
+    monkeypatch.setattr(capture, "REVIEW_CRAWL_BATCH_WAIT", 0.01)
+    driver = CrawlDriver(batches)
+    count = capture.crawl_all_reviews(driver, "app.a", "A", str(tmp_path), "20240102", [], logger, options)
+    with open(capture.review_crawl_file_for(str(tmp_path), "20240102"), encoding='utf-8') as f:
+        ids = [json.loads(line)["review_id"] for line in f]
+    return count, ids, driver, capture.load_review_crawl_state().get("app.a", {})
+
+def test_crawl_dedupes_by_review_id_and_sets_high_water_mark_at_end(tmp_path, monkeypatch):
+    batches = [[raw_review("r1"), raw_review("r2")], [raw_review("r2"), raw_review("r3")], [raw_review("r3")]]
+    count, ids, driver, state = crawl(tmp_path, monkeypatch, batches)
+    assert count == 3
+    assert ids == ["r1", "r2", "r3"]
+    assert driver.after_ids[:3] == [None, "r2", "r3"]
+    assert state["last_stop"] == "end"
+    assert state["known_ids"] == ["r1", "r2", "r3"]
+    
+    # 다음 실행은 높은 수위 표시(r1)에서 멈춤
+    count, ids, _, state = crawl(tmp_path, monkeypatch, [[raw_review("r0"), raw_review("r1"), raw_review("r2")]])
+    assert count == 1 and ids[-1] == "r0"
+    assert state["last_stop"] == "known"
+    assert state["known_ids"][:2] == ["r0", "r1"]
+
+def test_crawl_stopped_at_max_keeps_high_water_mark(tmp_path, monkeypatch):
+    count, _, _, state = crawl(tmp_path, monkeypatch, [[raw_review("r1"), raw_review("r2"), raw_review("r3")]],
+                               deep_max_reviews=2)
+    assert count == 2
+    assert state["last_stop"] == "max_reviews"
+    assert state.get("known_ids") == []
+
+class ScriptDriver:
+    """execute_script마다 results에서 차례로 값을 돌려주는 드라이버 (마지막 값은 계속 반복)"""
+    
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+    
+    def execute_script(self, script, *args):
+        self.calls += 1
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+def test_readiness_wait_returns_when_condition_met(monkeypatch):
+    monkeypatch.setattr(capture, "READY_POLL_INTERVAL", 0.01)
+    driver = ScriptDriver(False, False, True)
+    assert capture.wait_for_fonts(driver, logger, timeout=5) is True
+    assert driver.calls == 3
+
+def test_readiness_wait_times_out_without_raising(monkeypatch):
+    monkeypatch.setattr(capture, "READY_POLL_INTERVAL", 0.01)
+    assert capture.wait_for_review_heading(ScriptDriver(False), logger, timeout=0.05) is False
+    assert capture.wait_for_network_idle(ScriptDriver(False), logger, timeout=0.05) is False
+
+def test_layout_stable_needs_repeated_identical_polls(monkeypatch):
+    monkeypatch.setattr(capture, "READY_POLL_INTERVAL", 0.01)
+    driver = ScriptDriver("100,0,800,600", "120,0,800,600", "120,0,800,600")
+    assert capture.wait_for_layout_stable(driver, logger, timeout=5, polls=3) is True
+    # 첫 값, 바뀐 값, 그 뒤 같은 값 3번
+    assert driver.calls == 5
+    
+    heights = iter(range(1000))
+    changing = ScriptDriver(None)
+    changing.execute_script = lambda script, *args: str(next(heights))
+    assert capture.wait_for_layout_stable(changing, logger, timeout=0.05) is False
+
+def test_locate_anchors_rounds_rects_and_hashes_fingerprint():
+    driver = ScriptDriver({
+        "fingerprint": "ko|평점 및 리뷰|새로운 기능", "page_width": 1280.0, "page_height": 4000.4,
+        "start_index": 1, "end_index": -1,
+        "start": {"x": 10.4, "y": 1500.6, "width": 300.5, "height": 40.2}, "end": None,
+    })
+    anchors = capture.locate_anchors(driver, ["a", "b"], ["c"])
+    assert anchors["start_index"] == 1 and anchors["end_index"] == -1
+    assert anchors["start_location"] == {"x": 10, "y": 1501}
+    assert anchors["start_size"] == {"width": 300, "height": 40}
+    assert anchors["end_location"] is None and anchors["end_size"] is None
+    assert (anchors["page_width"], anchors["page_height"]) == (1280, 4000)
+    assert len(anchors["fingerprint"]) == 12
+    assert anchors["fingerprint"] == capture.locate_anchors(driver, [], [])["fingerprint"]
+
+def test_selector_cache_keyed_by_app_and_fingerprint(tmp_path):
+    cache_file = str(tmp_path / "cache" / "selector_cache.json")
+    capture.update_selector_cache("app.a", "fp1", 2, 0, 12.34, cache_file=cache_file)
+    capture.update_selector_cache("app.b", "fp1", 0, None, 5.0, cache_file=cache_file)
+    capture.update_selector_cache("app.a", "fp2", 1, 3, 7.0, cache_file=cache_file)
+    
+    cache = capture.load_selector_cache(cache_file)
+    assert set(cache) == {"app.a", "app.b"}
+    assert cache["app.a"]["last_fingerprint"] == "fp2"
+    assert cache["app.a"]["fingerprints"]["fp1"]["start_index"] == 2
+    assert cache["app.a"]["fingerprints"]["fp2"]["end_index"] == 3
+    assert cache["app.a"]["fingerprints"]["fp1"]["locate_ms"] == 12.3
+    assert cache["app.b"]["fingerprints"]["fp1"]["end_index"] is None
+
+def test_selector_cache_missing_or_corrupt_is_empty(tmp_path):
+    assert capture.load_selector_cache(str(tmp_path / "missing.json")) == {}
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{", encoding='utf-8')
+    assert capture.load_selector_cache(str(corrupt)) == {}
+
+def test_cached_selector_order_moves_preferred_first():
+    selectors = ["a", "b", "c", "d"]
+    assert capture.cached_selector_order(selectors, 2) == [2, 0, 1, 3]
+    assert capture.cached_selector_order(selectors, None) == [0, 1, 2, 3]
+    assert capture.cached_selector_order(selectors, 7) == [0, 1, 2, 3]
+
+class PageDriver:
+    """세로로 긴 페이지 이미지를 뷰포트 크기로 스크롤하며 스크린샷을 돌려주는 드라이버"""
+    
+    def __init__(self, page, viewport_height):
+        self.page = page
+        self.viewport_height = viewport_height
+        self.scroll_y = 0
+    
+    def execute_script(self, script, *args):
+        if script == capture.HIDE_FIXED_ELEMENTS_SCRIPT:
+            return 0
+        if script == "return window.innerHeight":
+            return self.viewport_height
+        # 스크롤: 페이지 끝에서는 요청한 위치보다 덜 내려감
+        self.scroll_y = max(0, min(args[0], self.page.height - self.viewport_height))
+        return self.scroll_y
+    
+    def get_screenshot_as_png(self):
+        buffer = io.BytesIO()
+        self.page.crop((0, self.scroll_y, self.page.width, self.scroll_y + self.viewport_height)).save(buffer, "PNG")
+        return buffer.getvalue()
+
+def striped_page(width, height):
+    page = Image.new('RGB', (width, height))
+    page.putdata([(y % 256, y // 256, x % 256) for y in range(height) for x in range(width)])
+    return page
+
+@pytest.mark.parametrize("top,height", [(250, 150), (0, 100), (330, 70), (10, 385)])
+def test_region_tiles_stitch_to_page_crop(monkeypatch, top, height):
+    monkeypatch.setattr(capture, "wait_for_layout_stable", lambda *args, **kwargs: True)
+    monkeypatch.setattr(capture, "wait_for_network_idle", lambda *args, **kwargs: True)
+    page = striped_page(60, 400)
+    driver = PageDriver(page, viewport_height=100)
+    
+    tiles = capture.capture_region_tiles(driver, 5, top, 40, height, logger)
+    region = capture.stitch_region_tiles(tiles, 5, 40, height)
+    
+    assert all(0 <= tile_top and tile_top + tile_height <= 100 for _, tile_top, tile_height, _ in tiles)
+    assert sum(tile_height for _, _, tile_height, _ in tiles) == height
+    assert region.size == (40, height)
+    assert region.tobytes() == page.crop((5, top, 45, top + height)).tobytes()
+
+def noise_image(width=64, height=64, seed=b"capture"):
+    data = b"".join(hashlib.sha256(seed + i.to_bytes(4, "big")).digest() for i in range(width * height * 3 // 32 + 1))
+    return Image.frombytes('RGB', (width, height), data[:width * height * 3])
+
+@pytest.mark.parametrize("image_format,ext,pil_format", [
+    ("png", "png", "PNG"), ("webp", "webp", "WEBP"), ("webp_lossless", "webp", "WEBP"),
+])
+def test_save_capture_image_uses_format_encoder(tmp_path, image_format, ext, pil_format):
+    img = noise_image()
+    files = capture.save_capture_image(img, str(tmp_path), "A", "20240101", {"image_format": image_format}, logger)
+    assert files == [str(tmp_path / f"A_20240101.{ext}")]
+    with Image.open(files[0]) as saved:
+        assert saved.format == pil_format
+        if image_format != "webp":
+            # 무손실 형식은 픽셀이 그대로
+            assert saved.convert('RGB').tobytes() == img.tobytes()
+
+def test_save_capture_image_quality_override(tmp_path):
+    img = noise_image(128, 128)
+    sizes = {}
+    for quality in (20, 95):
+        save_dir = tmp_path / str(quality)
+        save_dir.mkdir()
+        files = capture.save_capture_image(img, str(save_dir), "A", "20240101",
+                                           {"image_format": "webp", "image_quality": quality}, logger)
+        sizes[quality] = os.path.getsize(files[0])
+    assert sizes[20] < sizes[95]
+
+def test_save_capture_image_keep_png_and_avif_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(capture, "_avif_supported", lambda: False)
+    files = capture.save_capture_image(noise_image(), str(tmp_path), "A", "20240101",
+                                       {"image_format": "avif", "keep_png": True}, logger)
+    assert [os.path.basename(path) for path in files] == ["A_20240101.png", "A_20240101.webp"]
+
+def test_pipeline_records_encoder_failure_and_keeps_going(tmp_path, monkeypatch):
+    encoded = []
+    
+    def fake_encode(job, options, logger):
+        if job["game_name"] == "B":
+            raise OSError("디스크 가득 참")
+        encoded.append(job["game_name"])
+        return []
+    
+    monkeypatch.setattr(capture, "encode_capture_job", fake_encode)
+    options = {"manifest_dir": str(tmp_path)}
+    pipeline = capture.CapturePipeline(options, logger, encoder_threads=1, queue_depth=1)
+    for app_id, game_name in (("app.a", "A"), ("app.b", "B"), ("app.c", "C")):
+        pipeline.submit({"app_id": app_id, "game_name": game_name, "date_str": "20240101"})
+    results = pipeline.close()
+    
+    assert results == {"A": True, "B": False, "C": True}
+    assert encoded == ["A", "C"]
+    entry = capture.load_manifest("20240101", str(tmp_path))["app.b"]
+    assert entry["status"] == "failed" and "디스크 가득 참" in entry["error"]
+    stats = pipeline.stats()
+    assert stats["encode"]["count"] == 3 and stats["queue_wait"]["count"] == 3
+    assert stats["max_queue_depth"] <= 1
+
+class TabSwitchTo(FakeSwitchTo):
+    def new_window(self, kind):
+        super().new_window(kind)
+        self.driver.current = self.driver.handles[-1]
+
+class TabDriver(FakeDriver):
+    """탭 전환/닫기까지 흉내 내고 탭 열기/캡처 순서를 events에 기록하는 WebDriver"""
+    
+    def __init__(self):
+        super().__init__()
+        self.switch_to = TabSwitchTo(self)
+        self.current = "main"
+        self.events = []
+    
+    @property
+    def current_window_handle(self):
+        return self.current
+    
+    def execute_script(self, script, *args):
+        self.events.append(("open", args[0]))
+    
+    def close(self):
+        self.events.append(("close", self.current))
+
+def test_sequential_capture_loads_tabs_in_batches(tmp_path, games, monkeypatch):
+    def fake_capture(driver, app_id, game_name, save_dir, logger, options=None, image_sink=None, preloaded=False,
+                     **kwargs):
+        driver.events.append(("capture", game_name, driver.current, preloaded))
+        return True
+    
+    monkeypatch.setattr(capture, "capture_game_review_firefox", fake_capture)
+    driver = TabDriver()
+    results = capture.capture_games_sequential(driver, games, str(tmp_path), logger, {"tabs": 2})
+    
+    assert results == {"A": True, "B": True, "C": True}
+    url = capture.store_page_url
+    # 두 탭을 한꺼번에 열어 로딩한 뒤 하나씩 캡처하고 닫음, 세 번째 게임은 다음 배치
+    assert driver.events == [
+        ("open", url("app.a")), ("open", url("app.b")),
+        ("capture", "A", "tab-1", True), ("close", "tab-1"),
+        ("capture", "B", "tab-2", True), ("close", "tab-2"),
+        ("open", url("app.c")),
+        ("capture", "C", "tab-3", True), ("close", "tab-3"),
+    ]
+    assert driver.current == "main"
+
+@pytest.mark.parametrize("rendered_language,loads", [(True, 1), (False, 2)])
+def test_capture_reloads_only_when_language_is_wrong(tmp_path, monkeypatch, rendered_language, loads):
+    monkeypatch.setattr(capture, "APPS", {"app.a": {"language": "ko", "country": "KR"}})
+    requested = []
+    monkeypatch.setattr(capture, "load_store_page", lambda driver, url, *args, **kwargs: requested.append(url))
+    monkeypatch.setattr(capture, "is_korean_page", lambda driver, language: rendered_language)
+    monkeypatch.setattr(capture, "wait_for_layout_stable", lambda *args, **kwargs: True)
+    
+    def stop(*args, **kwargs):
+        raise RuntimeError("여기까지만 확인")
+    
+    monkeypatch.setattr(capture, "locate_anchors", stop)
+    options = {"selector_cache_file": str(tmp_path / "selector_cache.json")}
+    assert capture.capture_game_review_firefox(object(), "app.a", "A", str(tmp_path), logger, options) is False
+    assert requested == [capture.store_page_url("app.a")] * loads
+    assert requested[0].endswith("hl=ko&gl=KR")
+
+@pytest.fixture
+def span_file(tmp_path):
+    path = str(tmp_path / "spans.jsonl")
+    capture.configure_spans("run-1", path)
+    yield path
+    capture.configure_spans(None, None)
+
+def test_span_records_are_json_lines(span_file):
+    with capture.timing_span("encode_save", app_id="app.a", date="20240101", skipped=None) as span:
+        span["bytes"] = 1234
+    with pytest.raises(ValueError):
+        with capture.timing_span("decode", app_id="app.a"):
+            raise ValueError("손상된 PNG")
+    timer = capture.StageTimer(app_id="app.b")
+    timer.mark("navigate", preloaded=True)
+    
+    with open(span_file, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record["stage"] for record in records] == ["encode_save", "decode", "navigate"]
+    first = records[0]
+    assert set(first) == {"ts", "run_id", "pid", "stage", "seconds", "ok", "app_id", "date", "bytes"}
+    assert first["run_id"] == "run-1" and first["ok"] is True and first["bytes"] == 1234
+    assert records[1]["ok"] is False
+    assert records[2]["app_id"] == "app.b" and records[2]["preloaded"] is True
+
+def test_span_summary_counts_only_this_run(span_file):
+    capture.record_span("encode_save", 1.0, bytes=100)
+    capture.record_span("encode_save", 3.0, bytes=50)
+    capture.configure_spans("run-2", span_file)
+    capture.record_span("encode_save", 10.0)
+    with open(span_file, 'a', encoding='utf-8') as f:
+        f.write("{잘린 줄\n")
+    
+    summary = capture.summarize_spans(span_file, "run-1")
+    assert summary == {"encode_save": {"count": 2, "total": 4.0, "max": 3.0, "bytes": 150}}
+    assert capture.summarize_spans(span_file, "run-2")["encode_save"]["count"] == 1
+
+def test_spans_disabled_without_file(tmp_path):
+    capture.configure_spans("run-1", None)
+    capture.record_span("navigate", 1.0)
+    assert os.listdir(tmp_path) == []
+
+@pytest.fixture
+def manifest_run(tmp_path):
+    """A는 완료, B는 실패, C는 완료됐지만 파일이 바뀜, D는 변경 없음, E는 기록 없음"""
+    save_dir = tmp_path / "20240101"
+    save_dir.mkdir()
+    options = {"manifest_dir": str(tmp_path)}
+    for name in ("A", "C"):
+        path = save_dir / f"{name}_20240101.png"
+        path.write_bytes(name.encode() * 10)
+        capture.record_manifest(options, f"app.{name.lower()}", name, "20240101", "done", [str(path)], seconds=1.0)
+    (save_dir / "C_20240101.png").write_bytes(b"changed")
+    capture.record_manifest(options, "app.b", "B", "20240101", "failed", error="시작 요소 없음")
+    capture.record_manifest(options, "app.d", "D", "20240101", "unchanged", same_as="20231231/D_20231231.png")
+    games = {f"app.{name.lower()}": name for name in "ABCDE"}
+    return games, capture.load_manifest("20240101", str(tmp_path)), str(save_dir)
+
+def test_select_run_targets_skips_completed(manifest_run):
+    games, manifest, save_dir = manifest_run
+    assert capture.select_run_targets(games, manifest, save_dir) == {"app.b": "B", "app.c": "C", "app.e": "E"}
+
+def test_select_run_targets_force_and_retry_failed(manifest_run):
+    games, manifest, save_dir = manifest_run
+    assert capture.select_run_targets(games, manifest, save_dir, force=True) == games
+    assert capture.select_run_targets(games, manifest, save_dir, retry_failed=True) == {"app.b": "B"}
+    # 둘 다 지정하면 force 우선
+    assert capture.select_run_targets(games, manifest, save_dir, force=True, retry_failed=True) == games
+
+def test_manifest_last_entry_wins_and_skips_torn_lines(tmp_path):
+    options = {"manifest_dir": str(tmp_path)}
+    capture.record_manifest(options, "app.a", "A", "20240101", "failed", error="차단")
+    capture.record_manifest(options, "app.a", "A", "20240101", "unchanged")
+    with open(capture.manifest_file_for("20240101", str(tmp_path)), 'a', encoding='utf-8') as f:
+        f.write('{"app_id": "app.a", "sta')
+    assert capture.load_manifest("20240101", str(tmp_path))["app.a"]["status"] == "unchanged"
+
+def gradient_image(width=400, height=200):
+    img = Image.new('L', (width, height))
+    img.putdata([x * 255 // width for _ in range(height) for x in range(width)])
+    return img.convert('RGB')
+
+def shifted_block(img, box, delta):
+    changed = img.copy()
+    region = changed.crop(box).point(lambda v: min(255, v + delta))
+    changed.paste(region, box[:2])
+    return changed
+
+def test_perceptual_hash_and_distance():
+    img = gradient_image()
+    assert len(capture.perceptual_hash(img)) == 16
+    assert capture.perceptual_hash(img) == capture.perceptual_hash(img.copy())
+    assert capture.hash_distance("ff00", "ff00") == 0
+    assert capture.hash_distance("ff00", "fe01") == 2
+    assert capture.hash_distance(capture.perceptual_hash(img),
+                                 capture.perceptual_hash(img.transpose(Image.FLIP_LEFT_RIGHT))) > 4
+
+def test_pixel_diff_ratio_threshold():
+    img = gradient_image()
+    # 밝기 차이가 기준(16) 이하인 변화는 세지 않음
+    assert capture.pixel_diff_ratio(img, shifted_block(img, (0, 0, 400, 200), 10)) == 0
+    assert capture.pixel_diff_ratio(img, shifted_block(img, (0, 0, 40, 20), 60)) == pytest.approx(0.01)
+    assert capture.pixel_diff_ratio(img, img.resize((400, 199))) == 1.0
+
+@pytest.fixture
+def previous_capture(tmp_path):
+    (tmp_path / "20231231").mkdir()
+    (tmp_path / "20240101").mkdir()
+    gradient_image().save(tmp_path / "20231231" / "A_20231231.png")
+    return {"save_dir": str(tmp_path / "20240101"), "app_id": "app.a", "game_name": "A", "date_str": "20240101"}
+
+@pytest.mark.parametrize("make_image,changed", [
+    (gradient_image, False),                                                      # 그대로
+    (lambda: shifted_block(gradient_image(), (100, 100, 106, 106), 60), False),  # 0.045%: 기준 이하
+    (lambda: shifted_block(gradient_image(), (100, 100, 140, 120), 60), True),   # 1%: 픽셀 비교로 변경
+    (lambda: gradient_image().transpose(Image.FLIP_LEFT_RIGHT), True),            # 해시 거리로 변경
+])
+def test_detect_change_thresholds(previous_capture, make_image, changed):
+    result = capture.detect_change(make_image(), previous_capture, {}, logger)
+    assert result["previous"] == "20231231/A_20231231.png"
+    assert result["changed"] is changed
+    if result["hash_distance"] > capture.CHANGE_MAX_HASH_DISTANCE:
+        assert result["pixel_diff"] is None
+
+def test_detect_change_without_previous(tmp_path):
+    job = {"save_dir": str(tmp_path / "20240101"), "app_id": "app.a", "game_name": "A", "date_str": "20240101"}
+    result = capture.detect_change(gradient_image(), job, {}, logger)
+    assert result["changed"] is True and result["previous"] is None and result["hash_distance"] is None
+
+@pytest.mark.parametrize("text,expected", [
+    ("리뷰 12.3만개", 123000), ("리뷰 1,234개", 1234), ("12.3K reviews", 12300), ("1.2M reviews", 1200000),
+    ("3천", 3000), ("2억", 200000000), ("5", 5), ("1 Books", 1), ("리뷰 없음", None), (None, None),
+])
+def test_parse_count(text, expected):
+    assert capture.parse_count(text) == expected
+
+@pytest.mark.parametrize("text,expected", [("4.5", 4.5), ("4,3", 4.3), ("평점 5", 5.0), ("", None), (None, None)])
+def test_parse_rating(text, expected):
+    assert capture.parse_rating(text) == expected
+
+@pytest.mark.parametrize("text,expected", [
+    ("별표 5개 만점에 4개를 받았습니다.", 4), ("Rated 3 stars out of five stars", 3), ("별점 없음", None), (None, None),
+])
+def test_parse_review_stars(text, expected):
+    assert capture.parse_review_stars(text) == expected
+
+@pytest.mark.parametrize("text,expected", [
+    ("2025. 12. 10.", "2025-12-10"), ("2025.1.2", "2025-01-02"), ("December 10, 2025", "2025-12-10"),
+    (" 어제 ", "어제"), (None, None),
+])
+def test_parse_review_date(text, expected):
+    assert capture.parse_review_date(text) == expected
+
+def test_structure_review_data():
+    raw = {
+        "rating": "4.4", "rating_count": "리뷰 2.1만개",
+        "histogram": [{"label": "5", "width": "71.5%"}, {"label": "1", "width": None}, {"label": "없음", "width": "3%"}],
+        "reviews": [{"id": None, "author": "김", "date": "2025. 12. 10.", "stars": "별표 5개 만점에 5개를 받았습니다.",
+                     "text": "재밌어요", "helpful": "12명이 유용하다고 평가함"}],
+    }
+    data = capture.structure_review_data(raw)
+    assert (data["rating"], data["rating_count"], data["rating_count_text"]) == (4.4, 21000, "리뷰 2.1만개")
+    assert data["histogram"] == {"5": 71.5, "1": None}
+    review = data["reviews"][0]
+    assert review["review_id"].startswith("h:")
+    assert (review["date"], review["stars"], review["helpful"]) == ("2025-12-10", 5, 12)
+
+DASHBOARD = """<html><body>
+<select id="dateSelect"><option value="20231231" selected>2023-12-31</option></select>
+<script>
+const availableDates = ['20231231'];
+showDateContent('20231231');
+</script>
+</body></html>"""
+
+def test_dashboard_uses_run_date(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(capture, "APPS", {})
+    (tmp_path / "aos_review.html").write_text(DASHBOARD, encoding='utf-8')
+    # 자정을 넘겨 끝난 실행도 시작 날짜(작업 날짜)로 기록
+    assert capture.update_html_with_new_images(str(tmp_path / "20240101"), logger, date_str="20240101")
+    html = (tmp_path / "aos_review.html").read_text(encoding='utf-8')
+    assert '<option selected="selected" value="20240101">2024-01-01</option>' in html
+    assert "'20240101', '20231231'" in html
+    assert "showDateContent('20240101');" in html
+
+def test_review_crawl_state_keeps_newest_ids_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(capture, "REVIEW_CRAWL_KNOWN_IDS", 4)
+    state_file = str(tmp_path / "state" / "review_crawl_state.json")
+    capture.update_review_crawl_state("app.a", ["r3", "r2", "r1"], 3, "end", state_file=state_file)
+    capture.update_review_crawl_state("app.b", ["x1"], 1, "end", state_file=state_file)
+    capture.update_review_crawl_state("app.a", ["r5", "r4", "r3"], 2, "known", state_file=state_file)
+    capture.update_review_crawl_state("app.a", [], 0, "max_reviews", state_file=state_file)
+    
+    state = capture.load_review_crawl_state(state_file)
+    assert state["app.a"]["known_ids"] == ["r5", "r4", "r3", "r2"]
+    assert state["app.a"]["total"] == 5 and state["app.a"]["last_stop"] == "max_reviews"
+    assert state["app.b"]["known_ids"] == ["x1"]
+
+
+def test_parse_args_keeps_png_as_default_format():
+    assert capture.parse_args([]).format == "png"
+    assert capture.parse_args(["--format", "webp"]).format == "webp"
+
+
+def test_parse_args_leaves_rate_limit_off_by_default():
+    assert capture.parse_args([]).rate_limit == 0
+    assert capture.parse_args(["--rate-limit", "20"]).rate_limit == 20
+
+
+def test_parse_args_makes_review_store_opt_in():
+    from review_store import REVIEW_STORE_FILE
+
+    assert not capture.parse_args([]).review_store
+    assert capture.parse_args(["--review-store"]).review_store == REVIEW_STORE_FILE
+    assert capture.parse_args(["--review-store", "x.sqlite"]).review_store == "x.sqlite"
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""capture_daemon: 인증 키 파일과 브라우저 시작 실패 처리"""
+
+import os
+import stat
+import queue
+import logging
+
+import pytest
+
+import capture_daemon
+
+logger = logging.getLogger("test")
+
+def test_authkey_created_once_and_private(tmp_path):
+    path = str(tmp_path / "cache" / "daemon.key")
+    with pytest.raises(FileNotFoundError):
+        capture_daemon.load_authkey(path)
+    key = capture_daemon.load_authkey(path, create=True)
+    assert len(key) == capture_daemon.DAEMON_AUTHKEY_BYTES
+    assert capture_daemon.load_authkey(path, create=True) == key
+    assert capture_daemon.load_authkey(path) == key
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+def test_authkey_differs_per_install(tmp_path):
+    first = capture_daemon.load_authkey(str(tmp_path / "a.key"), create=True)
+    second = capture_daemon.load_authkey(str(tmp_path / "b.key"), create=True)
+    assert first != second
+
+def test_slot_replies_when_driver_cannot_start(monkeypatch):
+    starts = []
+    
+    def broken_driver(options=None):
+        starts.append(1)
+        raise RuntimeError("geckodriver 없음")
+    
+    monkeypatch.setattr(capture_daemon, "setup_driver", broken_driver)
+    monkeypatch.setattr(capture_daemon, "DRIVER_START_DELAY", 0)
+    jobs = queue.Queue()
+    slot = capture_daemon.WarmDriverSlot(0, jobs, logger, 50, 1500)
+    slot.start()
+    
+    reply = queue.Queue()
+    jobs.put(({"app_id": "app.a", "game_name": "A", "save_dir": "unused"}, reply))
+    result = reply.get(timeout=10)
+    assert result["ok"] is False
+    assert "geckodriver" in result["error"]
+    
+    # 스레드는 살아 있고 다음 작업에서 다시 시작을 시도
+    reply = queue.Queue()
+    jobs.put(({"app_id": "app.b", "game_name": "B", "save_dir": "unused"}, reply))
+    assert reply.get(timeout=10)["ok"] is False
+    assert slot.is_alive()
+    assert len(starts) == 3 * capture_daemon.DRIVER_START_ATTEMPTS
+    assert slot.status()["running"] is False
+    
+    jobs.put((None, None))
+    slot.join(timeout=10)
+
+def test_capture_format_must_be_known():
+    assert capture_daemon.parse_args(["capture", "A", "--format", "png"]).format == "png"
+    with pytest.raises(SystemExit):
+        capture_daemon.parse_args(["capture", "A", "--format", "gif"])
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""capture_proxy: 포트 자동 선택, 차단 비교, 콘텐츠 유형 차단, 정적 리소스 캐시"""
+
+import os
+import logging
+import threading
+import http.client
+import http.server
+
+import pytest
+from PIL import Image
+
+import auto_capture_and_update as capture
+import capture_proxy
+from capture_proxy import AssetCache, CaptureProxy, compare_blocking
+
+logger = logging.getLogger("test")
+
+def test_overlapping_proxies_get_free_ports():
+    first = CaptureProxy({}, logger=logger).start()
+    second = CaptureProxy({}, logger=logger).start()
+    try:
+        assert first.address[1] != 0 and second.address[1] != 0
+        assert first.address[1] != second.address[1]
+    finally:
+        first.stop()
+        second.stop()
+
+class QuitDriver:
+    def quit(self):
+        pass
+
+def test_compare_blocking_continues_after_blocked_app(monkeypatch):
+    monkeypatch.setattr(capture, "GAMES", {"app.a": "A", "app.b": "B"})
+    captured = []
+    
+    def fake_capture(driver, app_id, game_name, save_dir, logger, options=None, date_str=None, **kwargs):
+        if app_id == "app.a":
+            raise capture.PageBlockedError("captcha")
+        captured.append((game_name, "proxy" in options))
+        Image.new('RGB', (20, 20), 'white').save(os.path.join(save_dir, f"{game_name}_{date_str}.png"))
+        return True
+    
+    monkeypatch.setattr(capture, "setup_driver", lambda options=None: QuitDriver())
+    monkeypatch.setattr(capture, "capture_game_review_firefox", fake_capture)
+    
+    # 차단된 A는 비교하지 못했으므로 False지만 B는 두 모드 모두 캡처
+    assert compare_blocking(["A", "B"], logger, {}) is False
+    assert captured == [("B", False), ("B", True)]
+
+class UpstreamHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        video = self.path.startswith("/video")
+        body = b"\0" * (1024 * 1024) if video else b"<html></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4" if video else "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except OSError:
+            pass
+    
+    def log_message(self, *args):
+        pass
+
+def test_blocked_content_type_skips_body():
+    upstream = http.server.ThreadingHTTPServer(("127.0.0.1", 0), UpstreamHandler)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    proxy = CaptureProxy({"content_types": ["video/*"]}, logger=logger).start()
+    base = f"http://127.0.0.1:{upstream.server_address[1]}"
+    try:
+        conn = http.client.HTTPConnection(*proxy.address, timeout=10)
+        conn.request("GET", f"{base}/video.mp4")
+        response = conn.getresponse()
+        assert response.status == 204
+        response.read()
+        # 차단 뒤에도 같은 클라이언트 연결로 다음 요청 처리 (업스트림은 새 연결)
+        conn.request("GET", f"{base}/page")
+        response = conn.getresponse()
+        assert response.status == 200
+        assert response.read() == b"<html></html>"
+        conn.close()
+        stats = proxy.stats()
+    finally:
+        proxy.stop()
+        upstream.shutdown()
+    
+    assert stats["blocked_content_type"] == 1
+    assert stats["upstream_requests"] == 2
+    assert stats["bytes_from_upstream"] == len(b"<html></html>")
+
+IMAGE = [("Content-Type", "image/png")]
+
+def asset_url(name):
+    return f"https://play-lh.googleusercontent.com/{name}"
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    
+    def tick():
+        now[0] += 1
+        return now[0]
+    
+    monkeypatch.setattr(capture_proxy.time, "time", tick)
+    return now
+
+def test_asset_cache_evicts_least_recently_used(tmp_path, clock):
+    cache = AssetCache(str(tmp_path), max_mb=2500 / (1024 * 1024))
+    for name in ("a", "b"):
+        assert cache.put(asset_url(name), {}, 200, "OK", IMAGE, name.encode() * 1000)
+    assert cache.get(asset_url("a"), {})[3] == b"a" * 1000  # a를 최근 사용으로
+    assert cache.put(asset_url("c"), {}, 200, "OK", IMAGE, b"c" * 1000)
+    
+    assert cache.get(asset_url("b"), {}) is None
+    assert cache.get(asset_url("a"), {}) is not None
+    assert cache.get(asset_url("c"), {}) is not None
+    assert cache.summary() == {"entries": 2, "bytes": 2000, "evicted": 1}
+    assert len(os.listdir(tmp_path)) == 4  # 남은 두 항목의 본문과 메타데이터
+
+def test_asset_cache_skips_uncacheable_and_expires(tmp_path, clock):
+    cache = AssetCache(str(tmp_path), max_mb=1)
+    assert not cache.put(asset_url("x"), {}, 404, "Not Found", IMAGE, b"x")
+    assert not cache.put(asset_url("x"), {}, 200, "OK", IMAGE + [("Cache-Control", "no-store")], b"x")
+    assert not cache.put(asset_url("x"), {}, 200, "OK", IMAGE + [("Set-Cookie", "a=b")], b"x")
+    assert not cache.put(asset_url("x"), {}, 200, "OK", [("Content-Type", "text/html")], b"x")
+    assert cache.put(asset_url("x"), {}, 200, "OK", [("Content-Type", "text/css")], b"x")
+    assert not cache.cacheable_url("https://play.google.com/store/apps/details?id=a")
+    
+    clock[0] += 86400
+    assert cache.get(asset_url("x"), {}) is None
+    assert cache.summary()["entries"] == 0
+
+def test_asset_cache_index_survives_restart(tmp_path):
+    cache = AssetCache(str(tmp_path), max_mb=1)
+    cache.put(asset_url("a"), {"Accept-Encoding": "gzip"}, 200, "OK", IMAGE, b"gz")
+    reopened = AssetCache(str(tmp_path), max_mb=1)
+    assert reopened.get(asset_url("a"), {"Accept-Encoding": "gzip"})[3] == b"gz"
+    # 압축 방식이 다르면 다른 항목
+    assert reopened.get(asset_url("a"), {}) is None
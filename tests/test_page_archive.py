@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""page_archive: 기록/재생이 실제 캡처 경로와 임시 캡처 옵션을 사용하는지"""
+
+import os
+import logging
+
+import page_archive
+
+logger = logging.getLogger("test")
+
+class FakeDriver:
+    def execute_script(self, script, *args):
+        return {} if script == page_archive.PAGE_TIMING_SCRIPT else "<html></html>"
+    
+    def quit(self):
+        pass
+
+def test_record_and_replay_use_capture_path(tmp_path, monkeypatch):
+    calls = []
+    
+    def fake_capture(driver, app_id, game_name, save_dir, logger, options=None, **kwargs):
+        calls.append((app_id, save_dir, options))
+        return True
+    
+    monkeypatch.setattr(page_archive, "setup_driver", lambda options=None: FakeDriver())
+    monkeypatch.setattr(page_archive, "capture_game_review_firefox", fake_capture)
+    games = {"app.a": "A"}
+    archive_dir = str(tmp_path / "archives")
+    
+    assert page_archive.record_archives(games, archive_dir, {}, logger)
+    assert os.path.exists(page_archive.archive_path("app.a", archive_dir))
+    assert page_archive.replay_captures(games, archive_dir, str(tmp_path / "out"), {"image_format": "png"}, logger)
+    
+    (_, record_dir, record_options), (_, replay_dir, replay_options) = calls
+    assert replay_dir == str(tmp_path / "out")
+    assert replay_options["image_format"] == "png"
+    for options in (record_options, replay_options):
+        # 선택자 캐시는 임시 폴더에 두고 (실행 후 삭제) 리뷰 텍스트는 저장하지 않음
+        assert options["extract_reviews"] is False
+        assert "proxy" in options
+        assert not os.path.exists(options["selector_cache_file"])
+    assert not os.path.exists(record_dir)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""rate_limiter.RateLimiter: 스레드 공유, 임대 만료, 회로 차단기 상태 전이"""
+
+import threading
+
+import pytest
+
+from rate_limiter import RateLimiter
+
+def make_limiter(tmp_path, **kwargs):
+    kwargs.setdefault("rate_per_minute", 60000)
+    kwargs.setdefault("burst", 100)
+    return RateLimiter(str(tmp_path / "limiter.sqlite"), **kwargs)
+
+def end_backoff(limiter):
+    """차단 대기 시간이 끝난 상태로 만듦 (half-open 확인용)"""
+    limiter.conn.execute("UPDATE limiter SET backoff_until = 0")
+
+def test_threads_share_one_limiter(tmp_path):
+    limiter = make_limiter(tmp_path)
+    errors = []
+    
+    def worker():
+        try:
+            for _ in range(25):
+                limiter.acquire(timeout=10)
+                limiter.release()
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    summary = limiter.summary()
+    assert summary["acquired"] == 100
+    assert summary["in_flight"] == 0
+    assert 1 <= summary["max_in_flight"] <= 4
+    limiter.close()
+
+def test_token_bucket_limits_burst(tmp_path):
+    limiter = make_limiter(tmp_path, rate_per_minute=1, burst=2)
+    limiter.acquire(timeout=1)
+    limiter.acquire(timeout=1)
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=1)
+    limiter.close()
+
+def test_block_opens_circuit_then_half_open_then_closed(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.acquire()
+    backoff = limiter.release("captcha", "app.a")
+    assert backoff > 0
+    assert limiter.summary()["circuit"] == "open"
+    assert limiter.summary()["blocks"] == {"captcha": 1}
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=1)
+    
+    # 대기가 끝나면 시험 요청 하나만 허용
+    end_backoff(limiter)
+    limiter.conn.execute("UPDATE limiter SET tokens = 100")
+    assert limiter.summary()["circuit"] == "half-open"
+    limiter.acquire(timeout=1)
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=1.5)
+    
+    # 시험 요청이 정상이면 회로가 닫히고 평소대로 요청
+    limiter.release()
+    assert limiter.summary()["circuit"] == "closed"
+    limiter.acquire(timeout=1)
+    limiter.acquire(timeout=1)
+    limiter.close()
+
+def test_consecutive_blocks_double_backoff(tmp_path, monkeypatch):
+    monkeypatch.setattr("rate_limiter.BACKOFF_JITTER", 0)
+    limiter = make_limiter(tmp_path)
+    backoffs = []
+    for _ in range(3):
+        end_backoff(limiter)
+        limiter.conn.execute("UPDATE limiter SET tokens = 100")
+        limiter.acquire(timeout=1)
+        backoffs.append(limiter.release("throttled"))
+    assert [round(b) for b in backoffs] == [30, 60, 120]
+    assert limiter.summary()["consecutive_blocks"] == 3
+    limiter.close()
+
+def test_error_release_keeps_circuit_state(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.acquire()
+    limiter.release("captcha")
+    end_backoff(limiter)
+    limiter.conn.execute("UPDATE limiter SET tokens = 100")
+    limiter.acquire(timeout=1)
+    limiter.release(ok=False)
+    summary = limiter.summary()
+    assert summary["consecutive_blocks"] == 1
+    assert summary["in_flight"] == 0
+    limiter.close()
+
+def test_expired_lease_does_not_block_half_open(tmp_path):
+    # 시험 요청을 보낸 프로세스가 반환하지 못하고 끝나도 임대가 만료되면 다음 실행이 진행
+    crashed = make_limiter(tmp_path, lease_seconds=0.5)
+    crashed.acquire()
+    crashed.conn.execute("UPDATE limiter SET consecutive_blocks = 1")
+    crashed.close()
+    
+    limiter = make_limiter(tmp_path)
+    limiter.acquire(timeout=5)
+    assert limiter.summary()["in_flight"] == 1
+    limiter.close()
+
+def test_start_run_keeps_other_runs_leases_and_stats(tmp_path):
+    other = make_limiter(tmp_path, run_id="daemon")
+    other.acquire()
+    other.acquire()
+    
+    limiter = make_limiter(tmp_path, run_id="today")
+    limiter.start_run()
+    assert limiter.summary()["in_flight"] == 2
+    assert limiter.summary()["acquired"] == 0
+    assert other.summary()["acquired"] == 2
+    
+    # 다른 실행의 임대는 반환하지 않음
+    limiter.release()
+    assert limiter.summary()["in_flight"] == 2
+    other.release()
+    other.release()
+    assert limiter.summary()["in_flight"] == 0
+    other.close()
+    limiter.close()
+
+def test_run_stats_shared_by_run_id(tmp_path):
+    first = make_limiter(tmp_path, run_id="run-1")
+    second = make_limiter(tmp_path, run_id="run-1")
+    first.acquire()
+    second.acquire()
+    first.release()
+    second.release()
+    assert first.summary()["acquired"] == 2
+    first.close()
+    second.close()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""rating_series: 벡터화된 시계열 함수와 사업실별 집계"""
+
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import rating_series
+from rating_series import (build_series, compute_aggregates, forward_fill, lag, nan_sum, rolling_mean,
+                           summary_for_dashboard, weighted_mean)
+
+nan = np.nan
+
+def assert_same(actual, expected):
+    np.testing.assert_allclose(actual, np.array(expected, dtype=float), equal_nan=True)
+
+def test_forward_fill_keeps_leading_nan():
+    values = np.array([[nan, 1.0, nan, nan, 2.0],
+                       [3.0, nan, 4.0, nan, nan],
+                       [nan, nan, nan, nan, nan]])
+    assert_same(forward_fill(values), [[nan, 1, 1, 1, 2],
+                                       [3, 3, 4, 4, 4],
+                                       [nan, nan, nan, nan, nan]])
+
+def test_rolling_mean_ignores_nan():
+    values = np.array([[1.0, 2.0, nan, 4.0, 5.0, nan, nan, nan]])
+    # 3일 창: [1], [1,2], [1,2], [2,4], [4,5], [4,5], [5], []
+    assert_same(rolling_mean(values, 3), [[1, 1.5, 1.5, 3, 4.5, 4.5, 5, nan]])
+    assert_same(rolling_mean(values, 1), values)
+
+def test_lag():
+    values = np.array([[1.0, 2.0, 3.0, 4.0]])
+    assert_same(lag(values, 1), [[nan, 1, 2, 3]])
+    assert_same(lag(values, 3), [[nan, nan, nan, 1]])
+    assert_same(lag(values, 4), [[nan, nan, nan, nan]])
+    assert_same(lag(values, 10), [[nan, nan, nan, nan]])
+
+def test_window_must_be_positive():
+    values = np.array([[1.0, 2.0]])
+    with pytest.raises(ValueError):
+        lag(values, 0)
+    with pytest.raises(ValueError):
+        rolling_mean(values, 0)
+
+def test_weighted_mean_skips_missing():
+    values = np.array([[4.0, nan, 4.0], [5.0, 5.0, nan]])
+    weights = np.array([[100.0, 100.0, nan], [300.0, 300.0, nan]])
+    assert_same(weighted_mean(values, weights), [4.75, 5.0, nan])
+
+def test_nan_sum_keeps_nan_for_all_missing():
+    values = np.array([[1.0, nan, nan], [2.0, 3.0, nan]])
+    assert_same(nan_sum(values), [3, 3, nan])
+
+def make_series(rating, rating_count, one_star_share, apps=("a", "b", "c")):
+    return {"apps": np.array(apps), "start": np.datetime64("2025-12-01", "D"), "days": len(rating[0]),
+            "rating": np.array(rating, dtype=float), "rating_count": np.array(rating_count, dtype=float),
+            "one_star_share": np.array(one_star_share, dtype=float)}
+
+def test_business_rollups_are_count_weighted():
+    series = make_series(
+        rating=[[4.0, 4.0, 4.0], [5.0, nan, 5.0], [3.0, 3.0, 3.0]],
+        rating_count=[[100, 110, 120], [300, nan, 330], [nan, nan, nan]],
+        one_star_share=[[0.2, 0.2, 0.2], [0.0, nan, 0.0], [0.5, 0.5, 0.5]],
+    )
+    apps, groups = compute_aggregates(series, {"a": "red", "b": "red", "c": "blue"}, window=2)
+    
+    red = groups["red"]
+    assert_same(red["rating"], [4.75, (4 * 110 + 5 * 300) / 410, (4 * 120 + 5 * 330) / 450])
+    assert_same(red["rating_count"], [400, 410, 450])
+    assert_same(red["one_star_share"], [0.05, 0.2 * 110 / 410, 0.2 * 120 / 450])
+    # 2일 전 값이 있어야 증가 속도 계산 가능 (b는 둘째 날이 비어 있어 앞 날짜 값으로 채움)
+    assert_same(apps["count_velocity"][:2], [[nan, nan, 10], [nan, nan, 15]])
+    assert_same(red["count_velocity"], [nan, nan, 25])
+    
+    # 평점 수가 전혀 없는 사업실은 0이 아니라 null
+    blue = groups["blue"]
+    assert_same(blue["rating_count"], [nan, nan, nan])
+    assert_same(blue["count_velocity"], [nan, nan, nan])
+    assert_same(blue["rating"], [nan, nan, nan])
+
+def test_build_series_and_dashboard_summary():
+    rows = [
+        {"app_id": "a", "date": "20251201", "rating": 4.0, "rating_count": 100, "histogram": json.dumps({"1": 1, "5": 3})},
+        {"app_id": "a", "date": "20251203", "rating": 4.2, "rating_count": 120, "histogram": None},
+        {"app_id": "b", "date": "20251203", "rating": 3.0, "rating_count": None, "histogram": "{}"},
+        {"app_id": "x", "date": "20251202", "rating": 1.0, "rating_count": 1, "histogram": "{}"},
+    ]
+    series = build_series(rows, ["a", "b"])
+    assert series["days"] == 3
+    assert str(series["start"]) == "2025-12-01"
+    assert_same(series["rating"], [[4.0, nan, 4.2], [nan, nan, 3.0]])
+    assert_same(series["one_star_share"], [[0.25, nan, nan], [nan, nan, nan]])
+    
+    aggregates = compute_aggregates(series, {"a": "red", "b": "red"})
+    summary = summary_for_dashboard(series, aggregates, {"a": "A", "b": "B"}, [0, 2])
+    assert list(summary["dates"]) == ["20251201", "20251203"]
+    first = summary["dates"]["20251201"]
+    assert list(first["apps"]) == ["A"]
+    assert first["apps"]["A"]["rating"] == 4.0
+    assert first["business"]["red"]["rating_count"] == 100
+    last = summary["dates"]["20251203"]
+    assert last["apps"]["B"]["rating_count"] is None
+    assert last["business"]["red"]["rating_count"] == 120
+    json.dumps(summary, allow_nan=False)  # NaN 없이 그대로 JSON으로 저장 가능
+
+def test_empty_series(tmp_path):
+    series = build_series([], ["a"])
+    assert series["days"] == 0
+    path = str(tmp_path / "series.npz")
+    rating_series.save_series(series, path)
+    assert rating_series.load_series(path)["rating"].shape == (1, 0)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""review_store.ReviewStore: upsert 멱등성, FTS 색인 동기화, FTS5가 없을 때의 LIKE 검색"""
+
+import os
+import json
+
+import pytest
+
+import review_store
+from review_store import ReviewStore, fts_query, review_id_for
+
+DATE = "20251217"
+
+def review(review_id, text, stars=5, date="2025-12-16", helpful=0):
+    return {"review_id": review_id, "author": f"작성자{review_id}", "date": date, "stars": stars,
+            "text": text, "helpful": helpful}
+
+def write_day(base_dir, date_str, entries, crawl=()):
+    date_dir = os.path.join(base_dir, date_str)
+    os.makedirs(date_dir, exist_ok=True)
+    with open(os.path.join(date_dir, f"reviews_{date_str}.jsonl"), 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    if crawl:
+        with open(os.path.join(date_dir, f"review_crawl_{date_str}.jsonl"), 'w', encoding='utf-8') as f:
+            for line in crawl:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return date_dir
+
+def day_entry(app_id, game_name, reviews, rating=4.5, rating_count=1000):
+    return {"app_id": app_id, "game_name": game_name, "language": "ko", "rating": rating,
+            "rating_count": rating_count, "histogram": {"5": 0.7, "1": 0.1}, "reviews": reviews}
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReviewStore(str(tmp_path / "reviews.sqlite"))
+    yield store
+    store.close()
+
+def fts_check(store):
+    """외부 콘텐츠 FTS 색인이 reviews 테이블 본문과 일치하는지 확인 (불일치면 sqlite3.DatabaseError)"""
+    store.conn.execute("INSERT INTO reviews_fts (reviews_fts, rank) VALUES ('integrity-check', 1)")
+
+def test_ingest_twice_is_idempotent(store, tmp_path):
+    date_dir = write_day(str(tmp_path), DATE, [
+        day_entry("app.poker", "Poker", [review("r1", "결제가 안 돼요", 1), review("r2", "재미있어요", 5)]),
+    ], crawl=[dict(review("r3", "업데이트 후 튕김", 2), app_id="app.poker", game_name="Poker")])
+    
+    first = store.ingest_day(date_dir, DATE)
+    assert first == {"files": 2, "reviews": 3, "changed": 3, "app_days": 1}
+    # 같은 파일은 건너뛰고, 강제로 다시 적재해도 바뀐 행이 없음
+    assert store.ingest_day(date_dir, DATE)["files"] == 0
+    again = store.ingest_day(date_dir, DATE, force=True)
+    assert again["reviews"] == 3 and again["changed"] == 0
+    assert store.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0] == 3
+    assert store.conn.execute("SELECT COUNT(*) FROM app_days").fetchone()[0] == 1
+    fts_check(store)
+
+def test_same_review_on_later_day_updates_one_row(store, tmp_path):
+    store.ingest_day(write_day(str(tmp_path), "20251216", [
+        day_entry("app.poker", "Poker", [review("r1", "결제 오류", 1, helpful=1)])]), "20251216")
+    store.ingest_day(write_day(str(tmp_path), DATE, [
+        day_entry("app.poker", "Poker", [review("r1", "결제 오류 해결됨", 3, helpful=5)])]), DATE)
+    
+    rows = store.search(apps=["Poker"])
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row["stars"], row["text"], row["helpful"]) == (3, "결제 오류 해결됨", 5)
+    assert (row["first_seen"], row["last_seen"]) == ("2025-12-16", "2025-12-17")
+    
+    # 본문이 바뀌면 FTS 색인도 새 본문으로 바뀜
+    assert [r["review_id"] for r in store.search("해결")] == ["r1"]
+    fts_check(store)
+
+def test_fts_follows_deletes(store, tmp_path):
+    store.ingest_day(write_day(str(tmp_path), DATE, [
+        day_entry("app.poker", "Poker", [review("r1", "결제 오류"), review("r2", "결제 완료")])]), DATE)
+    assert len(store.search("결제")) == 2
+    store.conn.execute("DELETE FROM reviews WHERE review_id = 'r1'")
+    assert [r["review_id"] for r in store.search("결제")] == ["r2"]
+    fts_check(store)
+
+def test_search_filters(store, tmp_path):
+    store.ingest_day(write_day(str(tmp_path), DATE, [
+        day_entry("app.poker", "Poker", [review("r1", "결제가 안 돼요", 1, "2025-12-01"),
+                                         review("r2", "결제 빨라요", 5, "2025-12-10")]),
+        day_entry("app.sudda", "Sudda", [review("r3", "결제 문의", 1, "2025-12-12")]),
+    ]), DATE)
+    assert [r["review_id"] for r in store.search("결제", stars=[1])] == ["r3", "r1"]
+    assert [r["review_id"] for r in store.search("결제", apps=["app.poker"], since="2025-12-05")] == ["r2"]
+    assert [r["review_id"] for r in store.search(until="2025-12-01")] == ["r1"]
+    # 접두어 검색: '결제'는 '결제가'도 찾음
+    assert fts_query("결제") == '"결제"*'
+    assert len(store.search("결제", limit=2)) == 2
+
+def test_like_fallback_without_fts5(tmp_path, monkeypatch):
+    monkeypatch.setattr(review_store, "FTS_SCHEMA",
+                        "CREATE VIRTUAL TABLE reviews_fts USING no_such_module(text);")
+    store = ReviewStore(str(tmp_path / "reviews.sqlite"))
+    try:
+        assert store.fts is False
+        store.ingest_day(write_day(str(tmp_path), DATE, [
+            day_entry("app.poker", "Poker", [review("r1", "결제가 안 돼요", 1), review("r2", "재미있어요")])]), DATE)
+        assert [r["review_id"] for r in store.search("결제")] == ["r1"]
+        assert store.search("환불") == []
+    finally:
+        store.close()
+
+def test_broken_line_is_skipped_and_failed_ingest_rolls_back(store, tmp_path, monkeypatch):
+    date_dir = write_day(str(tmp_path), DATE, [day_entry("app.poker", "Poker", [review("r1", "좋아요")])])
+    with open(os.path.join(date_dir, f"reviews_{DATE}.jsonl"), 'a', encoding='utf-8') as f:
+        f.write('{"app_id": "app.poker", "revi')
+    assert store.ingest_day(date_dir, DATE)["reviews"] == 1
+    
+    def broken_read(path, date_str, seen):
+        raise ValueError("읽기 실패")
+    
+    monkeypatch.setattr(ReviewStore, "_read_file", staticmethod(broken_read))
+    with pytest.raises(ValueError):
+        store.ingest_day(date_dir, DATE, force=True)
+    assert store.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0] == 1
+    assert not store.conn.in_transaction
+
+def test_review_id_for_hashes_when_missing():
+    a = review_id_for({"author": "A", "date": "2025-12-01", "text": "좋아요"})
+    assert a.startswith("h:") and a == review_id_for({"author": "A", "date": "2025-12-01", "text": "좋아요"})
+    assert a != review_id_for({"author": "B", "date": "2025-12-01", "text": "좋아요"})
+    assert review_id_for({"id": "gp:123", "text": "x"}) == "gp:123"
+
+def test_rating_history(store, tmp_path):
+    for date_str, rating in (("20251216", 4.4), ("20251217", 4.5)):
+        store.ingest_day(write_day(str(tmp_path), date_str, [day_entry("app.poker", "Poker", [], rating)]), date_str)
+    assert [(row["date"], row["rating"]) for row in store.rating_history(["Poker"])] == [
+        ("20251216", 4.4), ("20251217", 4.5)]
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""work_queue.WorkQueue: 임대, 임대 만료, 재시도, 게시 권한, 호스트 전용 파일"""
+
+import time
+import threading
+
+import pytest
+
+from work_queue import WorkQueue, QueueHostError, adopt_queue, registry_jobs
+
+DATE = "20251217"
+
+def make_queue(tmp_path, **kwargs):
+    return WorkQueue(str(tmp_path / "queue.sqlite"), **kwargs)
+
+def jobs(*app_ids):
+    return [(app_id, app_id.upper(), DATE, "ko-KR", 100) for app_id in app_ids]
+
+def test_enqueue_ignores_duplicates(tmp_path):
+    queue = make_queue(tmp_path)
+    assert queue.enqueue(jobs("a", "b")) == 2
+    assert queue.enqueue(jobs("a", "b", "c")) == 1
+    assert queue.counts(DATE) == {"pending": 3}
+    queue.close()
+
+def test_leased_job_is_not_leased_twice(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue(jobs("a"))
+    job = queue.lease("w1", DATE)
+    assert job["app_id"] == "a" and job["attempts"] == 1
+    assert queue.lease("w2", DATE) is None
+    queue.close()
+
+def test_threads_lease_each_job_once(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue(jobs(*[f"app{i}" for i in range(40)]))
+    leased = []
+    lock = threading.Lock()
+    
+    def worker(name):
+        while True:
+            job = queue.lease(name, DATE)
+            if job is None:
+                return
+            with lock:
+                leased.append(job["app_id"])
+            queue.complete(job, name, True)
+    
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(leased) == sorted(f"app{i}" for i in range(40))
+    assert queue.counts(DATE) == {"done": 40}
+    queue.close()
+
+def test_expired_lease_moves_to_another_worker(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0.2)
+    queue.enqueue(jobs("a"))
+    first = queue.lease("w1", DATE)
+    time.sleep(0.3)
+    second = queue.lease("w2", DATE)
+    assert second["id"] == first["id"]
+    assert second["attempts"] == 2
+    
+    # 임대를 잃은 워커는 갱신도 결과 기록도 할 수 없음
+    assert queue.heartbeat(first["id"], "w1") is False
+    assert queue.complete(first, "w1", True) is False
+    assert queue.complete(second, "w2", True) is True
+    assert queue.counts(DATE) == {"done": 1}
+    queue.close()
+
+def test_heartbeat_keeps_lease(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0.3)
+    queue.enqueue(jobs("a"))
+    job = queue.lease("w1", DATE)
+    for _ in range(3):
+        time.sleep(0.15)
+        assert queue.heartbeat(job["id"], "w1") is True
+    assert queue.lease("w2", DATE) is None
+    queue.close()
+
+def test_failed_job_retries_until_max_attempts(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue(jobs("a"), max_attempts=2)
+    job = queue.lease("w1", DATE)
+    queue.complete(job, "w1", False, error="실패")
+    assert queue.counts(DATE) == {"pending": 1}
+    job = queue.lease("w1", DATE)
+    queue.complete(job, "w1", False, error="실패")
+    assert queue.counts(DATE) == {"failed": 1}
+    assert queue.lease("w1", DATE) is None
+    assert queue.day_finished(DATE)
+    
+    assert queue.retry_failed(DATE) == 1
+    assert queue.lease("w1", DATE)["attempts"] == 1
+    queue.close()
+
+def test_expired_lease_on_last_attempt_fails(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0.1)
+    queue.enqueue(jobs("a"), max_attempts=1)
+    queue.lease("w1", DATE)
+    time.sleep(0.2)
+    assert queue.lease("w2", DATE) is None
+    assert queue.jobs(DATE)[0]["status"] == "failed"
+    assert queue.jobs(DATE)[0]["error"] == "임대 만료"
+    queue.close()
+
+def test_claim_publish_once(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue(jobs("a"))
+    assert not queue.day_finished(DATE)
+    queue.complete(queue.lease("w1", DATE), "w1", True)
+    assert queue.day_finished(DATE)
+    assert queue.claim_publish(DATE, "w1") is True
+    assert queue.claim_publish(DATE, "w2") is False
+    queue.close()
+
+def test_registry_jobs_locale():
+    apps = [{"app_id": "a", "name": "A", "language": "en", "country": "US", "priority": 5, "enabled": True},
+            {"app_id": "b", "name": "B", "language": "ko", "country": "KR", "priority": 1, "enabled": False}]
+    assert registry_jobs(apps, DATE) == [("a", "A", DATE, "en-US", 5)]
+
+def test_queue_refuses_other_host(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    WorkQueue(path, host="capture-1").close()
+    WorkQueue(path, host="capture-1").close()
+    with pytest.raises(QueueHostError):
+        WorkQueue(path, host="capture-2")
+
+def test_adopt_moves_queue_to_new_host(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    queue = WorkQueue(path, host="capture-1")
+    queue.enqueue(jobs("a"))
+    queue.close()
+    assert adopt_queue(path, host="capture-2") == "capture-1"
+    queue = WorkQueue(path, host="capture-2")
+    assert queue.counts(DATE) == {"pending": 1}
+    queue.close()
+    with pytest.raises(QueueHostError):
+        WorkQueue(path, host="capture-1")
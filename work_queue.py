@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+한 호스트의 여러 워커 프로세스가 나눠 처리하는 캡처 작업 큐 (SQLite)
+
+작업은 (앱 ID, 날짜, 언어) 단위이며 워커가 임대(lease)한 뒤 주기적으로 갱신(heartbeat)한다.
+임대 시간이 지나도록 갱신되지 않은 작업은 다른 워커가 다시 가져가고, 실패한 작업은
+max_attempts까지 재시도한다. 모든 작업이 끝나면 코디네이터가 HTML 업데이트와 Git 작업을 한 번만 실행한다.
+
+큐 파일은 로컬 디스크에 두고 한 호스트에서만 연다. SMB/NFS 공유 폴더에서는 SQLite 파일 잠금을 믿을 수 없어
+같은 작업을 두 워커가 임대하거나 파일이 손상될 수 있으므로, 파일을 처음 만든 호스트를 기록해 두고
+다른 호스트가 열면 QueueHostError를 발생시킨다. 다른 호스트로 옮길 때는 그 호스트에서 adopt 명령을 실행한다.
+
+사용 예:
+    python work_queue.py status
+    python work_queue.py enqueue --date 20251217
+    python work_queue.py retry-failed --date 20251217
+    python work_queue.py adopt                    # 복사해 온 큐 파일을 이 호스트 전용으로
+"""
+
+import os
+import time
+import socket
+import sqlite3
+import datetime
+import argparse
+import threading
+
+QUEUE_FILE = os.path.join(".cache", "work_queue.sqlite")
+LEASE_SECONDS = 180        # 이 시간 동안 heartbeat가 없으면 다른 워커가 작업을 다시 가져감
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_id TEXT NOT NULL,
+    game_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 100,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires REAL,
+    heartbeat_at REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (app_id, date, locale)
+);
+CREATE INDEX IF NOT EXISTS jobs_date_status ON jobs (date, status);
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY,
+    published_at REAL,
+    published_by TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+class QueueHostError(RuntimeError):
+    """큐 파일을 만든 호스트가 아닌 곳에서 열려고 할 때 발생"""
+
+def worker_name():
+    """작업 임대자로 기록할 이름 (호스트명:프로세스 ID)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _connect(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # 트랜잭션은 직접 관리 (BEGIN IMMEDIATE로 임대 경쟁 방지)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def adopt_queue(path=QUEUE_FILE, host=None):
+    """큐 파일을 이 호스트(또는 host) 전용으로 지정하고 이전 호스트 반환 (다른 호스트에서 복사해 온 경우)"""
+    conn = _connect(path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'host'").fetchone()
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('host', ?)", (host or socket.gethostname(),))
+        return row["value"] if row else None
+    finally:
+        conn.close()
+
+class WorkQueue:
+    """한 호스트의 워커 프로세스들이 SQLite 파일 하나로 공유하는 캡처 작업 큐"""
+    
+    def __init__(self, path=QUEUE_FILE, lease_seconds=LEASE_SECONDS, host=None):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.conn = _connect(path)
+        self._lock = threading.Lock()
+        self._check_host(host or socket.gethostname())
+    
+    def _check_host(self, host):
+        """처음 연 호스트를 기록하고, 다른 호스트이면 QueueHostError"""
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('host', ?)", (host,))
+        owner = self.conn.execute("SELECT value FROM meta WHERE key = 'host'").fetchone()["value"]
+        if owner != host:
+            self.conn.close()
+            raise QueueHostError(
+                f"작업 큐 파일 {self.path}은(는) {owner} 호스트 전용입니다. 공유 폴더의 SQLite 잠금은 믿을 수 없으므로 "
+                f"여러 호스트가 같은 파일을 쓸 수 없습니다. 이 호스트로 옮긴 것이라면 "
+                f"'python work_queue.py --queue {self.path} adopt'를 실행하세요.")
+    
+    def close(self):
+        self.conn.close()
+    
+    def _write(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params)
+    
+    def enqueue(self, jobs, max_attempts=MAX_ATTEMPTS):
+        """(앱 ID, 게임 이름, 날짜, 언어, 우선순위) 작업들을 추가 (이미 있으면 무시), 추가된 수 반환"""
+        now = time.time()
+        added = 0
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for app_id, game_name, date, locale, priority in jobs:
+                    cursor = self.conn.execute(
+                        "INSERT OR IGNORE INTO jobs (app_id, game_name, date, locale, priority, max_attempts, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (app_id, game_name, date, locale, priority, max_attempts, now))
+                    added += cursor.rowcount
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return added
+    
+    def lease(self, owner, date=None):
+        """대기 중이거나 임대가 만료된 작업 하나를 임대하여 반환 (없으면 None)"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 시도 횟수를 다 쓴 채 임대가 만료된 작업은 실패 처리
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = COALESCE(error, '임대 만료'), lease_owner = NULL, "
+                    "updated_at = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                    (now, now))
+                row = self.conn.execute(
+                    "SELECT * FROM jobs WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                    "AND attempts < max_attempts" + (" AND date = ?" if date else "") +
+                    " ORDER BY priority, id LIMIT 1",
+                    (now, date) if date else (now,)).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, heartbeat_at = ?, updated_at = ? WHERE id = ?",
+                    (owner, now + self.lease_seconds, now, now, row["id"]))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+    
+    def heartbeat(self, job_id, owner):
+        """임대 연장 (다른 워커가 이미 가져갔으면 False)"""
+        now = time.time()
+        cursor = self._write(
+            "UPDATE jobs SET lease_expires = ?, heartbeat_at = ?, updated_at = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (now + self.lease_seconds, now, now, job_id, owner))
+        return cursor.rowcount == 1
+    
+    def complete(self, job, owner, ok, result=None, error=None):
+        """작업 결과 기록 (실패하면 남은 시도 횟수만큼 다시 대기 상태로)"""
+        if ok:
+            status = "done"
+        else:
+            status = "failed" if job["attempts"] >= job["max_attempts"] else "pending"
+        cursor = self._write(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+            "updated_at = ? WHERE id = ? AND lease_owner = ?",
+            (status, result, error, time.time(), job["id"], owner))
+        return cursor.rowcount == 1
+    
+    def counts(self, date):
+        """날짜별 상태 -> 작업 수"""
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs WHERE date = ? GROUP BY status", (date,))
+        return {row["status"]: row["n"] for row in rows}
+    
+    def jobs(self, date):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM jobs WHERE date = ? ORDER BY priority, id", (date,))]
+    
+    def day_finished(self, date):
+        """해당 날짜 작업이 모두 완료/실패 상태인지 (작업이 하나도 없으면 False)"""
+        counts = self.counts(date)
+        return bool(counts) and counts.get("pending", 0) == 0 and counts.get("leased", 0) == 0
+    
+    def claim_publish(self, date, owner):
+        """해당 날짜 게시(HTML 업데이트/Git) 권한을 한 번만 획득"""
+        cursor = self._write(
+            "INSERT OR IGNORE INTO days (date, published_at, published_by) VALUES (?, ?, ?)",
+            (date, time.time(), owner))
+        return cursor.rowcount == 1
+    
+    def retry_failed(self, date):
+        """실패한 작업을 시도 횟수를 초기화하여 다시 대기 상태로"""
+        cursor = self._write(
+            "UPDATE jobs SET status = 'pending', attempts = 0, error = NULL, updated_at = ? "
+            "WHERE date = ? AND status = 'failed'", (time.time(), date))
+        self._write("DELETE FROM days WHERE date = ?", (date,))
+        return cursor.rowcount
+
+class LeaseHeartbeat(threading.Thread):
+    """작업을 처리하는 동안 백그라운드에서 임대를 주기적으로 연장"""
+    
+    def __init__(self, queue, job, owner):
+        super().__init__(name=f"heartbeat-{job['id']}", daemon=True)
+        self.queue = queue
+        self.job = job
+        self.owner = owner
+        self.lost = False
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.wait(self.queue.lease_seconds / 3):
+            if not self.queue.heartbeat(self.job["id"], self.owner):
+                self.lost = True
+                break
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop_event.set()
+        self.join()
+
+def registry_jobs(apps, date):
+    """레지스트리 앱 목록으로 날짜별 작업 목록 생성"""
+    return [(app["app_id"], app["name"], date, f"{app['language']}-{app['country']}", app["priority"])
+            for app in apps if app["enabled"]]
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="캡처 작업 큐 (한 호스트 전용)")
+    parser.add_argument("--queue", default=QUEUE_FILE, help="작업 큐 SQLite 파일")
+    parser.add_argument("--date", default=datetime.datetime.now().strftime('%Y%m%d'), help="대상 날짜 (YYYYMMDD)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="날짜별 작업 상태 출력")
+    enqueue_parser = sub.add_parser("enqueue", help="레지스트리의 앱들을 작업으로 추가")
+    enqueue_parser.add_argument("--registry", default=None, help="앱 레지스트리 파일")
+    sub.add_parser("retry-failed", help="실패한 작업을 다시 대기 상태로")
+    sub.add_parser("adopt", help="다른 호스트에서 옮겨 온 큐 파일을 이 호스트 전용으로 지정")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    if args.command == "adopt":
+        previous = adopt_queue(args.queue)
+        print(f"{args.queue}: {previous or '기록 없음'} -> {socket.gethostname()}")
+        return True
+    
+    try:
+        queue = WorkQueue(args.queue)
+    except QueueHostError as e:
+        print(e)
+        return False
+    try:
+        if args.command == "enqueue":
+            from app_registry import REGISTRY_FILE, load_registry
+            added = queue.enqueue(registry_jobs(load_registry(args.registry or REGISTRY_FILE), args.date))
+            print(f"{args.date}: 작업 {added}개 추가")
+        elif args.command == "retry-failed":
+            print(f"{args.date}: 실패한 작업 {queue.retry_failed(args.date)}개 재시도 대기")
+        
+        counts = queue.counts(args.date)
+        print(f"{args.date}: " + ", ".join(f"{status} {n}" for status, n in sorted(counts.items())) if counts
+              else f"{args.date}: 작업 없음")
+        for job in queue.jobs(args.date):
+            owner = f" ({job['lease_owner']})" if job["lease_owner"] else ""
+            error = f" - {job['error']}" if job["error"] else ""
+            print(f"  {job['game_name']:<16} {job['locale']:<6} {job['status']:<8} "
+                  f"시도 {job['attempts']}/{job['max_attempts']}{owner}{error}")
+        return True
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)